@@ -0,0 +1,281 @@
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+from contextlib import closing
+import numpy as np
+import pandas as pd
+from util import log_info
+from config import ANALYTICS_CONFIG
+
+MOVIE_COLUMNS = ['id', 'title', 'year', 'rating', 'duration', 'metascore', 'detail_url']
+NUMERIC_COLUMNS = ['year', 'rating', 'duration', 'metascore']
+# Columnas que SQLiteRepository guarda como TEXT
+TEXT_COLUMNS = ['year', 'rating', 'metascore']
+
+# Prefijo numérico que SQLite toma de un texto en una operación aritmética ('85abc' -> 85, '' -> 0)
+SQLITE_NUMBER = re.compile(r'\s*([-+]?)(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?')
+
+def round_half_even(values, decimals=2):
+    """
+    ROUND(x, d) de MySQL sobre DOUBLE: rint(x * 10^d) / 10^d, es decir mitad al par sobre el
+    valor escalado (ROUND(2.5e0) = 2). Es lo mismo que hace np.round.
+    """
+    return np.round(values, decimals)
+
+def sqlite_numbers(values):
+    """
+    Valor numérico de cada dato en una operación de SQLite, y si es entero: un texto sin punto
+    ni exponente es INTEGER ('85' / 10 = 8), uno que no empieza con número vale 0, NULL queda NaN
+    returns:
+        (np.ndarray, np.ndarray) -> valores como float64 y máscara de enteros
+    """
+    values = pd.Series(values, dtype=object)
+    numbers = np.full(len(values), np.nan)
+    is_int = np.zeros(len(values), dtype=bool)
+    text = values.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    if text.any():
+        # Se convierten los valores distintos (pocos: años, ratings) y se expanden con los códigos
+        codes, uniques = pd.factorize(values[text])
+        sign, mantissa, exponent = [column for _, column in pd.Series(uniques).str.extract(SQLITE_NUMBER.pattern).items()]
+        literal = sign.fillna('') + mantissa.fillna('0') + exponent.fillna('')
+        numbers[text] = literal.astype('float64').to_numpy()[codes]
+        is_int[text] = (~mantissa.str.contains('.', regex=False, na=False) & exponent.isna()).to_numpy()[codes]
+    others = ~text & values.notna().to_numpy()
+    if others.any():
+        numbers[others] = values[others].astype('float64').to_numpy()
+        is_int[others] = values[others].map(lambda value: isinstance(value, (int, np.integer))).to_numpy(dtype=bool)
+    return numbers, is_int
+
+def sqlite_divide(numerator, numerator_int, denominator, denominator_int):
+    """a / b de SQLite: entre enteros trunca hacia cero; dividir por cero da NULL (NaN)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quotient = numerator / denominator
+    quotient = np.where(numerator_int & denominator_int, np.trunc(quotient), quotient)
+    return np.where(denominator == 0, np.nan, quotient), numerator_int & denominator_int
+
+class AnalyticsEngine:
+    """
+    Ejecuta las consultas de entregables/consultas_analiticas.sql como operaciones vectorizadas
+    de pandas/NumPy, con la semántica de MySQL (STDDEV poblacional, NULL primero al ordenar,
+    división decimal de enteros). Los resultados se cachean por la versión (hash) del dataset.
+    Con stored_text sigue en cambio a la base de SQLiteRepository, que guarda year, rating y
+    metascore como TEXT: el mismo SQL ahí divide '85' / 10 como enteros y agrupa '' aparte de NULL.
+    """
+
+    def __init__(self, movies, actors=None, links=None, cache_dir=None, stored_text=False):
+        """
+        params:
+            movies, actors, links: pd.DataFrame -> tablas con las columnas de MySQL (movies_id, actors_id)
+            cache_dir: str -> caché en disco por versión del dataset; None usa ANALYTICS_CONFIG['cache_dir']
+                       y False guarda solo en memoria
+            stored_text: bool -> year, rating y metascore son TEXT con la aritmética de SQLite
+        """
+        self.stored_text = stored_text
+        self.movies = self._normalize_movies(movies, stored_text)
+        self.actors = actors if actors is not None else pd.DataFrame({'id': [], 'name': []})
+        self.links = links if links is not None else pd.DataFrame({'movies_id': [], 'actors_id': []})
+        self.cache_dir = cache_dir if cache_dir is not None else ANALYTICS_CONFIG['cache_dir']
+        self._version = None
+        self._results = {}
+
+    @staticmethod
+    def _normalize_movies(movies, stored_text=False):
+        """
+        Columnas numéricas como en MySQL: lo que no es número queda NULL (NaN). Con stored_text
+        year, rating y metascore se conservan como texto (NULL como None) y solo duration es número.
+        """
+        movies = movies[MOVIE_COLUMNS].copy()
+        for column in NUMERIC_COLUMNS:
+            if stored_text and column in TEXT_COLUMNS:
+                movies[column] = movies[column].astype(object).where(movies[column].notna(), None)
+            else:
+                movies[column] = pd.to_numeric(movies[column].replace('', np.nan), errors='coerce').astype('float64')
+        return movies.sort_values('id', kind='stable').reset_index(drop=True)
+
+    @classmethod
+    def from_sqlite(cls, db_path=None, **kwargs):
+        """
+        Carga las tablas de la base SQLite del scraper (movie_id/actor_id en la relación). Los
+        resultados son los del SQL sobre esa base, con sus columnas TEXT (ver stored_text)
+        """
+        with closing(sqlite3.connect(db_path or ANALYTICS_CONFIG['sqlite_path'])) as conn:
+            movies = pd.read_sql_query(f"SELECT {', '.join(MOVIE_COLUMNS)} FROM movies", conn)
+            actors = pd.read_sql_query('SELECT id, name FROM actors', conn)
+            links = pd.read_sql_query('SELECT movie_id AS movies_id, actor_id AS actors_id FROM movie_actors', conn)
+        return cls(movies, actors, links, stored_text=True, **kwargs)
+
+    @classmethod
+    def from_mysql(cls, connection, **kwargs):
+        """Carga las tablas desde una conexión de mysql.connector (por ejemplo del pool del repositorio)"""
+        cursor = connection.cursor()
+        frames = []
+        for query in (
+            f"SELECT {', '.join(MOVIE_COLUMNS)} FROM movies",
+            'SELECT id, name FROM actors',
+            'SELECT movies_id, actors_id FROM movie_actors',
+        ):
+            cursor.execute(query)
+            frames.append(pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description]))
+        cursor.close()
+        return cls(*frames, **kwargs)
+
+    @classmethod
+    def from_records(cls, records, **kwargs):
+        """
+        Arma las tablas desde películas como las guardan los repositorios (CSV, JSON Lines,
+        Parquet). Los ids se asignan por orden de aparición, igual que al cargar una base vacía.
+        params:
+            records: list | pd.DataFrame -> películas con 'actors' como lista de nombres
+        """
+        if isinstance(records, pd.DataFrame):
+            records = records.to_dict('records')
+        movies = pd.DataFrame([
+            {column: record.get(column) for column in MOVIE_COLUMNS if column != 'id'} for record in records
+        ], columns=MOVIE_COLUMNS[1:])
+        movies.insert(0, 'id', np.arange(1, len(movies) + 1))
+
+        cast = [list(dict.fromkeys(name for name in (record.get('actors') or []) if name)) for record in records]
+        names = pd.unique(pd.Series([name for names in cast for name in names], dtype=object))
+        actors = pd.DataFrame({'id': np.arange(1, len(names) + 1), 'name': names})
+        actor_ids = pd.Series(actors['id'].to_numpy(), index=actors['name'])
+        links = pd.DataFrame({
+            'movies_id': np.repeat(movies['id'].to_numpy(), [len(names) for names in cast]),
+            'actors_id': actor_ids.reindex([name for names in cast for name in names]).to_numpy(),
+        })
+        return cls(movies, actors, links, **kwargs)
+
+    @property
+    def version(self):
+        """Hash del contenido del dataset: cambia solo si cambian los datos"""
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(b'text' if self.stored_text else b'numeric')
+            for frame in (self.movies, self.actors, self.links):
+                digest.update(','.join(map(str, frame.columns)).encode('utf-8'))
+                digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+            self._version = digest.hexdigest()
+        return self._version
+
+    def _cached(self, key, compute):
+        """Resultado en memoria o en disco para esta versión; si no existe se calcula y se guarda"""
+        if key in self._results:
+            return self._results[key].copy()
+        path = os.path.join(self.cache_dir, self.version, f"{key}.pkl") if self.cache_dir else None
+        if path and os.path.exists(path):
+            result = pd.read_pickle(path)
+        else:
+            result = compute()
+            if path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                result.to_pickle(path)
+                self._prune_cache()
+        self._results[key] = result
+        return result.copy()
+
+    def _prune_cache(self):
+        """Conserva solo las últimas versiones del dataset en la caché de disco"""
+        versions = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.is_dir()),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        for entry in versions[ANALYTICS_CONFIG['max_cached_versions']:]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def top_duration_by_decade(self, limit=None):
+        """Consulta 1: las películas de mayor duración de cada década (ROW_NUMBER() <= limit)"""
+        limit = limit or ANALYTICS_CONFIG['top_per_decade']
+
+        def compute():
+            df = self.movies[['id', 'title', 'year', 'duration']].copy()
+            if self.stored_text:
+                # FLOOR(year / 10) * 10 sobre TEXT: '1994' / 10 es división entera, '' cae en la década 0
+                year, year_int = sqlite_numbers(df['year'].to_numpy())
+                df['decada'] = sqlite_divide(year, year_int, 10.0, True)[0] * 10
+            else:
+                df['decada'] = np.floor(df['year'] / 10) * 10
+            # duration DESC con NULL al final, como MySQL; los empates quedan por id
+            df = df.sort_values(['duration', 'id'], ascending=[False, True], na_position='last', kind='stable')
+            df['rn'] = df.groupby('decada', dropna=False, sort=False).cumcount() + 1
+            df = df[df['rn'] <= limit]
+            df = df.sort_values(['decada', 'rn'], na_position='first', kind='stable')
+            return df[['title', 'year', 'duration', 'decada']].reset_index(drop=True)
+
+        return self._cached(f"top_duration_by_decade-{limit}", compute)
+
+    def rating_stddev_by_year(self):
+        """Consulta 2: ROUND(STDDEV(rating), 2) por año; STDDEV de MySQL es poblacional (ddof=0)"""
+        def compute():
+            movies = self.movies
+            if self.stored_text:
+                # STDDEV convierte el texto a número; el año agrupa como texto ('' aparte de NULL)
+                movies = movies.assign(rating=sqlite_numbers(movies['rating'].to_numpy())[0])
+            grouped = movies.groupby('year', dropna=False, sort=False)['rating']
+            result = grouped.std(ddof=0).rename('std_dev').reset_index()
+            result['std_dev'] = round_half_even(result['std_dev'].to_numpy(), 2)
+            return result.sort_values('year', na_position='first', kind='stable').reset_index(drop=True)
+
+        return self._cached('rating_stddev_by_year', compute)
+
+    def rating_metascore_gaps(self, threshold=None):
+        """Consulta 3: películas cuyo rating difiere más de threshold del Metascore normalizado (/10)"""
+        threshold = threshold if threshold is not None else ANALYTICS_CONFIG['gap_threshold']
+
+        def compute():
+            df = self.movies
+            df = df[df['rating'].notna() & df['metascore'].notna()]
+            if self.stored_text:
+                # Aritmética de SQLite sobre TEXT: '85' / 10 = 8 y entre enteros se trunca
+                rating, rating_int = sqlite_numbers(df['rating'].to_numpy())
+                metascore, metascore_int = sqlite_numbers(df['metascore'].to_numpy())
+                normalized, normalized_int = sqlite_divide(metascore, metascore_int, 10.0, True)
+                gap = np.abs(rating - normalized)
+                ratio = sqlite_divide(gap, rating_int & normalized_int, rating, rating_int)[0]
+            else:
+                rating = df['rating'].to_numpy()
+                gap = np.abs(rating - df['metascore'].to_numpy() / 10)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratio = gap / rating
+            # rating = 0 daría división por cero: el SQL da NULL y la fila no pasa el filtro
+            ratio = np.where(rating == 0, np.nan, ratio)
+            mask = ratio > threshold
+            result = df.loc[mask, ['title', 'year', 'detail_url', 'rating', 'metascore']].copy()
+            result['diferencia'] = round_half_even(gap[mask], 2)
+            result['diferencia_porcentual'] = round_half_even(ratio[mask] * 100, 2)
+            return result.sort_values('diferencia_porcentual', kind='stable').reset_index(drop=True)
+
+        return self._cached(f"rating_metascore_gaps-{threshold}", compute)
+
+    def lead_actors(self, actor_name=None):
+        """
+        Vista 4: actor principal de cada película (el de menor id en movie_actors)
+        params:
+            actor_name: str -> filtra las películas de ese actor principal
+        """
+        def compute():
+            lead = self.links.groupby('movies_id', as_index=False)['actors_id'].min()
+            result = lead.merge(self.movies[['id', 'title']], left_on='movies_id', right_on='id')
+            result = result.merge(self.actors, left_on='actors_id', right_on='id', suffixes=('', '_actor'))
+            result = result.rename(columns={'movies_id': 'movie_id', 'actors_id': 'actor_id', 'name': 'actor_name'})
+            return result[['movie_id', 'title', 'actor_id', 'actor_name']].sort_values('movie_id').reset_index(drop=True)
+
+        result = self._cached('lead_actors', compute)
+        if actor_name is not None:
+            result = result[result['actor_name'] == actor_name].reset_index(drop=True)
+        return result
+
+    def run_all(self):
+        """Ejecuta las cuatro consultas; retorna dict nombre -> DataFrame"""
+        results = {
+            'top_duration_by_decade': self.top_duration_by_decade(),
+            'rating_stddev_by_year': self.rating_stddev_by_year(),
+            'rating_metascore_gaps': self.rating_metascore_gaps(),
+            'lead_actors': self.lead_actors(),
+        }
+        log_info(
+            f"Consultas analíticas sobre {len(self.movies)} películas (versión {self.version[:12]}): "
+            + ", ".join(f"{name} {len(result)} filas" for name, result in results.items())
+        )
+        return results
@@ -0,0 +1,221 @@
+# Benchmark de las consultas analíticas: SQL (SQLite / MySQL) vs. AnalyticsEngine en pandas
+#
+#   python benchmarks/bench_analytics.py [peliculas] [actores_por_pelicula] [--mysql]
+#
+# Ejecuta las consultas de entregables/consultas_analiticas.sql tal como están escritas sobre la
+# base que escribe SQLiteRepository (year, rating y metascore en TEXT), con las funciones de MySQL
+# que SQLite no tiene (FLOOR, STDDEV poblacional y ROUND con mitad al par sobre DOUBLE), y verifica
+# que AnalyticsEngine.from_sqlite devuelva exactamente lo mismo. Termina con código 1 si difieren.
+# La paridad con MySQL NO está verificada: --mysql compara contra un servidor real (BORRA los
+# datos de la base configurada, ver bench_mysql_bulk.py) y todavía no se corrió contra uno.
+import logging
+import math
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from analytics.analytics_engine import AnalyticsEngine  # noqa: E402
+from bench_sqlite_bulk import build_dataset  # noqa: E402
+from repositories.sqlite_repository import SQLiteRepository  # noqa: E402
+
+SQL_PATH = os.path.join(ROOT, 'entregables', 'consultas_analiticas.sql')
+QUERY_NAMES = ['top_duration_by_decade', 'rating_stddev_by_year', 'rating_metascore_gaps', 'lead_actors']
+
+
+def load_queries(path=SQL_PATH):
+    """Las cuatro consultas del archivo; de la vista se toma el SELECT que la define"""
+    with open(path, encoding='utf-8') as f:
+        sql = ''.join(line for line in f if not line.strip().startswith('--'))
+    statements = [s.strip() for s in re.split(r';|(?=CREATE VIEW)', sql) if s.strip()]
+    statements[-1] = re.sub(r'^CREATE VIEW \w+ AS', '', statements[-1]).strip()
+    return dict(zip(QUERY_NAMES, statements))
+
+
+class StdDev:
+    """STDDEV de MySQL: desviación poblacional, NULL si el grupo no tiene valores"""
+
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        if value is not None:
+            self.values.append(to_double(value))
+
+    def finalize(self):
+        return float(np.std(self.values)) if self.values else None
+
+
+def to_double(value):
+    """Conversión implícita de MySQL de texto a DOUBLE: lo que no es número vale 0"""
+    if isinstance(value, str):
+        match = re.match(r'\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?', value)
+        return float(match.group(0)) if match else 0.0
+    return value
+
+
+def register_mysql_functions(conn):
+    conn.create_function('FLOOR', 1, lambda value: None if value is None else math.floor(value), deterministic=True)
+    conn.create_function('ROUND', 2, mysql_round, deterministic=True)
+    conn.create_aggregate('STDDEV', 1, StdDev)
+
+
+def mysql_round(value, decimals=0):
+    """ROUND de MySQL sobre DOUBLE (rint: mitad al par); el de SQLite redondea lejos del cero"""
+    return None if value is None else float(np.round(value, decimals))
+
+
+def repository_queries(queries):
+    """Las consultas con los nombres de columna de SQLiteRepository (movie_id/actor_id en la relación)"""
+    return {
+        name: re.sub(r'\bactors_id\b', 'actor_id', re.sub(r'\bmovies_id\b', 'movie_id', query))
+        for name, query in queries.items()
+    }
+
+
+def run_sql(cursor, queries):
+    results = {}
+    for name, query in queries.items():
+        cursor.execute(query)
+        results[name] = pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+    return results
+
+
+def compare(name, expected, actual):
+    """Compara un resultado SQL con el del motor; retorna un texto con la diferencia o None"""
+    expected = expected.copy()
+    for column in expected.columns:
+        if column in actual.columns and pd.api.types.is_numeric_dtype(actual[column]):
+            expected[column] = pd.to_numeric(expected[column]).astype('float64')
+            actual[column] = actual[column].astype('float64')
+    if list(expected.columns) != list(actual.columns) or len(expected) != len(actual):
+        return f"columnas/filas distintas: {list(expected.columns)} {len(expected)} vs {list(actual.columns)} {len(actual)}"
+    if name == 'top_duration_by_decade':
+        # Los empates de duración no tienen un orden definido en SQL: se comparan década y duración
+        keys = ['decada', 'duration']
+        expected = expected[keys].sort_values(keys, na_position='first').reset_index(drop=True)
+        actual = actual[keys].sort_values(keys, na_position='first').reset_index(drop=True)
+    elif name == 'rating_metascore_gaps':
+        # Empates en diferencia_porcentual: mismo conjunto de filas en cualquier orden
+        keys = ['diferencia_porcentual', 'title']
+        expected = expected.sort_values(keys).reset_index(drop=True)
+        actual = actual.sort_values(keys).reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_exact=False, rtol=1e-12)
+    except AssertionError as e:
+        return str(e).splitlines()[0]
+    return None
+
+
+def timed(function, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def report(backend, sql_ms, sql_results, engine_results):
+    errors = {name: compare(name, sql_results[name], engine_results[name].copy()) for name in QUERY_NAMES}
+    status = 'iguales' if not any(errors.values()) else 'DISTINTOS'
+    print(f"{backend:22s} {sql_ms:8.1f} ms   resultados {status}")
+    for name, error in errors.items():
+        if error:
+            print(f"    {name}: {error}")
+    return not any(errors.values())
+
+
+def with_nulls(data):
+    """Algunos títulos sin año, rating o Metascore, o con valores raros, como llegan del scraping a veces"""
+    for i, movie in enumerate(data):
+        if i % 97 == 0:
+            movie['year'] = ''
+        if i % 89 == 0:
+            movie['rating'] = None
+        if i % 83 == 0:
+            movie.pop('metascore')
+        if i % 79 == 0:
+            movie['rating'] = '8'
+        if i % 73 == 0:
+            movie['metascore'] = ''
+    return data
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    movies = int(args[0]) if len(args) > 0 else 20000
+    actors_per_movie = int(args[1]) if len(args) > 1 else 15
+    logging.disable(logging.CRITICAL)
+    data = with_nulls(build_dataset(movies, actors_per_movie))
+    queries = load_queries()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        repository = SQLiteRepository('analytics.db', data_dir)
+        repository.save(data)
+        cache_dir = os.path.join(data_dir, 'cache')
+
+        print(f"{movies} películas x {actors_per_movie} actores")
+        load_ms, engine = timed(lambda: AnalyticsEngine.from_sqlite(repository.db_path, cache_dir=cache_dir), repeat=1)
+        cold_ms, engine_results = timed(lambda: AnalyticsEngine(
+            engine.movies, engine.actors, engine.links, cache_dir=False, stored_text=True
+        ).run_all())
+        engine.run_all()
+        warm_ms, _ = timed(engine.run_all)
+        disk_ms, _ = timed(lambda: AnalyticsEngine(
+            engine.movies, engine.actors, engine.links, cache_dir=cache_dir, stored_text=True
+        ).run_all())
+        print(f"{'motor: carga SQLite':22s} {load_ms:8.1f} ms")
+        print(f"{'motor: cálculo':22s} {cold_ms:8.1f} ms")
+        print(f"{'motor: caché en disco':22s} {disk_ms:8.1f} ms   (versión {engine.version[:12]}, incluye el hash)")
+        print(f"{'motor: caché memoria':22s} {warm_ms:8.1f} ms")
+
+        # El SQL sobre la base tal como la guarda el repositorio (columnas TEXT)
+        conn = sqlite3.connect(repository.db_path)
+        register_mysql_functions(conn)
+        try:
+            sqlite_ms, sqlite_results = timed(lambda: run_sql(conn.cursor(), repository_queries(queries)))
+        finally:
+            conn.close()
+        equal = report('SQLite (SQL)', sqlite_ms, sqlite_results, engine_results)
+
+    if '--mysql' in sys.argv:
+        equal = run_mysql(data, queries) and equal
+    return equal
+
+
+def run_mysql(data, queries):
+    try:
+        from mysql.connector import Error
+        from repositories.mysql_repository import MySQLRepository
+    except ImportError as e:
+        print(f"MySQL no disponible: {e}")
+        return True
+    repository = MySQLRepository()
+    try:
+        repository._get_pool()
+    except Error as e:
+        print(f"No se pudo conectar a MySQL ({repository.host}:{repository.port}): {e}")
+        return True
+    repository.delete_all()
+    repository.save(data)
+    connection = repository._get_connection()
+    try:
+        mysql_ms, mysql_results = timed(lambda: run_sql(connection.cursor(), queries))
+        # Los ids de MySQL pueden no coincidir con los de SQLite: el motor se arma desde MySQL
+        engine_results = AnalyticsEngine.from_mysql(connection, cache_dir=False).run_all()
+    finally:
+        connection.close()
+        repository.delete_all()
+    return report('MySQL (SQL)', mysql_ms, mysql_results, engine_results)
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,84 @@
+# Benchmark de escritura en MySQL: fila por fila (camino anterior) vs. carga multi-fila
+#
+#   MYSQL_HOST=127.0.0.1 MYSQL_PASSWORD=... python benchmarks/bench_mysql_bulk.py [peliculas] [actores_por_pelicula]
+#
+# Necesita un MySQL con el esquema de entregables/create.sql (ver readme). Cada modo
+# empieza con las tablas vacías: el benchmark BORRA los datos de la base configurada.
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mysql.connector import Error  # noqa: E402
+from bench_sqlite_bulk import build_dataset  # noqa: E402
+from config import MYSQL_CONFIG  # noqa: E402
+from repositories.mysql_repository import MySQLRepository  # noqa: E402
+
+
+def save_row_by_row(repository, data):
+    """Camino anterior: una conexión nueva, un INSERT por película y SELECT + INSERT por actor"""
+    connection = repository._get_connection()
+    cursor = connection.cursor()
+    movie_id = repository._next_id(cursor, 'movies')
+    actor_id = repository._next_id(cursor, 'actors')
+    link_id = repository._next_id(cursor, 'movie_actors')
+    for movie in data:
+        cursor.execute('''
+            INSERT INTO movies (id, title, year, rating, duration, metascore, detail_url, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+        ''', (movie_id, movie['title'], int(movie['year']), float(movie['rating']), movie['duration'],
+              int(movie['metascore']), movie['detail_url']))
+        for actor_name in movie['actors']:
+            cursor.execute('SELECT id FROM actors WHERE name = %s', (actor_name,))
+            result = cursor.fetchone()
+            if result:
+                current_actor_id = result[0]
+            else:
+                current_actor_id = actor_id
+                cursor.execute('INSERT INTO actors (id, name, created_at) VALUES (%s, %s, NOW())', (actor_id, actor_name))
+                actor_id += 1
+            cursor.execute('INSERT INTO movie_actors (id, movies_id, actors_id, create_at) VALUES (%s, %s, %s, NOW())',
+                           (link_id, movie_id, current_actor_id))
+            link_id += 1
+        movie_id += 1
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+def main():
+    movies = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    actors_per_movie = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    logging.disable(logging.CRITICAL)
+    data = build_dataset(movies, actors_per_movie)
+    rows = movies * (1 + actors_per_movie)
+
+    repository = MySQLRepository()
+    try:
+        repository._get_pool()
+    except Error as e:
+        print(f"No se pudo conectar a MySQL ({repository.host}:{repository.port}): {e}")
+        return
+
+    modes = [('fila a fila', save_row_by_row), ('multi-fila', None)]
+    if MYSQL_CONFIG['load_data_infile']:
+        modes.append(('load data', None))
+    for mode, save in modes:
+        repository.delete_all()
+        repository.load_data_infile = mode == 'load data'
+        start = time.perf_counter()
+        if save:
+            save(repository, data)
+        else:
+            repository.save(data)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:12s} {movies} películas x {actors_per_movie} actores  {elapsed * 1000:8.1f} ms  "
+              f"{rows / elapsed:10.0f} filas/s")
+    repository.delete_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Benchmark de lectura para análisis: CSV (listas como texto) vs. dataset Parquet por década
+#
+#   python benchmarks/bench_parquet_load.py [peliculas] [actores_por_pelicula]
+#
+# Mide cargar el dataset completo y una consulta filtrada (década 1990, rating > 8.5)
+# tal como la haría un analista en pandas.
+import ast
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+import pyarrow.dataset as ds  # noqa: E402
+from bench_sqlite_bulk import build_dataset  # noqa: E402
+from repositories.csv_repository import CSVRepository  # noqa: E402
+from repositories.parquet_repository import ParquetRepository  # noqa: E402
+
+
+def write_legacy_csv(path, data):
+    """Formato anterior del CSV: listas guardadas con su repr de Python"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(data[0].keys()))
+        writer.writeheader()
+        writer.writerows(data)
+
+
+def load_legacy_csv(path):
+    df = pd.read_csv(path)
+    df['actors'] = df['actors'].map(ast.literal_eval)
+    return df
+
+
+def load_csv(path):
+    df = pd.read_csv(path)
+    df['actors'] = df['actors'].fillna('').str.split('|')
+    return df
+
+
+def filter_csv(df):
+    return df[(df['year'] // 10 * 10 == 1990) & (df['rating'] > 8.5)]
+
+
+def timed(function, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    movies = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    actors_per_movie = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    logging.disable(logging.CRITICAL)
+    data = build_dataset(movies, actors_per_movie)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        legacy_path = os.path.join(data_dir, 'legacy.csv')
+        write_legacy_csv(legacy_path, data)
+        csv_repository = CSVRepository('movies', data_dir)
+        csv_repository.save(data)
+        parquet_repository = ParquetRepository(os.path.join(data_dir, 'movies_parquet'))
+        parquet_repository.save(data)
+        where = (ds.field('decade') == 1990) & (ds.field('rating') > 8.5)
+
+        cases = [
+            ('CSV anterior (repr)', lambda: load_legacy_csv(legacy_path),
+             lambda: filter_csv(load_legacy_csv(legacy_path))),
+            ('CSV con |', lambda: load_csv(csv_repository.filepath),
+             lambda: filter_csv(load_csv(csv_repository.filepath))),
+            ('Parquet', lambda: parquet_repository.load(),
+             lambda: parquet_repository.load(where=where, columns=['title', 'year', 'rating', 'actors'])),
+        ]
+        print(f"{movies} películas x {actors_per_movie} actores")
+        for name, load_all, load_filtered in cases:
+            full_ms, full = timed(load_all)
+            filtered_ms, filtered = timed(load_filtered)
+            print(f"{name:20s} completo {full_ms:8.1f} ms ({len(full)} filas)   "
+                  f"filtrado {filtered_ms:8.1f} ms ({len(filtered)} filas)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Benchmark del parseo en procesos: páginas de detalle por segundo según parse_workers
+#
+#   python benchmarks/bench_parse_workers.py [paginas]
+#
+# Aísla la etapa de parseo de AsyncDetailEngine: el mismo cuerpo HTML se envía a un
+# ProcessPoolExecutor y solo vuelve el registro compacto (metascore, actores).
+# Usa POC/html_top.html, que no trae el JSON de detalle: todas las páginas pasan por
+# los selectores CSS, el caso que más CPU consume.
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from crawler.async_detail_engine import parse_detail  # noqa: E402
+
+FIXTURE = os.path.join(ROOT, 'POC', 'html_top.html')
+WORKERS = [1, 2, 4, 8]
+
+
+def _silence_logs():
+    logging.disable(logging.CRITICAL)
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+def run(workers, urls, content):
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_silence_logs
+    ) as pool:
+        # Arranque de los procesos fuera de la medición
+        list(pool.map(_warm_up, range(workers)))
+        start = time.perf_counter()
+        results = list(pool.map(parse_detail, urls, [content] * len(urls)))
+        elapsed = time.perf_counter() - start
+    return len(results) / elapsed, elapsed
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with open(FIXTURE, 'rb') as f:
+        content = f.read()
+    urls = [f'https://www.imdb.com/title/tt{i:07d}/' for i in range(1, pages + 1)]
+
+    print(f"{pages} páginas, {os.cpu_count()} núcleos disponibles")
+    baseline = None
+    for workers in WORKERS:
+        pages_per_second, elapsed = run(workers, urls, content)
+        baseline = baseline or pages_per_second
+        print(f"parse_workers={workers}  {elapsed:6.2f}s  {pages_per_second:7.1f} páginas/s  x{pages_per_second / baseline:.2f}")
+
+
+if __name__ == '__main__':
+    main()
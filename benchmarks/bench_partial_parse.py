@@ -0,0 +1,66 @@
+# Benchmark de memoria: DOM completo retenido vs. parseo parcial con liberación
+#
+#   python benchmarks/bench_partial_parse.py [paginas]
+#
+# Cada modo corre en un subproceso propio para que el pico de RSS no se mezcle.
+# Usa POC/html_top.html como cuerpo de cada página de detalle: no trae el JSON
+# de detalle, así que todas pasan por el respaldo de selectores CSS (el peor caso).
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURE = os.path.join(ROOT, 'POC', 'html_top.html')
+MODES = ['full', 'partial']
+
+
+def current_rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def run_mode(mode, pages):
+    import logging
+    import resource
+    from config import SCRAPING_CONFIG
+    from pages.imdb_detail_page import IMDBDetailPage
+
+    logging.disable(logging.CRITICAL)
+    SCRAPING_CONFIG['partial_parse'] = mode == 'partial'
+    with open(FIXTURE, 'rb') as f:
+        content = f.read()
+
+    start = time.perf_counter()
+    checkpoints = []
+    for i in range(1, pages + 1):
+        page = IMDBDetailPage(f'https://www.imdb.com/title/tt{i:07d}/', content=content)
+        if mode == 'full':
+            # Comportamiento anterior: DOM completo que queda vivo hasta que pase el GC
+            page.load_page()
+            page.soup
+            page._get_metascore_from_css()
+            page._get_actors_from_css()
+        else:
+            page.extract_data()
+        if i % max(1, pages // 5) == 0:
+            checkpoints.append(f"{i}:{current_rss_mb():.0f}MB")
+    elapsed = time.perf_counter() - start
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:8s} {pages} páginas  {elapsed:6.2f}s  pico RSS {peak_mb:7.1f} MB  RSS: {' '.join(checkpoints)}")
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    if len(sys.argv) > 2:
+        run_mode(sys.argv[2], pages)
+        return
+    for mode in MODES:
+        subprocess.run([sys.executable, __file__, str(pages), mode], check=True)
+
+
+if __name__ == '__main__':
+    main()
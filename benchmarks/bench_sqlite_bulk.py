@@ -0,0 +1,85 @@
+# Benchmark de escritura en SQLite: fila por fila (camino anterior) vs. carga masiva
+#
+#   python benchmarks/bench_sqlite_bulk.py [peliculas] [actores_por_pelicula]
+#
+# Datos sintéticos con actores repetidos entre películas, como en el ranking real.
+# Cada modo escribe en una base nueva dentro de un directorio temporal.
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from repositories.sqlite_repository import SQLiteRepository  # noqa: E402
+
+
+def build_dataset(movies, actors_per_movie):
+    random.seed(42)
+    cast_pool = [f"Actor {i}" for i in range(movies * actors_per_movie // 4)]
+    return [
+        {
+            'title': f"Movie {i}",
+            'year': str(1950 + i % 70),
+            'rating': f"{7 + (i % 30) / 10:.1f}",
+            'duration': 90 + i % 90,
+            'metascore': str(50 + i % 50),
+            'detail_url': f"https://www.imdb.com/title/tt{i:07d}/",
+            'actors': random.sample(cast_pool, actors_per_movie),
+        }
+        for i in range(movies)
+    ]
+
+
+def save_row_by_row(repository, data):
+    """Camino anterior: un INSERT por película y SELECT + INSERT por actor"""
+    with sqlite3.connect(repository.db_path) as conn:
+        cursor = conn.cursor()
+        for movie in data:
+            cursor.execute('''
+                INSERT INTO movies (title, year, rating, duration, metascore, detail_url)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (movie['title'], movie['year'], movie['rating'], movie['duration'],
+                  movie['metascore'], movie['detail_url']))
+            movie_id = cursor.lastrowid
+            for actor_name in movie['actors']:
+                cursor.execute('SELECT id FROM actors WHERE name = ?', (actor_name,))
+                result = cursor.fetchone()
+                if result:
+                    actor_id = result[0]
+                else:
+                    cursor.execute('INSERT INTO actors (name) VALUES (?)', (actor_name,))
+                    actor_id = cursor.lastrowid
+                try:
+                    cursor.execute('INSERT INTO movie_actors (movie_id, actor_id) VALUES (?, ?)', (movie_id, actor_id))
+                except sqlite3.IntegrityError:
+                    pass
+        conn.commit()
+
+
+def main():
+    movies = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    actors_per_movie = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    logging.disable(logging.CRITICAL)
+    data = build_dataset(movies, actors_per_movie)
+    rows = movies * (1 + actors_per_movie)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for mode, save in [('fila a fila', save_row_by_row), ('masivo', None)]:
+            repository = SQLiteRepository(f"{mode.replace(' ', '_')}.db", data_dir)
+            start = time.perf_counter()
+            if save:
+                save(repository, data)
+            else:
+                repository.save(data)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:12s} {movies} películas x {actors_per_movie} actores  {elapsed * 1000:8.1f} ms  "
+                  f"{rows / elapsed:10.0f} filas/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -31,9 +31,166 @@ SCRAPING_CONFIG = {
     'max_movies': 250,  # Número máximo de películas a extraer
     'retries': 4,      # Número de reintentos para requests
     'timeout': 10,     # Timeout para requests en segundos
-    'delay_min': 1,    # Delay mínimo entre requests (segundos)
-    'delay_max': 3,    # Delay máximo entre requests (segundos)
+    'max_in_flight': 8,  # Páginas de detalle procesándose en paralelo
+    'parse_workers': 0,  # Procesos para parsear el detalle; 0 parsea en el mismo hilo que descarga
+    'pool_size': 10,   # Conexiones keep-alive por host en el cliente HTTP compartido
+    'pool_hosts': 10,  # Hosts distintos con pool propio por sesión (directa o por proxy)
     'max_actors': 200,   # Número máximo de actores a extraer por película
+    'html_parser': 'lxml',  # Backend de parseo: 'html.parser', 'lxml' o 'selectolax'
+    'partial_parse': True,  # Construir solo los subárboles que declara cada página (SoupStrainer)
+}
+
+# Caché HTTP persistente (opcional) para las páginas descargadas
+HTTP_CACHE_CONFIG = {
+    'enabled': False,
+    'db_path': 'data/http_cache.db',
+    'max_bytes': 500 * 1024 * 1024,  # Tamaño máximo en disco antes de expulsar entradas (LRU)
+    'default_ttl': 6 * 3600,         # TTL por defecto en segundos
+    'ttl_rules': [                   # (patrón de URL, TTL en segundos); gana el primero que coincide
+        (r'/chart/', 3600),
+        (r'/title/tt\d+/', 24 * 3600),
+    ],
+    'vary_cookies': ['international-seo', 'lc-main'],  # Cookies que cambian el contenido de la respuesta
+}
+
+# Archivo de HTML crudo para re-extraer sin volver a descargar
+ARCHIVE_CONFIG = {
+    'enabled': False,
+    'db_path': 'data/page_archive.db',
+    'dictionary_size': 2 * 1024 * 1024,  # Bytes de la primera página usados como diccionario compartido
+    'compression_level': 10,
+    'reextract_workers': None,  # Procesos para re-extraer; None usa todos los núcleos
+}
+
+# Diario de la ejecución para reanudar con --resume tras una caída
+JOURNAL_CONFIG = {
+    'path': 'data/crawl_journal.jsonl',
+    'sync_every': 20,      # Registros escritos entre dos fsync
+    'sync_interval': 2.0,  # Segundos máximos sin fsync
+}
+
+# Modo incremental: se compara el ranking con la última foto guardada
+INCREMENTAL_CONFIG = {
+    'snapshot_path': 'data/chart_snapshot.json',
+    'max_age_hours': 7 * 24,  # Antigüedad máxima del detalle de un título sin cambios
+}
+
+# Flujo continuo (--stream): colas acotadas entre etapas y guardado en micro-lotes
+STREAMING_CONFIG = {
+    'batch_size': 25,   # Películas por lote enviado a cada repositorio
+    'queue_size': 32,   # Capacidad de las colas entre etapas (backpressure)
+}
+
+# Frontera de URLs (--frontier): varias listas semilla, cada título se extrae una vez
+FRONTIER_CONFIG = {
+    'db_path': 'data/frontier.db',
+    'max_titles': 10000,          # Tope de títulos por ejecución
+    'batch_size': 100,            # Títulos de detalle en memoria a la vez
+    'bloom_capacity': 100000,     # URLs esperadas; dimensiona el Bloom filter
+    'bloom_error_rate': 0.001,    # Falsos positivos que se confirman contra SQLite
+    # Páginas de chart con la misma estructura __NEXT_DATA__ que el Top 250; menor prioridad, antes
+    'seeds': [
+        {'name': 'top', 'url': f"{IMDB_BASE_URL}/chart/top/", 'priority': 0, 'max_titles': 250},
+        {'name': 'moviemeter', 'url': f"{IMDB_BASE_URL}/chart/moviemeter/", 'priority': 1, 'max_titles': 100},
+        {'name': 'toptv', 'url': f"{IMDB_BASE_URL}/chart/toptv/", 'priority': 2, 'max_titles': 250},
+        {'name': 'tvmeter', 'url': f"{IMDB_BASE_URL}/chart/tvmeter/", 'priority': 3, 'max_titles': 100},
+        {'name': 'bottom', 'url': f"{IMDB_BASE_URL}/chart/bottom/", 'priority': 4, 'max_titles': 100},
+    ],
+}
+
+# Cola de trabajos compartida (--coordinator / --worker) para repartir el detalle entre procesos
+WORK_QUEUE_CONFIG = {
+    'db_path': 'data/work_queue.db',
+    'lease_seconds': 120,       # Vigencia del lease; si vence, otro worker retoma el trabajo
+    'heartbeat_interval': 30,   # Cada cuánto el worker renueva los leases del lote en curso
+    'max_attempts': 3,          # Intentos por trabajo antes de marcarlo como fallido
+    'batch_size': 10,           # Trabajos que toma un worker por vez
+    'poll_interval': 5,         # Espera cuando todo lo pendiente está tomado por otros workers
+    'optional_sinks': ['mysql'],  # Si fallan se registra el error, pero el trabajo se da por completado
+}
+
+# Repositorios de archivo (CSV y JSON Lines): compresión y formatos habilitados
+FILE_SINK_CONFIG = {
+    'compression': None,       # None, 'gzip' o 'zstd' (si zstandard no está instalado se usa gzip)
+    'compression_level': 6,
+    'jsonl_enabled': True,     # Exporta también data/imdb_top_movies.jsonl junto al CSV
+}
+
+# Dataset Parquet para análisis: columnas tipadas, particionado por década
+PARQUET_CONFIG = {
+    'enabled': True,
+    'dataset_dir': 'data/imdb_movies_parquet',
+    'row_group_size': 64 * 1024,   # Filas máximas por row group (cada uno guarda min/max por columna)
+    'compression': 'zstd',
+}
+
+# Guardado en paralelo en todos los repositorios habilitados (save_data)
+SINK_CONFIG = {
+    'timeouts': {              # Segundos que se espera a cada repositorio
+        'csv': 60,
+        'sqlite': 120,
+        'mysql': 300,
+    },
+    'default_timeout': 120,    # Para repositorios sin timeout propio
+}
+
+# Escritura en MySQL: pool de conexiones e inserciones multi-fila
+MYSQL_CONFIG = {
+    'pool_name': 'imdb_pool',
+    'pool_size': 5,                # Conexiones abiertas en el pool (workers de --stream y --worker)
+    'batch_size': 1000,            # Filas por INSERT multi-fila
+    'load_data_infile': False,     # Camino rápido con LOAD DATA LOCAL INFILE (requiere local_infile=1 en el servidor)
+    'load_data_min_rows': 5000,    # Relaciones mínimas en un guardado para usar LOAD DATA
+}
+
+# Motor analítico en memoria (consultas de entregables/consultas_analiticas.sql)
+ANALYTICS_CONFIG = {
+    'sqlite_path': 'data/imdb_movies.db',   # Base que lee AnalyticsEngine.from_sqlite por defecto
+    'cache_dir': 'data/analytics_cache',    # Resultados por versión (hash) del dataset; None solo en memoria
+    'max_cached_versions': 5,               # Versiones del dataset que se conservan en disco
+    'top_per_decade': 5,                    # Películas más largas por década (consulta 1)
+    'gap_threshold': 0.20,                  # Diferencia relativa rating vs Metascore (consulta 3)
+}
+
+# Reintentos no bloqueantes: backoff con jitter, presupuesto y circuit breaker
+RETRY_CONFIG = {
+    'base_delay': 1,             # Segundos base del backoff exponencial
+    'max_delay': 30,             # Tope del backoff en segundos
+    'max_retry_after': 120,      # Tope para lo que pida el servidor en Retry-After
+    'budget_ratio': 0.2,         # Reintentos que gana el presupuesto por cada request enviado
+    'budget_min_retries': 10,    # Reintentos disponibles al iniciar la ejecución
+    'breaker_failure_threshold': 5,  # Fallos seguidos que abren el circuito de un host/proxy
+    'breaker_cooldown': 30,      # Segundos que el circuito permanece abierto
+}
+
+# Ritmo adaptativo (AIMD) por host y por proxy, compartido por todas las estrategias
+RATE_CONFIG = {
+    'initial_rate': 0.5,         # Requests por segundo al empezar: el ritmo de antes, sube con AIMD
+    'min_rate': 0.2,
+    'max_rate': 5.0,             # Tope: el intervalo mínimo de 0,2 s por host que había antes
+    'increase_step': 0.1,        # Subida aditiva (req/s) por cada respuesta rápida y correcta
+    'decrease_factor': 0.5,      # Corte multiplicativo ante 429/503, error de red o latencia alta
+    'latency_factor': 2.0,       # Latencia "alta": este múltiplo de la latencia habitual
+    'latency_alpha': 0.1,        # Peso de cada muestra en la latencia habitual
+    'latency_min_samples': 5,    # Muestras antes de juzgar la latencia
+    'decrease_cooldown': 1.0,    # Segundos mínimos entre dos cortes del mismo límite
+    'curve_path': 'data/rate_curve.csv',  # Curva de ritmo de la última ejecución
+}
+
+# Pool de proxies de RotativeFetchStrategy, con selección ponderada por salud
+PROXY_POOL_CONFIG = {
+    # 34.41.115.197 (Council Bluffs) ~700 ms, 89.43.31.134 (Turquía) ~420 ms, 218.61.37.79 (China) ~660 ms
+    'proxies': [
+        "http://34.41.115.197:3128",
+        "http://89.43.31.134:3128",
+        "http://218.61.37.79:443",
+    ],
+    'max_in_flight_per_proxy': 2,  # Requests simultáneos como máximo por proxy
+    'ewma_alpha': 0.3,             # Peso de la última muestra en la latencia y tasa de error
+    'initial_latency': 1.0,        # Latencia supuesta (s) de un proxy aún sin muestras
+    'eject_error_rate': 0.5,       # Tasa de error que expulsa al proxy
+    'min_requests_to_eject': 3,    # Muestras mínimas antes de poder expulsar
+    'eject_seconds': 60,           # Tiempo de expulsión antes de volver a probarlo
 }
 
 
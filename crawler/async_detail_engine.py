@@ -0,0 +1,147 @@
+import asyncio
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pages.imdb_detail_page import IMDBDetailPage
+from network.http_client import get_http_client
+from network.retry_policy import get_retry_delay
+from util import log_info, log_error
+from config import SCRAPING_CONFIG
+
+def parse_detail(detail_url, content):
+    """Extrae metascore y actores de un HTML ya descargado (se ejecuta en un proceso del pool)"""
+    return IMDBDetailPage(detail_url, content=content).extract_data()
+
+
+class AsyncDetailEngine:
+    """Obtiene las páginas de detalle en paralelo con concurrencia acotada"""
+
+    def __init__(self, custom_cookies=None, max_in_flight=None, journal=None, parse_workers=None):
+        self.custom_cookies = custom_cookies
+        self.max_in_flight = max_in_flight or SCRAPING_CONFIG['max_in_flight']
+        self.journal = journal
+        self.parse_workers = parse_workers if parse_workers is not None else SCRAPING_CONFIG['parse_workers']
+        self.parse_executor = None
+        self.parse_slots = None
+
+    def run(self, movies_list):
+        """Completa metascore y actores de cada película, conservando el orden original"""
+        return asyncio.run(self._run(movies_list))
+
+    async def _run(self, movies_list):
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        # requests es bloqueante: cada página se procesa en un hilo del pool
+        with self.parse_pool(), ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            await self.prewarm(executor, movies_list)
+
+            tasks = [
+                self.process_movie(semaphore, executor, i, movie, len(movies_list))
+                for i, movie in enumerate(movies_list)
+            ]
+            await asyncio.gather(*tasks)
+
+        return movies_list
+
+    @contextmanager
+    def parse_pool(self):
+        """
+        Pool de procesos para el parseo; con parse_workers en 0 se parsea en el hilo del fetch.
+        También acota las páginas descargadas que esperan su parseo: cada película toma un lugar
+        antes de descargar y lo devuelve al terminar de parsear, así que en memoria hay a lo sumo
+        max_in_flight descargas más dos páginas en cola por proceso de parseo.
+        """
+        self.parse_slots = asyncio.Semaphore(self.max_in_flight + 2 * (self.parse_workers or 1))
+        try:
+            if not self.parse_workers:
+                yield None
+                return
+            # spawn: el pool arranca con hilos de red vivos y un fork los copiaría a medio camino
+            with ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            ) as pool:
+                self.parse_executor = pool
+                try:
+                    yield pool
+                finally:
+                    self.parse_executor = None
+        finally:
+            self.parse_slots = None
+
+    async def prewarm(self, executor, movies_list):
+        """Abre de antemano las conexiones que van a usar los hilos de detalle"""
+        first_url = next((m['detail_url'] for m in movies_list if m['detail_url']), None)
+        if first_url:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                executor,
+                get_http_client().prewarm,
+                first_url,
+                self.max_in_flight
+            )
+
+    async def process_movie(self, semaphore, executor, index, movie, total):
+        if not movie['detail_url']:
+            log_error(f"No se encontró URL de detalle para: {movie['title']}")
+            return
+
+        loop = asyncio.get_running_loop()
+        max_attempts = SCRAPING_CONFIG['retries']
+        holding_slot = False
+        try:
+            for attempt in range(1, max_attempts + 1):
+                # Lugar para la página hasta que se parsee: si el parseo va atrasado, no se descarga más
+                await self.parse_slots.acquire()
+                holding_slot = True
+                async with semaphore:
+                    log_info(f"Procesando película {index+1}/{total}: {movie['title']} (intento {attempt}/{max_attempts})")
+                    try:
+                        content, error = await loop.run_in_executor(
+                            executor,
+                            self._fetch_detail,
+                            movie['detail_url']
+                        )
+                    except Exception as e:
+                        log_error(f"Error procesando detalle de {movie['title']}: {e}")
+                        return
+
+                if content is not None:
+                    break
+                self.parse_slots.release()
+                holding_slot = False
+
+                # El reintento espera fuera del semáforo: otras películas ocupan el hueco mientras tanto
+                delay = get_retry_delay(error, attempt, max_attempts)
+                if delay is None:
+                    log_error(f"Se descarta el detalle de {movie['title']} tras {attempt} intentos: {error}")
+                    return
+                log_info(f"Reintento de {movie['title']} diferido {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+            # El parseo queda fuera del semáforo: el slot de red ya está libre para otra descarga
+            try:
+                metascore, actors = await loop.run_in_executor(
+                    self.parse_executor or executor,
+                    parse_detail,
+                    movie['detail_url'],
+                    content
+                )
+            except Exception as e:
+                log_error(f"Error parseando detalle de {movie['title']}: {e}")
+                return
+        finally:
+            if holding_slot:
+                self.parse_slots.release()
+        # Se escribe sobre el mismo diccionario, el orden de la lista no cambia
+        movie['metascore'] = metascore
+        movie['actors'] = actors
+        if self.journal:
+            self.journal.record_detail(movie['detail_url'], metascore, actors)
+
+    def _fetch_detail(self, detail_url):
+        """Un único intento de descarga; los reintentos los programa el bucle de eventos"""
+        detail_page = IMDBDetailPage(detail_url, self.custom_cookies)
+        if not detail_page.load_page(retries=1):
+            return None, detail_page.fetch_strategy.last_error
+        return detail_page.content, None
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import time
+from util import log_info, log_warning
+from config import INCREMENTAL_CONFIG
+
+# Campos del ranking que, si cambian, obligan a volver a pedir el detalle
+FINGERPRINT_FIELDS = ('title', 'original_title', 'year', 'rating', 'duration', 'genres')
+
+class ChartSnapshot:
+    """Última foto del ranking con la huella de cada título, para refrescar solo lo que cambió"""
+
+    def __init__(self, path=None, max_age_hours=None):
+        self.path = path or INCREMENTAL_CONFIG['snapshot_path']
+        self.max_age = (max_age_hours or INCREMENTAL_CONFIG['max_age_hours']) * 3600
+        self.entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError as e:
+            log_warning(f"Snapshot del ranking ilegible, se hará una extracción completa: {e}")
+            return {}
+
+    @staticmethod
+    def fingerprint(movie, rank):
+        """Huella de un título: posición en el ranking más los campos que muestra el chart"""
+        values = [rank] + [movie.get(field) for field in FINGERPRINT_FIELDS]
+        return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def select_changed(self, movies):
+        """
+        Completa los títulos sin cambios con el detalle guardado y retorna los que hay que pedir
+        params:
+            movies: list -> películas del ranking actual, en orden
+        returns:
+            list -> películas nuevas, cambiadas o con detalle más viejo que max_age
+        """
+        now = time.time()
+        counts = {'new': 0, 'changed': 0, 'expired': 0, 'unchanged': 0}
+        pending = []
+        for rank, movie in enumerate(movies, 1):
+            entry = self.entries.get(movie['detail_url'])
+            if entry is None:
+                counts['new'] += 1
+            elif entry['fingerprint'] != self.fingerprint(movie, rank):
+                counts['changed'] += 1
+            elif now - entry['fetched_at'] > self.max_age:
+                counts['expired'] += 1
+            else:
+                counts['unchanged'] += 1
+                movie['metascore'] = entry['metascore']
+                movie['actors'] = entry['actors']
+                continue
+            pending.append(movie)
+
+        log_info(
+            f"Modo incremental: {counts['new']} nuevas, {counts['changed']} cambiadas, "
+            f"{counts['expired']} vencidas, {counts['unchanged']} sin cambios"
+        )
+        return pending
+
+    def save(self, movies, fetched_urls):
+        """
+        Reemplaza el snapshot por el ranking actual
+        params:
+            movies: list -> películas del ranking con su detalle
+            fetched_urls: set -> detail_url cuyo detalle se pidió en esta ejecución
+        """
+        now = time.time()
+        entries = {}
+        for rank, movie in enumerate(movies, 1):
+            if 'metascore' not in movie:
+                # Sin detalle: que la próxima ejecución lo vuelva a pedir
+                continue
+            previous = self.entries.get(movie['detail_url'])
+            fetched_at = now if movie['detail_url'] in fetched_urls or previous is None else previous['fetched_at']
+            entries[movie['detail_url']] = {
+                'fingerprint': self.fingerprint(movie, rank),
+                'fetched_at': fetched_at,
+                'metascore': movie['metascore'],
+                'actors': movie['actors'],
+            }
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.entries = entries
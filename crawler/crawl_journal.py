@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+import time
+from util import log_info, log_warning
+from config import JOURNAL_CONFIG
+
+CHART_RECORD = "chart"
+DETAIL_RECORD = "detail"
+
+class CrawlJournal:
+    """Diario append-only (JSON Lines) de las extracciones completadas, para reanudar tras una caída"""
+
+    def __init__(self, path=None, sync_every=None, sync_interval=None):
+        self.path = path or JOURNAL_CONFIG['path']
+        self.sync_every = sync_every or JOURNAL_CONFIG['sync_every']
+        self.sync_interval = sync_interval or JOURNAL_CONFIG['sync_interval']
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Lee lo que quedó registrado de una ejecución anterior
+        returns:
+            tuple -> (lista de películas del ranking o None, dict detail_url -> (metascore, actores))
+        """
+        chart = None
+        details = {}
+        if not os.path.exists(self.path):
+            return chart, details
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Una caída a mitad de escritura deja la última línea incompleta
+                    log_warning(f"Línea {line_number} del diario incompleta, se ignora")
+                    continue
+                if record.get('type') == CHART_RECORD:
+                    chart = record['movies']
+                elif record.get('type') == DETAIL_RECORD:
+                    details[record['url']] = (record['metascore'], record['actors'])
+
+        log_info(f"Diario cargado: ranking {'sí' if chart else 'no'}, {len(details)} detalles completados")
+        return chart, details
+
+    def open(self, resume=False):
+        """Abre el diario; sin resume se descarta lo registrado por la ejecución anterior"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self._file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    # Cierra la línea truncada para que el siguiente registro no quede pegado
+                    self._file.write('\n')
+        return self
+
+    def _append(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self._pending += 1
+            # fsync por lotes: cada sync_every registros o cada sync_interval segundos
+            if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def record_chart(self, movies):
+        """Registra la lista del ranking y la fuerza a disco de inmediato"""
+        self._append({'type': CHART_RECORD, 'movies': movies})
+        self.sync()
+
+    def record_detail(self, detail_url, metascore, actors):
+        self._append({'type': DETAIL_RECORD, 'url': detail_url, 'metascore': metascore, 'actors': actors})
+
+    def sync(self):
+        with self._lock:
+            if self._file and self._pending:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def finish(self):
+        """La ejecución terminó y se guardó: no queda nada por reanudar"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
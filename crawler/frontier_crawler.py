@@ -0,0 +1,64 @@
+from pages.imdb_home_page import IMDBHomePage
+from crawler.async_detail_engine import AsyncDetailEngine
+from crawler.url_frontier import UrlFrontier
+from repositories.sink_fanout import BatchSinkTracker
+from util import log_info
+from config import FRONTIER_CONFIG
+
+class FrontierCrawler:
+    """Recorre varias listas de IMDb (semillas) y extrae cada título una sola vez"""
+
+    def __init__(self, repositories, custom_cookies=None, frontier=None, seeds=None, batch_size=None):
+        self.repositories = repositories
+        self.custom_cookies = custom_cookies
+        self.frontier = frontier or UrlFrontier()
+        self.seeds = seeds or FRONTIER_CONFIG['seeds']
+        self.batch_size = batch_size or FRONTIER_CONFIG['batch_size']
+        self.sinks = BatchSinkTracker(repositories)
+
+    def seed(self):
+        """Extrae cada lista semilla y encola sus títulos según la prioridad de la fuente"""
+        for seed in sorted(self.seeds, key=lambda s: s['priority']):
+            movies = IMDBHomePage(seed['url'], self.custom_cookies).extract_data(seed.get('max_titles'))
+            new = 0
+            for movie in movies:
+                if self.frontier.add(movie['detail_url'], seed['priority'], seed['name'], movie):
+                    new += 1
+            self.frontier.commit()
+            log_info(f"Semilla {seed['name']}: {len(movies)} títulos, {new} nuevos en la frontera")
+
+    def run(self, max_titles=None):
+        """
+        Siembra la frontera y extrae el detalle por lotes hasta vaciarla
+        params:
+            max_titles: int -> tope de títulos a extraer en esta ejecución
+        returns:
+            int -> títulos extraídos
+        """
+        max_titles = max_titles or FRONTIER_CONFIG['max_titles']
+        self.frontier.reset()
+        self.sinks.call_all('begin_batches')
+
+        self.seed()
+        engine = AsyncDetailEngine(self.custom_cookies)
+        processed = 0
+        while processed < max_titles:
+            # Solo un lote en memoria; el resto de la frontera espera en SQLite
+            entries = self.frontier.pop_batch(min(self.batch_size, max_titles - processed))
+            if not entries:
+                break
+            movies = [payload for _, payload in entries]
+            engine.run(movies)
+            self.sinks.call_all('save_batch', movies)
+            self.frontier.mark_done([url for url, _ in entries])
+            processed += len(movies)
+            log_info(f"Frontera: {processed} títulos extraídos, {self.frontier.count()} en cola")
+
+        self.sinks.call_all('end_batches')
+        self.frontier.log_report()
+        return processed
+
+    @property
+    def results(self):
+        """Resultado de guardado por repositorio: success, rows, bytes, seconds y error"""
+        return self.sinks.results
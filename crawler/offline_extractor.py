@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pages.imdb_home_page import IMDBHomePage
+from pages.imdb_detail_page import IMDBDetailPage
+from crawler.page_archive import PageArchive, get_page_archive
+from util import log_info, log_error, log_warning
+from config import ARCHIVE_CONFIG, IMDB_TOP_MOVIES_URL
+
+HOME_PAGE_TYPE = IMDBHomePage.__name__
+DETAIL_PAGE_TYPE = IMDBDetailPage.__name__
+
+# Cada proceso del pool abre su propia conexión al archivo
+_worker_archive = None
+
+def _init_worker(db_path):
+    global _worker_archive
+    _worker_archive = PageArchive(db_path)
+
+def _extract_archived_detail(url):
+    """Re-extrae una página de detalle archivada (se ejecuta en un proceso del pool)"""
+    content = _worker_archive.load(url)
+    if content is None:
+        return url, None, []
+    metascore, actors = IMDBDetailPage(url, content=content).extract_data()
+    return url, metascore, actors
+
+
+class OfflineExtractor:
+    """Vuelve a ejecutar la extracción sobre el HTML archivado, sin usar la red"""
+
+    def __init__(self, archive=None, workers=None):
+        self.archive = archive or get_page_archive(force=True)
+        self.workers = workers or ARCHIVE_CONFIG['reextract_workers'] or os.cpu_count()
+
+    def _get_home_url(self):
+        home_urls = self.archive.list_urls(HOME_PAGE_TYPE)
+        if IMDB_TOP_MOVIES_URL in home_urls:
+            return IMDB_TOP_MOVIES_URL
+        return home_urls[-1] if home_urls else None
+
+    def run(self, max_movies=None):
+        """Reconstruye la lista de películas con sus detalles a partir del archivo"""
+        home_url = self._get_home_url()
+        if not home_url:
+            log_error("No hay página de ranking en el archivo")
+            return []
+
+        home_page = IMDBHomePage(home_url, content=self.archive.load(home_url))
+        movies = home_page.extract_data(max_movies)
+        if not movies:
+            return []
+
+        archived = set(self.archive.list_urls(DETAIL_PAGE_TYPE))
+        detail_urls = [m['detail_url'] for m in movies if m['detail_url'] in archived]
+        missing = len(movies) - len(detail_urls)
+        if missing:
+            log_warning(f"{missing} películas sin página de detalle archivada")
+
+        log_info(f"Re-extrayendo {len(detail_urls)} páginas de detalle con {self.workers} procesos")
+        chunksize = max(1, len(detail_urls) // (self.workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.archive.db_path,)
+        ) as executor:
+            results = {
+                url: (metascore, actors)
+                for url, metascore, actors in executor.map(
+                    _extract_archived_detail,
+                    detail_urls,
+                    chunksize=chunksize
+                )
+            }
+
+        for movie in movies:
+            if movie['detail_url'] in results:
+                movie['metascore'], movie['actors'] = results[movie['detail_url']]
+
+        return movies
@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from util import log_info, log_error
+from config import ARCHIVE_CONFIG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_CODEC = "zstd"
+ZLIB_CODEC = "zlib"
+
+# zlib solo aprovecha los últimos 32 KB del diccionario
+ZLIB_MAX_DICTIONARY = 32 * 1024
+
+class PageArchive:
+    """Archivo de HTML crudo comprimido con un diccionario compartido por tipo de página"""
+
+    def __init__(self, db_path=None, dictionary_size=None, compression_level=None):
+        self.db_path = db_path or ARCHIVE_CONFIG['db_path']
+        self.dictionary_size = dictionary_size or ARCHIVE_CONFIG['dictionary_size']
+        self.compression_level = compression_level or ARCHIVE_CONFIG['compression_level']
+        self.codec = ZSTD_CODEC if zstandard else ZLIB_CODEC
+        self._dictionaries = {}
+        self._zstd_dictionaries = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self):
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS dictionaries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    page_type TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    page_type TEXT NOT NULL,
+                    dictionary_id INTEGER NOT NULL,
+                    codec TEXT NOT NULL,
+                    raw_size INTEGER NOT NULL,
+                    body BLOB NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    FOREIGN KEY (dictionary_id) REFERENCES dictionaries (id)
+                )
+            ''')
+            self._conn.commit()
+
+    def _get_dictionary(self, page_type, sample=None):
+        """Obtiene el diccionario vigente del tipo de página; la primera página lo inicializa"""
+        row = self._conn.execute('''
+            SELECT id, data FROM dictionaries
+            WHERE page_type = ? AND codec = ?
+            ORDER BY id DESC LIMIT 1
+        ''', (page_type, self.codec)).fetchone()
+        if row:
+            return row[0], row[1]
+        if sample is None:
+            return None, None
+
+        # Diccionario de contenido crudo: las páginas de IMDb comparten casi todo el marcado
+        if self.codec == ZSTD_CODEC:
+            data = sample[:self.dictionary_size]
+        else:
+            data = sample[-ZLIB_MAX_DICTIONARY:]
+        cursor = self._conn.execute('''
+            INSERT INTO dictionaries (page_type, codec, data, created_at)
+            VALUES (?, ?, ?, ?)
+        ''', (page_type, self.codec, data, time.time()))
+        return cursor.lastrowid, data
+
+    def _load_dictionary(self, dictionary_id):
+        if dictionary_id not in self._dictionaries:
+            row = self._conn.execute(
+                'SELECT codec, data FROM dictionaries WHERE id = ?', (dictionary_id,)
+            ).fetchone()
+            self._dictionaries[dictionary_id] = row
+        return self._dictionaries[dictionary_id]
+
+    def _get_zstd_dictionary(self, dictionary):
+        key = hash(dictionary)
+        if key not in self._zstd_dictionaries:
+            self._zstd_dictionaries[key] = zstandard.ZstdCompressionDict(
+                dictionary,
+                dict_type=zstandard.DICT_TYPE_RAWCONTENT
+            )
+        return self._zstd_dictionaries[key]
+
+    def _compress(self, codec, dictionary, content):
+        if codec == ZSTD_CODEC:
+            zdict = self._get_zstd_dictionary(dictionary)
+            return zstandard.ZstdCompressor(level=self.compression_level, dict_data=zdict).compress(content)
+        compressor = zlib.compressobj(min(self.compression_level, 9), zdict=dictionary)
+        return compressor.compress(content) + compressor.flush()
+
+    def _decompress(self, codec, dictionary, body):
+        if codec == ZSTD_CODEC:
+            if zstandard is None:
+                raise RuntimeError("El archivo usa zstd pero zstandard no está instalado")
+            zdict = self._get_zstd_dictionary(dictionary)
+            return zstandard.ZstdDecompressor(dict_data=zdict).decompress(body)
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return decompressor.decompress(body) + decompressor.flush()
+
+    def store(self, url, content, page_type):
+        """Guarda (o reemplaza) el HTML crudo de la URL"""
+        if not content:
+            return False
+        try:
+            with self._lock:
+                dictionary_id, dictionary = self._get_dictionary(page_type, content)
+                body = self._compress(self.codec, dictionary, content)
+                self._conn.execute('''
+                    INSERT OR REPLACE INTO pages
+                        (url, page_type, dictionary_id, codec, raw_size, body, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (url, page_type, dictionary_id, self.codec, len(content), body, time.time()))
+                self._conn.commit()
+            return True
+        except Exception as e:
+            log_error(f"Error archivando {url}: {e}")
+            return False
+
+    def load(self, url):
+        """Retorna el HTML crudo archivado de la URL, o None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT dictionary_id, codec, body FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            if not row:
+                return None
+            dictionary_id, codec, body = row
+            _, dictionary = self._load_dictionary(dictionary_id)
+        return self._decompress(codec, dictionary, body)
+
+    def list_urls(self, page_type=None):
+        """Lista las URLs archivadas, opcionalmente de un solo tipo de página"""
+        with self._lock:
+            if page_type:
+                rows = self._conn.execute(
+                    'SELECT url FROM pages WHERE page_type = ? ORDER BY fetched_at', (page_type,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute('SELECT url FROM pages ORDER BY fetched_at').fetchall()
+        return [row[0] for row in rows]
+
+    def log_report(self):
+        """Escribe en el log el tamaño del archivo y su ratio de compresión"""
+        with self._lock:
+            count, raw, stored = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(body)), 0) FROM pages'
+            ).fetchone()
+        ratio = raw / stored if stored else 0
+        log_info(
+            f"Archivo de páginas: {count} páginas, {raw / 1024 / 1024:.1f} MB -> "
+            f"{stored / 1024 / 1024:.1f} MB ({ratio:.1f}x, {self.codec})"
+        )
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_page_archive(force=False):
+    """Retorna el archivo de páginas compartido, o None si el modo archivo está apagado"""
+    global _archive
+    if not (force or ARCHIVE_CONFIG['enabled']):
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = PageArchive()
+        return _archive
@@ -0,0 +1,105 @@
+import os
+import socket
+import threading
+import time
+from crawler.async_detail_engine import AsyncDetailEngine
+from crawler.work_queue import WorkQueue
+from util import log_info, log_error, log_warning
+from config import WORK_QUEUE_CONFIG
+
+class QueueWorker:
+    """Toma lotes de la cola de trabajos, extrae el detalle y lo guarda con los repositorios"""
+
+    def __init__(self, repositories, custom_cookies=None, queue=None, worker_id=None,
+                 batch_size=None, heartbeat_interval=None, poll_interval=None, optional_sinks=None):
+        self.repositories = repositories
+        self.optional_sinks = set(optional_sinks if optional_sinks is not None else WORK_QUEUE_CONFIG['optional_sinks'])
+        self.queue = queue or WorkQueue()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size or WORK_QUEUE_CONFIG['batch_size']
+        self.heartbeat_interval = heartbeat_interval or WORK_QUEUE_CONFIG['heartbeat_interval']
+        self.poll_interval = poll_interval or WORK_QUEUE_CONFIG['poll_interval']
+        self.engine = AsyncDetailEngine(custom_cookies)
+        self.processed = 0
+        self.failed = 0
+
+    def _heartbeat(self, job_ids, stop):
+        """Renueva los leases mientras el lote se procesa (hilo con su propia conexión)"""
+        queue = WorkQueue(self.queue.db_path)
+        try:
+            while not stop.wait(self.heartbeat_interval):
+                queue.heartbeat(self.worker_id, job_ids)
+        finally:
+            queue.close()
+
+    def run(self):
+        """Procesa lotes hasta que no quedan trabajos pendientes en la cola"""
+        log_info(f"Worker {self.worker_id} iniciado")
+        while True:
+            jobs = self.queue.lease(self.worker_id, self.batch_size)
+            if not jobs:
+                if not self.queue.has_pending():
+                    break
+                # Lo que queda está tomado por otros workers; se espera por si algún lease vence
+                time.sleep(self.poll_interval)
+                continue
+            self._process_batch(jobs)
+
+        log_info(f"Worker {self.worker_id} terminado: {self.processed} completados, {self.failed} devueltos a la cola")
+        return self.processed
+
+    def _process_batch(self, jobs):
+        job_ids = [job_id for job_id, _ in jobs]
+        movies = [movie for _, movie in jobs]
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_ids, stop), daemon=True)
+        heartbeat.start()
+        try:
+            self.engine.run(movies)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        done = [(job_id, movie) for job_id, movie in jobs if 'metascore' in movie]
+        pending = [job_id for job_id, movie in jobs if 'metascore' not in movie]
+
+        if done:
+            saved = self._save(done)
+            # Vuelve a la cola lo que le falta a algún repositorio obligatorio; el reintento
+            # solo se lo envía a esos, no a los que ya lo guardaron
+            required = set(self.repositories) - self.optional_sinks
+            pending += [job_id for job_id, _ in done if not required <= saved[job_id]]
+            done = [(job_id, movie) for job_id, movie in done if required <= saved[job_id]]
+
+        self.queue.complete(self.worker_id, [job_id for job_id, _ in done])
+        if pending:
+            self.queue.fail(self.worker_id, pending, "sin detalle o error al guardar")
+        self.processed += len(done)
+        self.failed += len(pending)
+
+    def _save(self, jobs):
+        """
+        Envía a cada repositorio solo los trabajos que todavía no guardó (en este intento o en
+        uno anterior) y registra en la cola los que guardó
+        returns:
+            dict -> job_id: set de repositorios que ya tienen el trabajo
+        """
+        saved = self.queue.get_saved_sinks([job_id for job_id, _ in jobs])
+        for name, repository in self.repositories.items():
+            missing = [(job_id, movie) for job_id, movie in jobs if name not in saved[job_id]]
+            if not missing:
+                continue
+            try:
+                success = repository.save_batch([movie for _, movie in missing])
+            except Exception as e:
+                log_error(f"Error guardando lote en {name}: {e}")
+                success = False
+            if not success:
+                if name in self.optional_sinks:
+                    log_warning(f"{name} no guardó {len(missing)} películas; es opcional, los trabajos no se reintentan por él")
+                continue
+            self.queue.mark_saved([job_id for job_id, _ in missing], name)
+            for job_id, _ in missing:
+                saved[job_id].add(name)
+        return saved
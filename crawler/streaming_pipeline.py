@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from crawler.async_detail_engine import AsyncDetailEngine
+from repositories.sink_fanout import BatchSinkTracker
+from util import log_info
+from config import STREAMING_CONFIG
+
+# Marca de fin de flujo entre etapas
+_END = object()
+
+class StreamingPipeline:
+    """
+    Ranking -> detalle -> repositorios como un flujo continuo: las etapas se comunican
+    por colas acotadas (backpressure) y los repositorios reciben micro-lotes en el orden del
+    ranking, de modo que los datos quedan visibles en la base mientras el crawl sigue en curso.
+    Lo acotado son las páginas en vuelo y los lotes; el ranking y sus registros quedan en
+    memoria hasta el final (los usan la foto incremental y el valor de retorno).
+    """
+
+    def __init__(self, repositories, custom_cookies=None, journal=None, batch_size=None, queue_size=None):
+        self.repositories = repositories
+        self.engine = AsyncDetailEngine(custom_cookies, journal=journal)
+        self.batch_size = batch_size or STREAMING_CONFIG['batch_size']
+        self.queue_size = queue_size or STREAMING_CONFIG['queue_size']
+        self.sinks = BatchSinkTracker(repositories)
+        self.rows_written = 0
+
+    def run(self, movies_list, pending_urls=None):
+        """
+        Procesa el ranking de punta a punta
+        params:
+            movies_list: list -> películas del ranking, en orden
+            pending_urls: set -> detail_url que hay que pedir; None las pide todas.
+                          El resto ya trae su detalle y pasa directo a los repositorios
+        returns:
+            dict -> por repositorio: success, rows, bytes, seconds y error (como save_data)
+        """
+        self.sinks.call_all('begin_batches')
+        asyncio.run(self._run(movies_list, pending_urls))
+        # Los repositorios de archivo publican aquí lo escrito durante el flujo
+        self.sinks.call_all('end_batches')
+        log_info(f"Flujo completado: {self.rows_written} películas escritas en lotes de {self.batch_size}")
+        return self.sinks.results
+
+    async def _run(self, movies_list, pending_urls):
+        movies_queue = asyncio.Queue(maxsize=self.queue_size)
+        results_queue = asyncio.Queue(maxsize=self.queue_size)
+        semaphore = asyncio.Semaphore(self.engine.max_in_flight)
+        total = len(movies_list)
+
+        # Más tareas que slots de red: mientras una espera su reintento, otra ocupa el slot
+        workers_count = max(self.engine.max_in_flight, self.queue_size)
+        # Los lotes salen en orden de ranking: los detalles que terminan antes esperan a los
+        # anteriores, y el productor no reparte más allá de window posiciones de la última ya ordenada
+        window = workers_count + 2 * self.queue_size
+        written = asyncio.Condition()
+        next_to_write = 0
+
+        with self.engine.parse_pool(), \
+                ThreadPoolExecutor(max_workers=self.engine.max_in_flight) as executor, \
+                ThreadPoolExecutor(max_workers=1) as writer:
+            await self.engine.prewarm(executor, movies_list)
+
+            async def produce():
+                for index, movie in enumerate(movies_list):
+                    async with written:
+                        await written.wait_for(lambda: index < next_to_write + window)
+                    await movies_queue.put((index, movie))
+                for _ in range(workers_count):
+                    await movies_queue.put(_END)
+
+            async def fetch_details():
+                while True:
+                    item = await movies_queue.get()
+                    if item is _END:
+                        await results_queue.put(_END)
+                        return
+                    index, movie = item
+                    if pending_urls is None or movie['detail_url'] in pending_urls:
+                        await self.engine.process_movie(semaphore, executor, index, movie, total)
+                    await results_queue.put((index, movie))
+
+            async def write_batches():
+                nonlocal next_to_write
+                loop = asyncio.get_running_loop()
+                finished = 0
+                ready = {}
+                batch = []
+                while finished < workers_count:
+                    item = await results_queue.get()
+                    if item is _END:
+                        finished += 1
+                        continue
+                    index, movie = item
+                    ready[index] = movie
+                    while next_to_write in ready:
+                        batch.append(ready.pop(next_to_write))
+                        next_to_write += 1
+                    async with written:
+                        written.notify_all()
+                    while len(batch) >= self.batch_size:
+                        # Mientras se escribe, la cola se llena y frena a los workers
+                        await loop.run_in_executor(writer, self._write_batch, batch[:self.batch_size])
+                        batch = batch[self.batch_size:]
+                if batch:
+                    await loop.run_in_executor(writer, self._write_batch, batch)
+
+            workers = [fetch_details() for _ in range(workers_count)]
+            await asyncio.gather(produce(), write_batches(), *workers)
+
+    def _write_batch(self, batch):
+        self.sinks.call_all('save_batch', batch)
+        self.rows_written += len(batch)
+        log_info(f"Lote de {len(batch)} películas guardado ({self.rows_written} en total)")
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+from util import log_info
+from config import FRONTIER_CONFIG
+
+class BloomFilter:
+    """Conjunto aproximado de URLs vistas: sin falsos negativos y con memoria fija"""
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de un solo digest
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class UrlFrontier:
+    """
+    Frontera de URLs de detalle: colas por prioridad y deduplicación en dos niveles.
+    El Bloom filter descarta en memoria las URLs nuevas; cuando dice "quizás vista"
+    se confirma contra SQLite, que guarda el conjunto exacto y la cola en disco.
+    """
+
+    def __init__(self, db_path=None, capacity=None, error_rate=None):
+        self.db_path = db_path or FRONTIER_CONFIG['db_path']
+        self.capacity = capacity or FRONTIER_CONFIG['bloom_capacity']
+        self.error_rate = error_rate or FRONTIER_CONFIG['bloom_error_rate']
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.stats = {'added': 0, 'duplicates': 0, 'bloom_false_positives': 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_database()
+        for (url,) in self._conn.execute('SELECT url FROM urls'):
+            self.bloom.add(url)
+
+    def _init_database(self):
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS urls (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE NOT NULL,
+                    priority INTEGER NOT NULL,
+                    source TEXT,
+                    payload TEXT,
+                    state TEXT NOT NULL DEFAULT 'queued'
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_urls_queue ON urls (state, priority, seq)')
+            self._conn.commit()
+
+    def reset(self):
+        """Vacía la frontera para empezar un crawl nuevo"""
+        with self._lock:
+            self._conn.execute('DELETE FROM urls')
+            self._conn.commit()
+            self.bloom = BloomFilter(self.capacity, self.error_rate)
+
+    def _is_seen(self, url):
+        if url not in self.bloom:
+            return False
+        if self._conn.execute('SELECT 1 FROM urls WHERE url = ?', (url,)).fetchone():
+            return True
+        self.stats['bloom_false_positives'] += 1
+        return False
+
+    def add(self, url, priority, source=None, payload=None):
+        """
+        Encola una URL si nunca se vio
+        params:
+            url: str -> URL de detalle
+            priority: int -> menor valor, antes se procesa
+            source: str -> lista de origen (semilla)
+            payload: dict -> datos ya extraídos de la lista, se devuelven al desencolar
+        returns:
+            bool -> True si era nueva
+        """
+        with self._lock:
+            if self._is_seen(url):
+                self.stats['duplicates'] += 1
+                return False
+            self._conn.execute(
+                'INSERT INTO urls (url, priority, source, payload) VALUES (?, ?, ?, ?)',
+                (url, priority, source, json.dumps(payload, ensure_ascii=False) if payload is not None else None)
+            )
+            self.bloom.add(url)
+            self.stats['added'] += 1
+            return True
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def pop_batch(self, size):
+        """Toma las siguientes URLs por prioridad y las marca en proceso; retorna (url, payload)"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT seq, url, payload FROM urls
+                WHERE state = 'queued'
+                ORDER BY priority, seq
+                LIMIT ?
+            ''', (size,)).fetchall()
+            self._conn.executemany("UPDATE urls SET state = 'in_progress' WHERE seq = ?", [(row[0],) for row in rows])
+            self._conn.commit()
+        return [(url, json.loads(payload) if payload else None) for _, url, payload in rows]
+
+    def mark_done(self, urls):
+        with self._lock:
+            self._conn.executemany("UPDATE urls SET state = 'done' WHERE url = ?", [(url,) for url in urls])
+            self._conn.commit()
+
+    def count(self, state='queued'):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM urls WHERE state = ?', (state,)).fetchone()[0]
+
+    def log_report(self):
+        stats = self.stats
+        log_info(
+            f"Frontera: {stats['added']} URLs únicas, {stats['duplicates']} duplicadas descartadas, "
+            f"{stats['bloom_false_positives']} falsos positivos del Bloom filter "
+            f"({len(self.bloom.bits) / 1024:.0f} KB en memoria)"
+        )
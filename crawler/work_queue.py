@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from config import WORK_QUEUE_CONFIG
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+class WorkQueue:
+    """
+    Cola de trabajos durable en SQLite compartida por varios procesos (o hosts con un
+    volumen común con bloqueos POSIX, como NFSv4). Cada worker toma URLs con un lease que
+    vence; si el worker muere, el trabajo vuelve a estar disponible al expirar el lease.
+    """
+
+    def __init__(self, db_path=None, lease_seconds=None, max_attempts=None):
+        self.db_path = db_path or WORK_QUEUE_CONFIG['db_path']
+        self.lease_seconds = lease_seconds or WORK_QUEUE_CONFIG['lease_seconds']
+        self.max_attempts = max_attempts or WORK_QUEUE_CONFIG['max_attempts']
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        # isolation_level None: las transacciones se abren a mano con BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        # Journal de rollback y no WAL: WAL necesita memoria compartida (-shm), que no funciona
+        # entre hosts sobre un sistema de archivos de red
+        self._conn.execute('PRAGMA journal_mode=DELETE')
+        self._conn.execute('PRAGMA busy_timeout=30000')
+        self._init_database()
+
+    def _init_database(self):
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE NOT NULL,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                saved_sinks TEXT NOT NULL DEFAULT '[]',
+                updated_at REAL NOT NULL
+            )
+        ''')
+        # Colas creadas antes de registrar los repositorios que ya guardaron cada trabajo
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(jobs)')]
+        if 'saved_sinks' not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN saved_sinks TEXT NOT NULL DEFAULT '[]'")
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, lease_expires)')
+
+    @contextmanager
+    def _transaction(self):
+        """Transacción con bloqueo de escritura desde el inicio, para que dos workers no tomen lo mismo"""
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self._conn
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def reset(self):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM jobs')
+
+    def enqueue(self, movies):
+        """Encola un trabajo por película (la URL de detalle es la clave); retorna cuántos eran nuevos"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO jobs (url, payload, updated_at) VALUES (?, ?, ?)',
+                [(movie['detail_url'], json.dumps(movie, ensure_ascii=False), now) for movie in movies if movie['detail_url']]
+            )
+            added = conn.total_changes - before
+            return added
+
+    def lease(self, worker_id, size):
+        """
+        Toma hasta size trabajos libres o con lease vencido
+        params:
+            worker_id: str -> identificador del worker que toma el lease
+            size: int -> cantidad máxima de trabajos
+        returns:
+            list -> tuplas (job_id, payload)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Leases vencidos sin intentos restantes: el worker murió demasiadas veces con ellos
+            conn.execute('''
+                UPDATE jobs SET state = ?, last_error = 'lease vencido', updated_at = ?
+                WHERE state = ? AND lease_expires < ? AND attempts >= ?
+            ''', (FAILED, now, LEASED, now, self.max_attempts))
+            rows = conn.execute('''
+                SELECT id, payload FROM jobs
+                WHERE (state = ? OR (state = ? AND lease_expires < ?)) AND attempts < ?
+                ORDER BY id
+                LIMIT ?
+            ''', (QUEUED, LEASED, now, self.max_attempts, size)).fetchall()
+            conn.executemany('''
+                UPDATE jobs
+                SET state = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            ''', [(LEASED, worker_id, now + self.lease_seconds, now, job_id) for job_id, _ in rows])
+        return [(job_id, json.loads(payload)) for job_id, payload in rows]
+
+    def heartbeat(self, worker_id, job_ids):
+        """Extiende el lease de los trabajos que el worker sigue procesando"""
+        if not job_ids:
+            return
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                'UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_owner = ? AND state = ?',
+                [(now + self.lease_seconds, now, job_id, worker_id, LEASED) for job_id in job_ids]
+            )
+
+    def get_saved_sinks(self, job_ids):
+        """Repositorios que ya guardaron cada trabajo, en este intento o en uno anterior: dict job_id -> set"""
+        saved = {job_id: set() for job_id in job_ids}
+        for i in range(0, len(job_ids), 500):
+            chunk = job_ids[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT id, saved_sinks FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for job_id, sinks in rows:
+                saved[job_id] = set(json.loads(sinks))
+        return saved
+
+    def mark_saved(self, job_ids, sink):
+        """
+        Registra que el repositorio sink guardó esos trabajos; un reintento o un lease vencido
+        ya no se los vuelve a enviar. No exige el lease: lo guardado quedó guardado igual.
+        """
+        if not job_ids:
+            return
+        now = time.time()
+        with self._transaction() as conn:
+            saved = self.get_saved_sinks(job_ids)
+            conn.executemany(
+                'UPDATE jobs SET saved_sinks = ?, updated_at = ? WHERE id = ?',
+                [(json.dumps(sorted(saved[job_id] | {sink})), now, job_id) for job_id in job_ids]
+            )
+
+    def complete(self, worker_id, job_ids):
+        self._finish(worker_id, job_ids, DONE)
+
+    def fail(self, worker_id, job_ids, error):
+        """Devuelve los trabajos a la cola; los que agotaron sus intentos quedan como fallidos"""
+        self._finish(worker_id, job_ids, QUEUED, error)
+        with self._transaction() as conn:
+            conn.execute(
+                'UPDATE jobs SET state = ? WHERE state = ? AND attempts >= ?',
+                (FAILED, QUEUED, self.max_attempts)
+            )
+
+    def _finish(self, worker_id, job_ids, state, error=None):
+        now = time.time()
+        with self._transaction() as conn:
+            # Solo el dueño del lease vigente puede cerrar el trabajo
+            conn.executemany('''
+                UPDATE jobs
+                SET state = ?, lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND state = ?
+            ''', [(state, error, now, job_id, worker_id, LEASED) for job_id in job_ids])
+
+    def get_counts(self):
+        """Cantidad de trabajos por estado"""
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for state, count in self._conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state'):
+            counts[state] = count
+        return counts
+
+    def has_pending(self):
+        counts = self.get_counts()
+        return counts[QUEUED] + counts[LEASED] > 0
+
+    def close(self):
+        self._conn.close()
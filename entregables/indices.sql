@@ -1,7 +1,11 @@
--- Creación del índice
+-- Creación del índice (SQLiteRepository y MySQLRepository lo crean solos al iniciar)
 CREATE INDEX idx_rating_year ON movies (rating DESC, year);
+-- En SQLite rating es TEXT: sobre el texto, DESC deja '9.1' antes que '10'.
+-- SQLiteRepository lo crea sobre el valor numérico y la consulta debe ordenar por la misma expresión:
+-- CREATE INDEX idx_rating_year ON movies (CAST(rating AS REAL) DESC, year);
+-- SELECT title, year, detail_url, rating FROM movies ORDER BY CAST(rating AS REAL) DESC, year;
 -- Consulta de prueba
 -- SELECT title, year, detail_url, rating FROM movies ORDER BY rating DESC, year;
 -- Tiempos de ejecución comparativos:
 -- Antes del índice   : 0.001749 segundos
--- Después del índice : 0.001044 segundos
\ No newline at end of file
+-- Después del índice : 0.001044 segundos
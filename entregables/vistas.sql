@@ -1,18 +1,14 @@
+-- La tabla movie_lead_actor la crean y mantienen SQLiteRepository y MySQLRepository en cada
+-- guardado (actor de menor id de cada película), así la vista no recalcula ROW_NUMBER()
+-- sobre todo movie_actors en cada consulta.
 CREATE VIEW vista_peliculas_actor_principal AS
       SELECT
         m.id AS movie_id,
         m.title,
         a.id AS actor_id,
         a.name AS actor_name
-      FROM (
-        SELECT
-            ma.movies_id,
-            ma.actors_id,
-            ROW_NUMBER() OVER (PARTITION BY ma.movies_id ORDER BY ma.actors_id) AS orden
-        FROM movie_actors ma
-      ) sub
-      JOIN movies m ON m.id = sub.movies_id
-      JOIN actors a ON a.id = sub.actors_id
-      WHERE sub.orden = 1;
+      FROM movie_lead_actor l
+      JOIN movies m ON m.id = l.movie_id
+      JOIN actors a ON a.id = l.actor_id;
       -- Consulta de prueba
-      -- SELECT * FROM vista_peliculas_actor_principal;
\ No newline at end of file
+      -- SELECT * FROM vista_peliculas_actor_principal WHERE actor_name = 'Morgan Freeman';
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 import requests
-from bs4 import BeautifulSoup
 from util import log_info, log_error
-from config import HEADERS, SCRAPING_CONFIG
+from config import SCRAPING_CONFIG
+from network.http_client import get_http_client
+from network.retry_policy import get_retry_delay, retry_policy, CircuitOpenError
+from network.proxy_pool import get_proxy_pool
 import time
 
 # Constantes para los nombres de estrategia
@@ -12,8 +14,12 @@ STANDARD_STRATEGY = "standard"
 class FetchStrategy(ABC):
     """Estrategia base para fetching de páginas"""
     
+    def __init__(self):
+        self.last_error = None  # Último error de red, para que el llamador decida si reprogramar
+    
     @abstractmethod
     def fetch(self, url, cookies=None, retries=None):
+        """Retorna el requests.Response de la URL, o None si falla; el parseo lo hace la página"""
         pass
 
 class StandardFetchStrategy(FetchStrategy):
@@ -24,119 +30,89 @@ class StandardFetchStrategy(FetchStrategy):
             retries = SCRAPING_CONFIG['retries']
             
         log_info(f"Fetching: {url}")
+        self.last_error = None
         
         for i in range(retries):
             log_info(f"Intento {i+1}/{retries}")
             try:
-                response = requests.get(
+                response = get_http_client().get(
                     url, 
-                    headers=HEADERS, 
-                    timeout=SCRAPING_CONFIG['timeout'], 
-                    cookies=cookies
+                    cookies=cookies,
+                    timeout=SCRAPING_CONFIG['timeout']
                 )
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
                 log_info(f"Successfully fetched {url} 🚀🚀🚀 !!")
-                return soup, response
+                return response
             except requests.exceptions.RequestException as e:
-                time_sleep = self._get_next_time_to_wait(i+1)
+                self.last_error = e
                 log_error(f"Error fetching {url} (Intento {i+1}/{retries}): {e}")
-                log_error(f"Retrying in {time_sleep} seconds...")
+                time_sleep = get_retry_delay(e, i+1, retries)
+                if time_sleep is None:
+                    break
+                log_error(f"Retrying in {time_sleep:.1f} seconds...")
                 time.sleep(time_sleep)
         
         log_error(f"Failed to fetch {url} after {retries} attempts")
-        return None, None
-    
-    def _get_next_time_to_wait(self, i):
-        """Secuencia de Fibonacci para backoff"""
-        if i == 0:
-            return 1
-        elif i == 1:
-            return 1
-        else:
-            return self._get_next_time_to_wait(i-1) + self._get_next_time_to_wait(i-2)
+        return None
 
 
 class RotativeFetchStrategy(FetchStrategy):
     """Estrategia con proxy rotativo con reintentos y backoff exponencial"""
     
-    """
-    218.61.37.79	443	    China	                        660 ms
-    34.41.115.197	3128	United States Council Bluffs	700 ms
-    89.43.31.134	3128	Turkey	                        420 ms
-    """
-    proxies = [
-        {"proxy":"http://34.41.115.197:3128","used":False},
-        {"proxy":"http://89.43.31.134:3128","used":False},
-        {"proxy":"http://218.61.37.79:443","used":False},
-    ]
-    
-    def _reset_proxies(self):
-        """Resetea el estado de los proxies a no usados"""
-        for proxy in self.proxies:
-            proxy['used'] = False
-
-    def _get_rotated_proxy(self):
-        """Obtiene un proxy rotativo no usado"""
-        unused_proxies = [proxy['proxy'] for proxy in self.proxies if not proxy['used']]
-        if not unused_proxies:
-            log_info("Todos los proxies han sido usados, reseteando...")
-            self._reset_proxies()
-            unused_proxies = [proxy['proxy'] for proxy in self.proxies]
-        
-        proxy = unused_proxies[0]
-        for p in self.proxies:
-            if p['proxy'] == proxy:
-                p['used'] = True
-                break
-        log_info(f"Usando proxy: {proxy}")
-        return proxy    
-    
     def fetch(self, url, cookies=None, retries=None):
 
         if retries is None:
             retries = SCRAPING_CONFIG['retries']
             
         log_info(f"Fetching: {url}")
-        self._reset_proxies()  # Resetea proxies al inicio
+        self.last_error = None
+        proxy_pool = get_proxy_pool()
+        tried = set()  # Cada reintento prefiere un proxy distinto
 
         for i in range(retries):
+            proxy_url = proxy_pool.acquire(exclude=tried)
+            if proxy_url is None:
+                log_error(f"No hay proxies disponibles para {url}")
+                break
+            tried.add(proxy_url)
+            start = time.monotonic()
+            # Sin veredicto (None) el proxy vuelve al pool sin afectar su salud
+            success = None
+            latency = None
+            time_sleep = None
             try:
-                proxy_url = self._get_rotated_proxy()
-                custom_proxy = {
-                    "http": proxy_url,
-                    "https": proxy_url
-                }
                 log_info(f"Intento {i+1}/{retries} con proxy {proxy_url}")
 
-                response = requests.get(
+                response = get_http_client().get(
                     url, 
-                    proxies=custom_proxy,
-                    headers=HEADERS, 
-                    timeout=SCRAPING_CONFIG['timeout'], 
-                    cookies=cookies
+                    cookies=cookies,
+                    proxy=proxy_url,
+                    timeout=SCRAPING_CONFIG['timeout']
                 )
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
+                success = True
+                latency = time.monotonic() - start
                 log_info(f"Successfully fetched {url} 🚀🚀🚀 !!")
-                return soup, response
+                return response
             except requests.exceptions.RequestException as e:
-                time_sleep = self._get_next_time_to_wait(i+1)
+                # Un circuito abierto no llegó a usar el proxy; un 404 es respuesta válida del sitio.
+                # Solo los errores transitorios restan salud
+                if not isinstance(e, CircuitOpenError):
+                    success = not retry_policy.is_retryable(e)
+                    latency = time.monotonic() - start if success else None
+                self.last_error = e
                 log_error(f"Error fetching {url} (Intento {i+1}/{retries}): {e}")
-                log_error(f"Retrying in {time_sleep} seconds...")
-                time.sleep(time_sleep)
+                time_sleep = get_retry_delay(e, i+1, retries)
+            finally:
+                # Se devuelve antes del backoff, y también si el error no es de red
+                proxy_pool.release(proxy_url, latency, success=success)
+            if time_sleep is None:
+                break
+            log_error(f"Retrying in {time_sleep:.1f} seconds...")
+            time.sleep(time_sleep)
         
         log_error(f"Failed to fetch {url} after {retries} attempts")
-        return None, None
-    
-    def _get_next_time_to_wait(self, i):
-        """Secuencia de Fibonacci para backoff"""
-        if i == 0:
-            return 1
-        elif i == 1:
-            return 1
-        else:
-            return self._get_next_time_to_wait(i-1) + self._get_next_time_to_wait(i-2)
+        return None
 
 class FetchFactory:
     """Factory para crear estrategias de fetching"""
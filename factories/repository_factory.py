@@ -0,0 +1,30 @@
+from repositories.csv_repository import CSVRepository
+from repositories.jsonl_repository import JSONLinesRepository
+from repositories.parquet_repository import ParquetRepository
+from repositories.sqlite_repository import SQLiteRepository
+from repositories.mysql_repository import MySQLRepository
+
+# Constantes para los nombres de repositorio
+CSV_REPOSITORY = "csv"
+JSONL_REPOSITORY = "jsonl"
+PARQUET_REPOSITORY = "parquet"
+SQLITE_REPOSITORY = "sqlite"
+MYSQL_REPOSITORY = "mysql"
+
+class RepositoryFactory:
+    """Factory para crear repositorios de guardado"""
+    
+    @staticmethod
+    def create_repository(name):
+        if name == CSV_REPOSITORY:
+            return CSVRepository("imdb_top_movies")
+        elif name == JSONL_REPOSITORY:
+            return JSONLinesRepository("imdb_top_movies")
+        elif name == PARQUET_REPOSITORY:
+            return ParquetRepository()
+        elif name == SQLITE_REPOSITORY:
+            return SQLiteRepository()
+        elif name == MYSQL_REPOSITORY:
+            return MySQLRepository()
+        else:
+            raise ValueError(f"Repositorio desconocido: {name}")
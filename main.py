@@ -1,22 +1,32 @@
 # -*- coding: utf-8 -*-
+import argparse
 from pages.imdb_home_page import IMDBHomePage
-from pages.imdb_detail_page import IMDBDetailPage
-from repositories.csv_repository import CSVRepository
-from repositories.sqlite_repository import SQLiteRepository
-from repositories.mysql_repository import MySQLRepository
-from config import IMDB_TOP_MOVIES_URL, CUSTOM_COOKIES, SCRAPING_CONFIG
+from repositories.sink_fanout import SinkFanout
+from factories.repository_factory import (
+    RepositoryFactory, CSV_REPOSITORY, JSONL_REPOSITORY, PARQUET_REPOSITORY, SQLITE_REPOSITORY, MYSQL_REPOSITORY
+)
+from crawler.async_detail_engine import AsyncDetailEngine
+from crawler.offline_extractor import OfflineExtractor
+from crawler.crawl_journal import CrawlJournal
+from crawler.chart_snapshot import ChartSnapshot
+from crawler.streaming_pipeline import StreamingPipeline
+from crawler.frontier_crawler import FrontierCrawler
+from crawler.work_queue import WorkQueue
+from crawler.queue_worker import QueueWorker
+from crawler.page_archive import get_page_archive
+from network.http_client import get_http_client
+from network.http_cache import get_http_cache
+from network.proxy_pool import get_proxy_pool
+from network.rate_controller import rate_controller
+from config import IMDB_TOP_MOVIES_URL, CUSTOM_COOKIES, FILE_SINK_CONFIG, PARQUET_CONFIG
 from util import log_info, log_error
-import time
-import random
 
 from util.logging_utils import log_warning
 
 class IMDBScraperMain:
     def __init__(self, custom_cookies=None, fetch_strategy="standard"):
         self.custom_cookies = custom_cookies or CUSTOM_COOKIES
-        self.csv_repo = CSVRepository("imdb_top_movies")
-        self.db_repo = SQLiteRepository()
-        self.mysql_repo = MySQLRepository()
+        self._repositories = {}  # Se crean al primer uso: un repositorio deshabilitado no se instancia
     
     def scrape_top_movies(self, max_movies=None):
         """Scrapes la lista de películas top usando IMDBHomePage"""
@@ -26,89 +36,255 @@ class IMDBScraperMain:
         )
         return home_page.extract_data(max_movies)
     
-    def scrape_movie_details(self, movies_list):
-        """Scrapes detalles adicionales usando IMDBDetailPage"""
+    def scrape_movie_details(self, movies_list, journal=None):
+        """Scrapes detalles adicionales usando IMDBDetailPage en paralelo"""
         log_info(f"Encontradas {len(movies_list)} películas. Obteniendo detalles...")
         
-        for i, movie in enumerate(movies_list):
-            log_info(f"Procesando película {i+1}/{len(movies_list)}: {movie['title']}")
-            
-            if movie['detail_url']:
-                detail_page = IMDBDetailPage(
-                    movie['detail_url'], 
-                    self.custom_cookies
-                )
-                metascore, actors = detail_page.extract_data()
-                
-                movie['metascore'] = metascore
-                movie['actors'] = actors
-            else:
-                log_error(f"No se encontró URL de detalle para: {movie['title']}")
-            
-            # Pausa aleatoria para evitar bloqueos
-            time.sleep(random.uniform(
-                SCRAPING_CONFIG['delay_min'], 
-                SCRAPING_CONFIG['delay_max']
-            ))
-        
-        return movies_list
+        # El ritmo por host y por proxy lo ajusta rate_controller dentro de cada fetch
+        engine = AsyncDetailEngine(self.custom_cookies, journal=journal)
+        return engine.run(movies_list)
     
     def save_data(self, movies_data, save_to_csv=True, save_to_db=True, save_to_mysql=True):
-        """Guarda los datos usando los repositorios"""
-        results = {}
-        
-        # Limpiar datos antes de guardar (solo MySQL)
-        log_info("Limpiando datos anteriores en MySQL...")
-        
-        # Guardar en todos los repositorios
-        if save_to_csv:
-            log_info("Guardando datos en CSV...")
-            results['csv'] = self.csv_repo.save(movies_data)
-        if save_to_db:
-            self.db_repo.delete_all()
-            log_info("Guardando datos en SQLite...")
-            results['sqlite'] = self.db_repo.save(movies_data)
-        if save_to_mysql:
-            self.mysql_repo.delete_all()
-            log_info("Guardando datos en MySQL...")
-            results['mysql'] = self.mysql_repo.save(movies_data)
-        
-        return results
+        """
+        Guarda los datos en todos los repositorios habilitados a la vez; las bases hacen upsert
+        por imdb_id, sin vaciar las tablas
+        returns:
+            dict -> por repositorio: success, rows, bytes, seconds y error
+        """
+        repositories = self._get_repositories(save_to_csv, save_to_db, save_to_mysql)
+        return SinkFanout(repositories).save(movies_data)
     
-    def scrape_complete_data(self, max_movies=None, save_to_csv=True, save_to_db=True, save_to_mysql=True):
-        """Proceso completo de scraping y guardado"""
+    def _get_repository(self, name):
+        if name not in self._repositories:
+            self._repositories[name] = RepositoryFactory.create_repository(name)
+        return self._repositories[name]
+    
+    def _get_repositories(self, save_to_csv=True, save_to_db=True, save_to_mysql=True):
+        """Repositorios de destino por nombre, según los flags de guardado"""
+        flags = [
+            (CSV_REPOSITORY, save_to_csv),
+            (JSONL_REPOSITORY, save_to_csv and FILE_SINK_CONFIG['jsonl_enabled']),
+            (PARQUET_REPOSITORY, save_to_csv and PARQUET_CONFIG['enabled']),
+            (SQLITE_REPOSITORY, save_to_db),
+            (MYSQL_REPOSITORY, save_to_mysql),
+        ]
+        return {name: self._get_repository(name) for name, enabled in flags if enabled}
+    
+    def stream_data(self, movies, pending, journal=None, save_to_csv=True, save_to_db=True, save_to_mysql=True):
+        """Pide los detalles y guarda en micro-lotes a medida que llegan, sin esperar al final"""
+        repositories = self._get_repositories(save_to_csv, save_to_db, save_to_mysql)
+        pipeline = StreamingPipeline(repositories, self.custom_cookies, journal)
+        return pipeline.run(movies, {movie['detail_url'] for movie in pending})
+    
+    def scrape_complete_data(self, max_movies=None, save_to_csv=True, save_to_db=True, save_to_mysql=True,
+                             resume=False, incremental=False, stream=False):
+        """
+        Proceso completo de scraping y guardado
+        params:
+            resume: bool -> retoma lo que quedó en el diario de una ejecución interrumpida
+            incremental: bool -> solo pide el detalle de los títulos nuevos, cambiados o vencidos
+            stream: bool -> detalle y guardado como flujo con micro-lotes en lugar de fases
+        """
+        journal = CrawlJournal()
+        snapshot = ChartSnapshot()
+        chart, completed = journal.load() if resume else (None, {})
+        journal.open(resume=resume)
+        
         # Paso 1: Obtener lista de películas
-        movies = self.scrape_top_movies(max_movies)
+        if chart:
+            log_info(f"Reanudando: ranking de {len(chart)} películas tomado del diario")
+            movies = chart
+        else:
+            movies = self.scrape_top_movies(max_movies)
+            if movies:
+                journal.record_chart(movies)
 
         if not movies:
             log_error("No se encontraron películas para procesar.")
+            journal.close()
             return []
         
-        # Paso 2: Obtener detalles de cada película
-        movies_with_details = self.scrape_movie_details(movies)
+        # Paso 2: Obtener detalles de cada película (solo las que faltan en el diario)
+        for movie in movies:
+            if movie['detail_url'] in completed:
+                movie['metascore'], movie['actors'] = completed[movie['detail_url']]
+        pending = [movie for movie in movies if movie['detail_url'] not in completed]
+        if completed:
+            log_info(f"Reanudando: {len(movies) - len(pending)} detalles ya completados, faltan {len(pending)}")
+        if incremental:
+            pending = snapshot.select_changed(pending)
+        movies_with_details = movies
         
-        # Paso 3: Guardar datos
-        save_results = self.save_data(movies_with_details, save_to_csv, save_to_db, save_to_mysql)
+        if stream:
+            # Pasos 2 y 3 a la vez: cada lote se guarda apenas se completa
+            save_results = self.stream_data(movies, pending, journal, save_to_csv, save_to_db, save_to_mysql)
+            journal.close()
+        else:
+            self.scrape_movie_details(pending, journal)
+            journal.close()
+            
+            # Paso 3: Guardar datos
+            save_results = self.save_data(movies_with_details, save_to_csv, save_to_db, save_to_mysql)
         log_info(f"Resultados de guardado: {save_results}")
+        failed = [name for name, result in save_results.items() if not result['success']]
+        if failed:
+            # El diario queda (y la foto no avanza): --resume guarda de nuevo sin volver a pedir los detalles
+            log_warning(f"Guardado fallido en {', '.join(failed)}: se conserva el diario para --resume")
+        else:
+            snapshot.save(movies_with_details, {movie['detail_url'] for movie in pending} | set(completed))
+            journal.finish()
+        get_http_client().log_report()
+        get_proxy_pool().log_report()
+        rate_controller.log_report()
+        curve_path = rate_controller.save_curve()
+        if curve_path:
+            log_info(f"Curva de ritmo guardada en {curve_path}")
+        if get_http_cache():
+            get_http_cache().log_report()
+        if get_page_archive():
+            get_page_archive().log_report()
         
         return movies_with_details
+    
+    def crawl_frontier(self, max_titles=None, save_to_csv=True, save_to_db=True, save_to_mysql=True):
+        """Extrae todas las listas semilla de la frontera, sin repetir títulos"""
+        repositories = self._get_repositories(save_to_csv, save_to_db, save_to_mysql)
+        crawler = FrontierCrawler(repositories, self.custom_cookies)
+        processed = crawler.run(max_titles)
+        log_info(f"Resultados de guardado: {crawler.results}")
+        get_http_client().log_report()
+        rate_controller.log_report()
+        return processed
+    
+    def coordinate(self, max_movies=None, save_to_csv=True, save_to_db=True, save_to_mysql=True):
+        """Siembra la cola de trabajos con el ranking; los workers hacen el detalle y el guardado"""
+        movies = self.scrape_top_movies(max_movies)
+        if not movies:
+            log_error("No se encontraron películas para encolar.")
+            return 0
+        
+        for repository in self._get_repositories(save_to_csv, save_to_db, save_to_mysql).values():
+            # Los archivos quedan publicados vacíos (CSV solo con cabecera, Parquet sin filas); los workers les agregan lotes
+            repository.begin_batches()
+            repository.end_batches()
+        
+        queue = WorkQueue()
+        queue.reset()
+        added = queue.enqueue(movies)
+        log_info(f"Cola de trabajos sembrada con {added} películas en {queue.db_path}")
+        return added
+    
+    def run_worker(self, worker_id=None, save_to_csv=True, save_to_db=True, save_to_mysql=True):
+        """Procesa trabajos de la cola compartida hasta vaciarla"""
+        repositories = self._get_repositories(save_to_csv, save_to_db, save_to_mysql)
+        worker = QueueWorker(repositories, self.custom_cookies, worker_id=worker_id)
+        processed = worker.run()
+        log_info(f"Estado de la cola: {worker.queue.get_counts()}")
+        get_http_client().log_report()
+        rate_controller.log_report()
+        return processed
+    
+    def reextract_archived_data(self, max_movies=None, save_to_csv=True, save_to_db=True, save_to_mysql=True):
+        """Re-extrae y guarda los datos desde el archivo de páginas, sin usar la red"""
+        movies = OfflineExtractor().run(max_movies)
+        
+        if not movies:
+            log_error("No se pudieron re-extraer películas del archivo.")
+            return []
+        
+        save_results = self.save_data(movies, save_to_csv, save_to_db, save_to_mysql)
+        log_info(f"Resultados de guardado: {save_results}")
+        
+        return movies
+
+def parse_args():
+    """Argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Scraper de las películas top de IMDb")
+    parser.add_argument(
+        '--reextract',
+        action='store_true',
+        help="Re-extrae los datos desde el archivo de páginas (data/page_archive.db) sin usar la red"
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Retoma una ejecución interrumpida desde el diario (data/crawl_journal.jsonl)"
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Solo pide el detalle de los títulos nuevos o cambiados respecto al último ranking guardado"
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help="Guarda en micro-lotes mientras se obtienen los detalles, en lugar de todo al final"
+    )
+    parser.add_argument(
+        '--frontier',
+        action='store_true',
+        help="Recorre todas las listas semilla de FRONTIER_CONFIG (top, moviemeter, toptv, ...) sin repetir títulos"
+    )
+    parser.add_argument(
+        '--coordinator',
+        action='store_true',
+        help="Extrae el ranking y siembra la cola de trabajos (data/work_queue.db) para los workers"
+    )
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help="Toma detalles de la cola de trabajos y los guarda; se pueden lanzar varios en paralelo"
+    )
+    parser.add_argument(
+        '--worker-id',
+        help="Identificador del worker en los leases (por defecto host:pid)"
+    )
+    return parser.parse_args()
 
 def main():
     """
     Función principal
     """
+    args = parse_args()
     log_info("Iniciando scraping de IMDB")
     
     # Crear instancia del orquestador
     scraper_main = IMDBScraperMain()
     
-    # Proceso completo
-    movies_data = scraper_main.scrape_complete_data(
-        # max_movies=2,  # Para pruebas
-        save_to_csv=True,
-        save_to_db=True,
-        save_to_mysql=True
-    )
+    if args.coordinator:
+        added = scraper_main.coordinate()
+        log_info(f"Coordinador terminado. {added} trabajos encolados.")
+        return
+    
+    if args.worker:
+        processed = scraper_main.run_worker(args.worker_id)
+        log_info(f"Worker terminado. {processed} películas procesadas.")
+        return
+    
+    if args.frontier:
+        # Varias listas semilla con deduplicación de títulos
+        processed = scraper_main.crawl_frontier()
+        log_info(f"Proceso completado. {processed} títulos procesados desde la frontera.")
+        return
+    
+    if args.reextract:
+        # Re-extracción offline desde el archivo de páginas
+        movies_data = scraper_main.reextract_archived_data(
+            save_to_csv=True,
+            save_to_db=True,
+            save_to_mysql=True
+        )
+    else:
+        # Proceso completo
+        movies_data = scraper_main.scrape_complete_data(
+            # max_movies=2,  # Para pruebas
+            save_to_csv=True,
+            save_to_db=True,
+            save_to_mysql=True,
+            resume=args.resume,
+            incremental=args.incremental,
+            stream=args.stream
+        )
     
     if not movies_data:
         log_error("No se obtuvieron datos. Saliendo.")
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+import requests
+from requests.structures import CaseInsensitiveDict
+from util import log_info, log_error
+from config import HTTP_CACHE_CONFIG
+
+# Cabeceras que no aplican al cuerpo ya decodificado que se guarda
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+class HttpCache:
+    """Caché HTTP persistente en disco con TTL por patrón, LRU y revalidación condicional"""
+
+    def __init__(self, db_path=None, max_bytes=None, default_ttl=None, ttl_rules=None, vary_cookies=None):
+        self.db_path = db_path or HTTP_CACHE_CONFIG['db_path']
+        self.max_bytes = max_bytes or HTTP_CACHE_CONFIG['max_bytes']
+        self.default_ttl = default_ttl or HTTP_CACHE_CONFIG['default_ttl']
+        self.ttl_rules = [
+            (re.compile(pattern), ttl)
+            for pattern, ttl in (ttl_rules or HTTP_CACHE_CONFIG['ttl_rules'])
+        ]
+        self.vary_cookies = vary_cookies or HTTP_CACHE_CONFIG['vary_cookies']
+        self.stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'bytes_saved': 0,
+            'seconds_saved': 0.0,
+        }
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_database()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _init_database(self):
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    body_size INTEGER NOT NULL,
+                    fetch_seconds REAL NOT NULL
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)')
+            self._conn.commit()
+
+    def _get_key(self, url, cookies):
+        """La clave combina la URL con las cookies que cambian la respuesta"""
+        cookies = cookies or {}
+        vary = '&'.join(f"{name}={cookies.get(name, '')}" for name in sorted(self.vary_cookies))
+        return hashlib.sha256(f"{url}|{vary}".encode('utf-8')).hexdigest()
+
+    def _get_ttl(self, url):
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def _lookup(self, key):
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT url, headers, body, etag, last_modified, expires_at, size, body_size, fetch_seconds
+                FROM entries WHERE key = ?
+            ''', (key,)).fetchone()
+            if row:
+                self._conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+                self._conn.commit()
+        if not row:
+            return None
+        return {
+            'url': row[0],
+            'headers': json.loads(row[1]),
+            'body': row[2],
+            'etag': row[3],
+            'last_modified': row[4],
+            'expires_at': row[5],
+            'size': row[6],
+            'body_size': row[7],
+            'fetch_seconds': row[8],
+        }
+
+    def _store(self, key, url, response, fetch_seconds):
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control:
+            return
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_HEADERS}
+        body = zlib.compress(response.content, 6)
+        now = time.time()
+
+        with self._lock:
+            previous = self._conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self._conn.execute('''
+                INSERT OR REPLACE INTO entries
+                    (key, url, headers, body, etag, last_modified, stored_at, expires_at,
+                     last_access, size, body_size, fetch_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                key,
+                url,
+                json.dumps(headers),
+                body,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                now,
+                now + self._get_ttl(url),
+                now,
+                len(body),
+                len(response.content),
+                fetch_seconds
+            ))
+            self._total_bytes += len(body) - (previous[0] if previous else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _refresh(self, key, url, response):
+        """Renueva el TTL de una entrada tras un 304"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                UPDATE entries
+                SET stored_at = ?, expires_at = ?, last_access = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE key = ?
+            ''', (
+                now,
+                now + self._get_ttl(url),
+                now,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                key
+            ))
+            self._conn.commit()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta respetar el tamaño máximo"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                'SELECT key, size FROM entries ORDER BY last_access LIMIT 50'
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def _build_response(self, entry):
+        """Reconstruye un requests.Response a partir de una entrada de la caché"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = zlib.decompress(entry['body'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def _count_saved(self, stat, entry):
+        with self._lock:
+            self.stats[stat] += 1
+            self.stats['bytes_saved'] += entry['body_size']
+            self.stats['seconds_saved'] += entry['fetch_seconds']
+
+    def fetch(self, url, cookies, send):
+        """
+        Resuelve la URL desde la caché o con la función send
+        params:
+            url: str -> URL a obtener
+            cookies: dict -> cookies del request
+            send: callable -> recibe cabeceras extra y retorna un requests.Response
+        returns:
+            requests.Response -> respuesta de red o reconstruida desde la caché
+        """
+        key = self._get_key(url, cookies)
+
+        while True:
+            entry = self._lookup(key)
+            if entry and entry['expires_at'] > time.time():
+                self._count_saved('hits', entry)
+                return self._build_response(entry)
+
+            # Solo un request por clave; el resto espera y vuelve a consultar la caché
+            with self._lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    break
+            event.wait()
+
+        try:
+            extra_headers = {}
+            if entry and entry['etag']:
+                extra_headers['If-None-Match'] = entry['etag']
+            if entry and entry['last_modified']:
+                extra_headers['If-Modified-Since'] = entry['last_modified']
+
+            start = time.monotonic()
+            response = send(extra_headers)
+            fetch_seconds = time.monotonic() - start
+
+            if response.status_code == 304 and entry:
+                self._refresh(key, url, response)
+                self._count_saved('revalidated', entry)
+                return self._build_response(entry)
+
+            with self._lock:
+                self.stats['misses'] += 1
+            if response.status_code == 200:
+                self._store(key, url, response, fetch_seconds)
+            return response
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def log_report(self):
+        """Escribe en el log el resumen de uso de la caché"""
+        stats = self.stats
+        log_info(
+            f"Caché HTTP: {stats['hits']} hits, {stats['revalidated']} revalidadas (304), "
+            f"{stats['misses']} misses. Ahorro: {stats['bytes_saved'] / 1024 / 1024:.1f} MB, "
+            f"{stats['seconds_saved']:.1f} s"
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_http_cache():
+    """Retorna la caché HTTP compartida, o None si está deshabilitada"""
+    global _cache
+    if not HTTP_CACHE_CONFIG['enabled']:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = HttpCache()
+            except Exception as e:
+                log_error(f"No se pudo abrir la caché HTTP: {e}")
+                return None
+        return _cache
@@ -0,0 +1,214 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from network.rate_controller import rate_controller
+from network.http_cache import get_http_cache
+from network.retry_policy import circuit_breaker, retry_budget, RETRYABLE_STATUS
+from util import log_info, log_error, log_warning
+from config import HEADERS, SCRAPING_CONFIG
+
+try:
+    import brotli  # noqa: F401  urllib3 lo usa para decodificar 'br'
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+DIRECT_POOL = "direct"
+
+class HttpClient:
+    """Cliente HTTP compartido con pools de conexiones por host y por proxy"""
+
+    def __init__(self, pool_size=None, pool_hosts=None):
+        self.pool_size = pool_size or SCRAPING_CONFIG['pool_size']
+        self.pool_hosts = pool_hosts or SCRAPING_CONFIG['pool_hosts']
+        self.headers = self._build_headers()
+        self.cache = get_http_cache()
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _build_headers(self):
+        """Solo anuncia las codificaciones que realmente podemos decodificar"""
+        headers = dict(HEADERS)
+        if not BROTLI_AVAILABLE:
+            encodings = [e.strip() for e in headers.get('Accept-Encoding', '').split(',')]
+            headers['Accept-Encoding'] = ', '.join(e for e in encodings if e and e != 'br')
+            log_warning("brotli no está instalado, se deja de anunciar 'br' en Accept-Encoding")
+        return headers
+
+    def _get_session(self, proxy=None):
+        """Obtiene (o crea) la sesión asociada al proxy; cada una tiene sus propios pools"""
+        key = proxy or DIRECT_POOL
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                session.headers.clear()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_hosts,
+                    pool_maxsize=self.pool_size
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[key] = session
+            return session
+
+    def _get_proxies(self, proxy):
+        if not proxy:
+            return None
+        return {"http": proxy, "https": proxy}
+
+    def get(self, url, cookies=None, proxy=None, timeout=None):
+        """GET reutilizando conexiones abiertas del pool correspondiente"""
+        if timeout is None:
+            timeout = SCRAPING_CONFIG['timeout']
+
+        def send(extra_headers=None):
+            return self._send(url, cookies, proxy, timeout, extra_headers)
+
+        if self.cache:
+            return self.cache.fetch(url, cookies, send)
+        return send()
+
+    def _send(self, url, cookies, proxy, timeout, extra_headers=None):
+        """Envía el request por la red respetando el ritmo adaptativo y el circuit breaker del host/proxy"""
+        breaker_key = proxy or urlparse(url).netloc
+        circuit_breaker.check(breaker_key)
+        # Si check dejó pasar este request como prueba, hay que resolverla pase lo que pase:
+        # una prueba que nunca se registra deja el circuito semiabierto para siempre
+        recorded = False
+        try:
+            retry_budget.deposit()
+
+            session = self._get_session(proxy)
+            rate_controller.wait(url, proxy)
+            start = time.monotonic()
+            try:
+                response = session.get(
+                    url,
+                    headers=extra_headers,
+                    cookies=cookies,
+                    proxies=self._get_proxies(proxy),
+                    timeout=timeout
+                )
+            except requests.exceptions.RequestException:
+                circuit_breaker.record_failure(breaker_key)
+                recorded = True
+                rate_controller.record(url, proxy)
+                raise
+            rate_controller.record(url, proxy, response.status_code, time.monotonic() - start)
+
+            if response.status_code in RETRYABLE_STATUS:
+                circuit_breaker.record_failure(breaker_key)
+            else:
+                circuit_breaker.record_success(breaker_key)
+            recorded = True
+            return response
+        finally:
+            if not recorded:
+                circuit_breaker.release(breaker_key)
+
+    def _get_pool(self, url, proxy=None):
+        """Obtiene el pool de urllib3 que usará requests para la URL"""
+        session = self._get_session(proxy)
+        adapter = session.get_adapter(url)
+        proxies = self._get_proxies(proxy)
+        # Mismos ajustes que aplica requests al enviar, para caer en el mismo pool
+        settings = session.merge_environment_settings(url, proxies or {}, None, None, None)
+        if hasattr(adapter, 'get_connection_with_tls_context'):
+            request = requests.Request('GET', url).prepare()
+            return adapter.get_connection_with_tls_context(
+                request,
+                settings['verify'],
+                proxies=settings['proxies'],
+                cert=settings['cert']
+            )
+        return adapter.get_connection(url, settings['proxies'])
+
+    def prewarm(self, url, connections=None, proxy=None):
+        """Abre conexiones hacia el host de la URL antes de un fan-out"""
+        connections = min(connections or self.pool_size, self.pool_size)
+        try:
+            pool = self._get_pool(url, proxy)
+        except Exception as e:
+            log_error(f"No se pudo preparar el pool para {url}: {e}")
+            return 0
+
+        def open_connection(conn):
+            try:
+                if getattr(conn, 'sock', None) is None:
+                    if proxy and pool.scheme == 'https':
+                        pool._prepare_proxy(conn)
+                    else:
+                        conn.connect()
+                return True
+            except Exception as e:
+                log_error(f"Error abriendo conexión hacia {url}: {e}")
+                conn.close()
+                return False
+
+        # Se toman todas las conexiones a la vez para que el pool no devuelva la misma
+        conns = [pool._get_conn() for _ in range(connections)]
+        try:
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                opened = sum(executor.map(open_connection, conns))
+        finally:
+            for conn in conns:
+                pool._put_conn(conn)
+        pool.prewarmed_connections = getattr(pool, 'prewarmed_connections', 0) + opened
+        log_info(f"Pool precalentado: {opened}/{connections} conexiones a {pool.host} ({proxy or DIRECT_POOL})")
+        return opened
+
+    def get_pool_stats(self):
+        """Conexiones abiertas vs. reutilizadas por cada pool"""
+        with self._lock:
+            sessions = list(self._sessions.items())
+
+        stats = []
+        for key, session in sessions:
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+                for manager in managers:
+                    for pool_key in list(manager.pools.keys()):
+                        pool = manager.pools.get(pool_key)
+                        if pool is None:
+                            continue
+                        # Las conexiones precalentadas no las abrió ningún request
+                        prewarmed = getattr(pool, 'prewarmed_connections', 0)
+                        opened_by_requests = max(pool.num_connections - prewarmed, 0)
+                        stats.append({
+                            'pool': f"{key} -> {pool.scheme}://{pool.host}:{pool.port}",
+                            'opened': pool.num_connections,
+                            'prewarmed': prewarmed,
+                            'requests': pool.num_requests,
+                            'reused': max(pool.num_requests - opened_by_requests, 0),
+                        })
+        return stats
+
+    def log_report(self):
+        """Escribe en el log las métricas de cada pool"""
+        for stat in self.get_pool_stats():
+            log_info(
+                f"Pool {stat['pool']}: {stat['requests']} requests, "
+                f"{stat['opened']} conexiones nuevas ({stat['prewarmed']} precalentadas), "
+                f"{stat['reused']} reutilizadas"
+            )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_http_client():
+    """Retorna el cliente HTTP compartido por todo el proceso"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+from util import log_info, log_warning
+from config import PROXY_POOL_CONFIG
+
+class ProxyStats:
+    """Salud de un proxy: latencia y tasa de error como medias móviles exponenciales"""
+
+    def __init__(self, proxy, initial_latency):
+        self.proxy = proxy
+        self.latency = initial_latency
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = None
+        self.probing = False
+
+    def get_weight(self):
+        """Peso de selección: más rápido y con menos errores, más tráfico"""
+        return max(1.0 - self.error_rate, 0.05) / max(self.latency, 0.01)
+
+    def to_dict(self):
+        return {
+            'proxy': self.proxy,
+            'requests': self.requests,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate, 3),
+            'latency_ms': round(self.latency * 1000),
+            'ejections': self.ejections,
+            'ejected': self.ejected_until is not None,
+        }
+
+
+class ProxyPool:
+    """Pool de proxies compartido entre hilos y tareas, con selección ponderada por salud"""
+
+    def __init__(self, proxies=None, max_in_flight=None, ewma_alpha=None, eject_error_rate=None,
+                 min_requests=None, eject_seconds=None, initial_latency=None):
+        initial_latency = initial_latency or PROXY_POOL_CONFIG['initial_latency']
+        self.max_in_flight = max_in_flight or PROXY_POOL_CONFIG['max_in_flight_per_proxy']
+        self.ewma_alpha = ewma_alpha or PROXY_POOL_CONFIG['ewma_alpha']
+        self.eject_error_rate = eject_error_rate or PROXY_POOL_CONFIG['eject_error_rate']
+        self.min_requests = min_requests or PROXY_POOL_CONFIG['min_requests_to_eject']
+        self.eject_seconds = eject_seconds or PROXY_POOL_CONFIG['eject_seconds']
+        self._stats = {
+            proxy: ProxyStats(proxy, initial_latency)
+            for proxy in (proxies or PROXY_POOL_CONFIG['proxies'])
+        }
+        self._condition = threading.Condition()
+
+    def _is_available(self, stats, now):
+        if stats.in_flight >= self.max_in_flight:
+            return False
+        if stats.ejected_until is None:
+            return True
+        # Expulsado: tras el castigo se deja pasar un solo request de prueba
+        return stats.ejected_until <= now and not stats.probing
+
+    def acquire(self, exclude=None, timeout=None):
+        """
+        Reserva un proxy elegido al azar con peso según su salud
+        params:
+            exclude: set -> proxies a evitar (por ejemplo los ya probados para esta URL)
+            timeout: float -> segundos máximos de espera por un proxy libre
+        returns:
+            str -> URL del proxy, None si no hay ninguno disponible a tiempo
+        """
+        exclude = exclude or set()
+        deadline = time.monotonic() + (timeout if timeout is not None else self.eject_seconds)
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                candidates = [
+                    stats for proxy, stats in self._stats.items()
+                    if proxy not in exclude and self._is_available(stats, now)
+                ]
+                if not candidates and exclude:
+                    # Mejor repetir un proxy que quedarse sin ninguno
+                    candidates = [stats for stats in self._stats.values() if self._is_available(stats, now)]
+                if candidates:
+                    stats = random.choices(candidates, weights=[c.get_weight() for c in candidates])[0]
+                    if stats.ejected_until is not None:
+                        stats.probing = True
+                        log_info(f"Probando de nuevo el proxy expulsado {stats.proxy}")
+                    stats.in_flight += 1
+                    return stats.proxy
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                # Despierta al liberar un proxy o cuando vence la expulsión más próxima
+                wake_ups = [s.ejected_until - now for s in self._stats.values() if s.ejected_until and s.ejected_until > now]
+                self._condition.wait(min([remaining] + wake_ups))
+
+    def release(self, proxy, latency=None, success=True):
+        """
+        Devuelve el proxy al pool registrando el resultado del request
+        params:
+            success: bool -> resultado del request; None lo devuelve sin afectar su salud
+                     (el request no llegó a salir por el proxy)
+        """
+        with self._condition:
+            stats = self._stats[proxy]
+            stats.in_flight -= 1
+            if success is None:
+                stats.probing = False
+                self._condition.notify_all()
+                return
+            stats.requests += 1
+            alpha = self.ewma_alpha
+            stats.error_rate = (1 - alpha) * stats.error_rate + alpha * (0.0 if success else 1.0)
+            if latency is not None:
+                stats.latency = (1 - alpha) * stats.latency + alpha * latency
+            if not success:
+                stats.failures += 1
+
+            was_probing = stats.probing
+            stats.probing = False
+            if success and was_probing:
+                stats.ejected_until = None
+                stats.error_rate = 0.0
+                log_info(f"Proxy {proxy} readmitido tras la prueba")
+            elif not success and (was_probing or (
+                    stats.requests >= self.min_requests and stats.error_rate >= self.eject_error_rate)):
+                stats.ejected_until = time.monotonic() + self.eject_seconds
+                stats.ejections += 1
+                log_warning(
+                    f"Proxy {proxy} expulsado {self.eject_seconds}s "
+                    f"(error {stats.error_rate:.0%}, latencia {stats.latency * 1000:.0f} ms)"
+                )
+            self._condition.notify_all()
+
+    def get_stats(self):
+        """Estadísticas por proxy para el reporte de la ejecución"""
+        with self._condition:
+            return [stats.to_dict() for stats in self._stats.values()]
+
+    def log_report(self):
+        """Escribe en el log la salud de cada proxy; nada si el pool no se usó"""
+        stats = self.get_stats()
+        if not any(s['requests'] for s in stats):
+            return
+        for s in stats:
+            log_info(
+                f"Proxy {s['proxy']}: {s['requests']} requests, {s['failures']} fallos, "
+                f"error {s['error_rate']:.0%}, latencia {s['latency_ms']} ms, "
+                f"{s['ejections']} expulsiones{' (expulsado)' if s['ejected'] else ''}"
+            )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_proxy_pool():
+    """Retorna el pool de proxies compartido por todas las estrategias rotativas"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProxyPool()
+        return _pool
@@ -0,0 +1,166 @@
+import csv
+import os
+import threading
+import time
+from urllib.parse import urlparse
+from util import log_info, log_warning
+from config import RATE_CONFIG
+
+# Respuestas que indican que el sitio pide bajar el ritmo
+THROTTLE_STATUS = {429, 503}
+
+class RateLimit:
+    """Límite AIMD de un host o de un proxy"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.next_slot = 0.0
+        self.baseline_latency = None
+        self.samples = 0
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.min_seen = rate
+        self.max_seen = rate
+
+
+class RateController:
+    """
+    Ritmo adaptativo compartido por todas las estrategias: sube el ritmo de a poco
+    mientras las respuestas son rápidas y correctas, y lo corta a la mitad ante
+    429/503, errores de red o latencia creciente. Hay un límite por host y otro por proxy.
+    """
+
+    def __init__(self, initial_rate=None, min_rate=None, max_rate=None, increase_step=None,
+                 decrease_factor=None, latency_factor=None, decrease_cooldown=None):
+        self.initial_rate = initial_rate or RATE_CONFIG['initial_rate']
+        self.min_rate = min_rate or RATE_CONFIG['min_rate']
+        self.max_rate = max_rate or RATE_CONFIG['max_rate']
+        self.increase_step = increase_step or RATE_CONFIG['increase_step']
+        self.decrease_factor = decrease_factor or RATE_CONFIG['decrease_factor']
+        self.latency_factor = latency_factor or RATE_CONFIG['latency_factor']
+        self.decrease_cooldown = decrease_cooldown or RATE_CONFIG['decrease_cooldown']
+        self._limits = {}
+        self._curve = []
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _get_keys(self, url, proxy):
+        keys = [f"host:{urlparse(url).netloc}"]
+        if proxy:
+            keys.append(f"proxy:{proxy}")
+        return keys
+
+    def _get_limit(self, key):
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = RateLimit(self.initial_rate)
+            self._limits[key] = limit
+            self._record_point(key, limit)
+        return limit
+
+    def _record_point(self, key, limit):
+        self._curve.append((round(time.monotonic() - self._started, 3), key, round(limit.rate, 3)))
+
+    def reserve(self, url, proxy=None):
+        """Reserva el siguiente turno en el host y en el proxy; retorna los segundos a esperar"""
+        with self._lock:
+            now = time.monotonic()
+            limits = [self._get_limit(key) for key in self._get_keys(url, proxy)]
+            slot = max([now] + [limit.next_slot for limit in limits])
+            for limit in limits:
+                limit.next_slot = slot + 1.0 / limit.rate
+        return slot - now
+
+    def wait(self, url, proxy=None):
+        """Bloquea el hilo actual hasta el turno reservado"""
+        delay = self.reserve(url, proxy)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, url, proxy=None, status=None, latency=None):
+        """
+        Ajusta los límites con el resultado de un request
+        params:
+            url: str -> URL pedida
+            proxy: str -> proxy usado, None si fue directo
+            status: int -> código HTTP, None si falló la conexión
+            latency: float -> segundos que tardó la respuesta
+        """
+        with self._lock:
+            now = time.monotonic()
+            for key in self._get_keys(url, proxy):
+                limit = self._get_limit(key)
+                slow = (
+                    latency is not None and limit.baseline_latency is not None
+                    and limit.samples >= RATE_CONFIG['latency_min_samples']
+                    and latency > limit.baseline_latency * self.latency_factor
+                )
+                if status is None or status in THROTTLE_STATUS or slow:
+                    self._decrease(key, limit, now, status, latency)
+                elif status < 400:
+                    self._increase(key, limit)
+
+                if latency is not None and status is not None and status < 400:
+                    limit.samples += 1
+                    if limit.baseline_latency is None:
+                        limit.baseline_latency = latency
+                    else:
+                        alpha = RATE_CONFIG['latency_alpha']
+                        limit.baseline_latency = (1 - alpha) * limit.baseline_latency + alpha * latency
+
+    def _increase(self, key, limit):
+        if limit.rate >= self.max_rate:
+            return
+        limit.rate = min(self.max_rate, limit.rate + self.increase_step)
+        limit.increases += 1
+        limit.max_seen = max(limit.max_seen, limit.rate)
+        self._record_point(key, limit)
+
+    def _decrease(self, key, limit, now, status, latency):
+        # Las respuestas que ya estaban en vuelo no vuelven a cortar el ritmo
+        if now - limit.last_decrease < self.decrease_cooldown:
+            return
+        limit.last_decrease = now
+        previous = limit.rate
+        limit.rate = max(self.min_rate, limit.rate * self.decrease_factor)
+        limit.decreases += 1
+        limit.min_seen = min(limit.min_seen, limit.rate)
+        self._record_point(key, limit)
+        reason = f"HTTP {status}" if status is not None else "error de red"
+        if status is not None and status not in THROTTLE_STATUS:
+            reason = f"latencia {latency * 1000:.0f} ms"
+        log_warning(f"Ritmo de {key} baja de {previous:.2f} a {limit.rate:.2f} req/s ({reason})")
+
+    def get_rate(self, url, proxy=None):
+        """Requests por segundo permitidos ahora mismo para la URL (el más lento de sus límites)"""
+        with self._lock:
+            return min(self._get_limit(key).rate for key in self._get_keys(url, proxy))
+
+    def save_curve(self, path=None):
+        """Guarda la curva de ritmo de la ejecución (segundos, clave, req/s) en CSV"""
+        path = path or RATE_CONFIG['curve_path']
+        with self._lock:
+            curve = list(self._curve)
+        if not curve:
+            return None
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['elapsed_seconds', 'key', 'rate'])
+            writer.writerows(curve)
+        return path
+
+    def log_report(self):
+        """Escribe en el log el ritmo final y los ajustes de cada host/proxy"""
+        with self._lock:
+            limits = list(self._limits.items())
+        for key, limit in limits:
+            log_info(
+                f"Ritmo {key}: {limit.rate:.2f} req/s (rango {limit.min_seen:.2f}-{limit.max_seen:.2f}), "
+                f"{limit.increases} subidas, {limit.decreases} bajadas"
+            )
+
+
+# Instancia compartida por todas las estrategias de fetch del proceso
+rate_controller = RateController()
@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from util import log_warning
+from config import RETRY_CONFIG
+
+# Códigos que indican un problema transitorio del servidor
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """El circuito del host/proxy está abierto; no se envía tráfico hasta que se enfríe"""
+
+    def __init__(self, key, retry_after):
+        super().__init__(f"Circuito abierto para {key}, reintentar en {retry_after:.1f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """Decide si un error se reintenta y cuánto esperar (backoff exponencial con jitter)"""
+
+    def __init__(self, base_delay=None, max_delay=None, max_retry_after=None):
+        self.base_delay = base_delay or RETRY_CONFIG['base_delay']
+        self.max_delay = max_delay or RETRY_CONFIG['max_delay']
+        self.max_retry_after = max_retry_after or RETRY_CONFIG['max_retry_after']
+
+    def get_status(self, error):
+        response = getattr(error, 'response', None)
+        return response.status_code if response is not None else None
+
+    def is_retryable(self, error):
+        """Errores de red, 429 y 5xx se reintentan; el resto de 4xx no"""
+        if isinstance(error, CircuitOpenError):
+            return True
+        status = self.get_status(error)
+        if status is None:
+            return True
+        return status in RETRYABLE_STATUS
+
+    def get_retry_after(self, error):
+        """Segundos indicados por el servidor en Retry-After, o None"""
+        if isinstance(error, CircuitOpenError):
+            return error.retry_after
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(seconds, 0), self.max_retry_after)
+
+    def get_delay(self, attempt, error=None):
+        """Espera antes del reintento número attempt (1, 2, ...)"""
+        retry_after = self.get_retry_after(error) if error is not None else None
+        if retry_after is not None:
+            # Un poco de jitter para que no vuelvan todos a la vez
+            return retry_after + random.uniform(0, self.base_delay)
+        # Jitter: uniforme entre medio delay base y el tope exponencial
+        cap = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(self.base_delay / 2, cap)
+
+
+class RetryBudget:
+    """Presupuesto de reintentos de la ejecución: cada request deposita una fracción de reintento"""
+
+    def __init__(self, ratio=None, min_retries=None):
+        self.ratio = ratio if ratio is not None else RETRY_CONFIG['budget_ratio']
+        self.tokens = min_retries if min_retries is not None else RETRY_CONFIG['budget_min_retries']
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens += self.ratio
+
+    def try_consume(self):
+        """Toma un reintento del presupuesto; False si ya se agotó"""
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.spent += 1
+            return True
+
+
+class CircuitBreaker:
+    """Circuit breaker por host o por proxy"""
+
+    def __init__(self, failure_threshold=None, cooldown=None):
+        self.failure_threshold = failure_threshold or RETRY_CONFIG['breaker_failure_threshold']
+        self.cooldown = cooldown or RETRY_CONFIG['breaker_cooldown']
+        self._failures = {}
+        self._open_until = {}
+        self._probing = set()
+        self._lock = threading.Lock()
+
+    def check(self, key):
+        """Lanza CircuitOpenError si el circuito está abierto; deja pasar un solo request de prueba"""
+        with self._lock:
+            open_until = self._open_until.get(key)
+            if open_until is None:
+                return
+            remaining = open_until - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(key, remaining)
+            if key in self._probing:
+                raise CircuitOpenError(key, self.cooldown / 4)
+            # Semiabierto: este request sirve de prueba
+            self._probing.add(key)
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._open_until.pop(key, None)
+            self._probing.discard(key)
+
+    def release(self, key):
+        """Libera la prueba semiabierta sin veredicto (el request no llegó a enviarse o falló por otra causa)"""
+        with self._lock:
+            self._probing.discard(key)
+
+    def record_failure(self, key):
+        with self._lock:
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            was_probing = key in self._probing
+            self._probing.discard(key)
+            if was_probing or failures >= self.failure_threshold:
+                self._open_until[key] = time.monotonic() + self.cooldown
+                opened = True
+            else:
+                opened = False
+        if opened:
+            log_warning(f"Circuito abierto para {key} durante {self.cooldown}s tras {failures} fallos")
+
+
+# Instancias compartidas por todas las estrategias de la ejecución
+retry_policy = RetryPolicy()
+retry_budget = RetryBudget()
+circuit_breaker = CircuitBreaker()
+
+
+def get_retry_delay(error, attempt, max_attempts):
+    """
+    Decide si se reintenta tras un fallo y cuánto esperar
+    params:
+        error: Exception -> error del intento fallido
+        attempt: int -> número del intento que falló (1, 2, ...)
+        max_attempts: int -> intentos permitidos para la URL
+    returns:
+        float -> segundos a esperar, None si no corresponde reintentar
+    """
+    if attempt >= max_attempts or not retry_policy.is_retryable(error):
+        return None
+    if not retry_budget.try_consume():
+        log_warning(f"Presupuesto de reintentos agotado ({retry_budget.spent} usados), no se reintenta")
+        return None
+    return retry_policy.get_delay(attempt, error)
@@ -1,23 +1,61 @@
 from abc import ABC, abstractmethod
 from factories.fetch_factory import FetchFactory
-from util import log_error
+from crawler.page_archive import get_page_archive
+from util import log_error, build_soup
+from config import SCRAPING_CONFIG
 
 class BasePage(ABC):
     """Clase base para todas las páginas web"""
     
-    def __init__(self, url, custom_cookies=None):
+    # SoupStrainer con los subárboles que necesita la página; None construye el DOM completo
+    parse_only = None
+    
+    def __init__(self, url, custom_cookies=None, content=None):
         self.url = url
         self.custom_cookies = custom_cookies
-        self.soup = None
+        self.content = content  # HTML crudo; si viene dado no se usa la red
+        self._soup = None
         self.response = None
         self.fetch_strategy = FetchFactory.create_fetch_strategy()
     
-    def load_page(self):
-        self.soup, self.response = self.fetch_strategy.fetch(
-            self.url, 
-            self.custom_cookies
-        )
-        return self.soup is not None
+    @property
+    def soup(self):
+        """Árbol de la página; se construye recién en el primer acceso"""
+        if self._soup is None and self.content is not None:
+            parse_only = self.parse_only if SCRAPING_CONFIG['partial_parse'] else None
+            self._soup = build_soup(self.content, parse_only=parse_only)
+        return self._soup
+    
+    @soup.setter
+    def soup(self, value):
+        self._soup = value
+    
+    def load_page(self, retries=None):
+        """Obtiene el HTML crudo de la página; el DOM se construye solo si se consulta"""
+        if self.content is None:
+            self.response = self.fetch_strategy.fetch(
+                self.url, 
+                self.custom_cookies,
+                retries
+            )
+            if self.response is None:
+                return False
+            
+            self.content = self.response.content
+            archive = get_page_archive()
+            if archive:
+                archive.store(self.url, self.content, type(self).__name__)
+        
+        return self.content is not None
+    
+    def release(self):
+        """Libera el DOM y el cuerpo de la respuesta una vez extraídos los datos"""
+        if self._soup is not None and hasattr(self._soup, 'decompose'):
+            # El árbol de BeautifulSoup tiene referencias cíclicas; decompose las rompe
+            self._soup.decompose()
+        self._soup = None
+        self.response = None
+        self.content = None
     
     def get_element(self, selector, method='css'):
         """Obtiene un elemento de la página de forma segura"""
@@ -1,24 +1,74 @@
+from bs4 import SoupStrainer
 from pages.base_page import BasePage
-from util import log_info, log_error
+from util import log_info, log_error, log_warning
+from util.json_utils import extract_script_json, NEXT_DATA_SCRIPT_ID, JSON_LD_SCRIPT_TYPE
 from config import SCRAPING_CONFIG
 
 class IMDBDetailPage(BasePage):
     """Página de detalle de película que encapsula la información específica"""
     
-    def __init__(self, url, custom_cookies=None):
-        super().__init__(url, custom_cookies)
+    # Solo los nodos que consultan los selectores CSS de respaldo
+    parse_only = SoupStrainer(class_=['metacritic-score-box', 'sc-10bde568-1'])
     
-    def get_metascore(self):
-        """Obtiene el metascore de la película"""
+    def __init__(self, url, custom_cookies=None, content=None):
+        super().__init__(url, custom_cookies, content)
+        self._page_props = None
+        self._json_ld = None
+    
+    def _get_page_props(self):
+        """pageProps del JSON de Next.js, leído directo de los bytes de la página"""
+        if self._page_props is None:
+            next_data = extract_script_json(self.content, NEXT_DATA_SCRIPT_ID) or {}
+            self._page_props = (next_data.get('props') or {}).get('pageProps') or {} if isinstance(next_data, dict) else {}
+        return self._page_props
+    
+    def _get_json_ld(self):
+        """Datos estructurados schema.org (JSON-LD) de la página"""
+        if self._json_ld is None:
+            json_ld = extract_script_json(self.content, JSON_LD_SCRIPT_TYPE, attribute='type')
+            self._json_ld = json_ld if isinstance(json_ld, dict) else {}
+        return self._json_ld
+    
+    def _has_structured_data(self):
+        return bool(self._get_page_props().get('aboveTheFoldData'))
+    
+    def get_structured_metascore(self):
+        """Metascore desde aboveTheFoldData; None si la película no tiene metascore"""
+        metacritic = (self._get_page_props().get('aboveTheFoldData') or {}).get('metacritic') or {}
+        score = (metacritic.get('metascore') or {}).get('score')
+        return str(score) if score is not None else None
+    
+    def get_structured_actors(self):
+        """Reparto desde mainColumnData (cast o castV2), con JSON-LD como respaldo"""
+        main_column = self._get_page_props().get('mainColumnData') or {}
+        
+        names = []
+        # Cualquier nivel puede venir en null: se trata igual que si faltara
+        for edge in (main_column.get('cast') or {}).get('edges') or []:
+            name = ((edge or {}).get('node') or {}).get('name') or {}
+            names.append((name.get('nameText') or {}).get('text'))
+        if not any(names):
+            names = []
+            for group in main_column.get('castV2') or []:
+                for credit in (group or {}).get('credits') or []:
+                    names.append((((credit or {}).get('name') or {}).get('nameText') or {}).get('text'))
+        if not any(names):
+            names = [actor.get('name') for actor in self._get_json_ld().get('actor') or [] if isinstance(actor, dict)]
+        
+        actors = [name.strip() for name in names if isinstance(name, str) and name.strip()]
+        return actors[:SCRAPING_CONFIG['max_actors']]
+    
+    def _get_metascore_from_css(self):
+        """Obtiene el metascore usando la clase generada del DOM"""
         metascore_element = self.get_element('span.sc-9fe7b0ef-0.hDuMnh.metacritic-score-box')
         if metascore_element:
             return metascore_element.text.strip()
         return None
     
-    def get_actors(self):
-        """Obtiene la lista de actores principales"""
+    def _get_actors_from_css(self):
+        """Obtiene los actores usando la clase generada del DOM"""
         
-        actor_elements = self.get_elements('a.sc-10bde568-1.jBmamV')    
+        actor_elements = self.get_elements('a.sc-10bde568-1.jBmamV')
         actors = []
         if actor_elements:
             for actor_element in actor_elements[:SCRAPING_CONFIG['max_actors']]:
@@ -28,6 +78,19 @@ class IMDBDetailPage(BasePage):
         
         return actors
     
+    def get_metascore(self):
+        """Obtiene el metascore de la película"""
+        if self._has_structured_data():
+            return self.get_structured_metascore()
+        return self._get_metascore_from_css()
+    
+    def get_actors(self):
+        """Obtiene la lista de actores principales"""
+        actors = self.get_structured_actors()
+        if actors:
+            return actors
+        return self._get_actors_from_css()
+    
     def extract_data(self):
         """Extrae todos los datos de detalle de la película"""
         log_info(">Ini parse movie detail")
@@ -36,7 +99,22 @@ class IMDBDetailPage(BasePage):
             log_error("No se pudo cargar la página de detalle")
             return None, []
         
-        metascore = self.get_metascore()
-        actors = self.get_actors()
+        try:
+            if not self._has_structured_data():
+                log_warning(f"Sin JSON embebido en {self.url}, se usan los selectores CSS")
+            
+            metascore = self.get_metascore()
+            actors = self.get_actors()
+        finally:
+            self.release()
         
-        return metascore, actors 
\ No newline at end of file
+        if not actors:
+            log_error(f"No se pudieron extraer actores de {self.url}")
+        
+        return metascore, actors
+    
+    def release(self):
+        """Libera también los JSON embebidos ya decodificados"""
+        super().release()
+        self._page_props = None
+        self._json_ld = None
@@ -1,28 +1,42 @@
 import json
 import re
+from bs4 import SoupStrainer
 from pages.base_page import BasePage
-from util import log_info, log_error, convert_duration_to_minutes
+from util import log_info, log_error, log_warning, convert_duration_to_minutes
+from util.json_utils import extract_script_json, NEXT_DATA_SCRIPT_ID
 from config import SCRAPING_CONFIG
 
 class IMDBHomePage(BasePage):
     """Página principal de IMDB que encapsula la lista de películas top"""
     
-    def __init__(self, url, custom_cookies=None):
-        super().__init__(url, custom_cookies)
+    # El respaldo por DOM solo necesita el script de Next.js
+    parse_only = SoupStrainer('script', id=NEXT_DATA_SCRIPT_ID)
+    
+    def __init__(self, url, custom_cookies=None, content=None):
+        super().__init__(url, custom_cookies, content)
         self.movies_data = []
     
+    def _load_next_js_json(self):
+        """Obtiene el JSON de __NEXT_DATA__ leyendo solo su porción de bytes, con el DOM como respaldo"""
+        json_data = extract_script_json(self.content, NEXT_DATA_SCRIPT_ID)
+        if json_data is not None:
+            return json_data
+        
+        log_warning("No se pudo leer __NEXT_DATA__ directo del HTML, se usa el DOM")
+        script_element = self.soup.find('script', id=NEXT_DATA_SCRIPT_ID)
+        if not script_element:
+            log_error("No se encontró el script __NEXT_DATA__")
+            return None
+        
+        return json.loads(script_element.string)
+    
     def _extract_next_js_data(self):
         """Extrae los datos del JSON de Next.js que contiene releaseYear y datos completos"""
         try:
-            # Buscar el script con __NEXT_DATA__
-            script_element = self.soup.find('script', id='__NEXT_DATA__')
-            if not script_element:
-                log_error("No se encontró el script __NEXT_DATA__")
+            json_data = self._load_next_js_json()
+            if json_data is None:
                 return []
             
-            # Parsear el JSON
-            json_data = json.loads(script_element.string)
-            
             # Navegar a la estructura de datos
             chart_titles = json_data.get('props', {}).get('pageProps', {}).get('pageData', {}).get('chartTitles', {}).get('edges', [])
             
@@ -106,6 +120,7 @@ class IMDBHomePage(BasePage):
         
         # Extraer datos del JSON de Next.js
         movies_data = self._extract_next_js_data()
+        self.release()
         if not movies_data:
             log_error("No se pudieron extraer datos de películas")
             return []
@@ -1,14 +1,43 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
 
 class BaseRepository(ABC):
     """Repositorio base siguiendo Clean Architecture"""
     
+    _write_stats = None  # Filas y bytes del último guardado, los completa cada repositorio
+    
     @abstractmethod
     def save(self, data: List[Dict[str, Any]]) -> bool:
         """Guarda los datos en el repositorio"""
         pass
     
+    def begin_batches(self) -> bool:
+        """Prepara el repositorio antes de una serie de save_batch; las bases con upsert no necesitan vaciarse"""
+        return True
+    
+    def save_batch(self, data: List[Dict[str, Any]]) -> bool:
+        """Agrega un micro-lote a lo ya guardado; por defecto delega en save"""
+        return self.save(data)
+    
+    def save_stream(self, batches: Iterable[List[Dict[str, Any]]]) -> bool:
+        """Guarda los lotes a medida que llegan, sin acumular el flujo completo en memoria"""
+        success = self.begin_batches()
+        for batch in batches:
+            success = self.save_batch(batch) and success
+        return self.end_batches() and success
+    
+    def end_batches(self) -> bool:
+        """Cierra una serie de save_batch (los archivos se publican recién aquí)"""
+        return True
+    
+    def reset_write_stats(self):
+        """Olvida las estadísticas anteriores, para no atribuirlas a la próxima llamada"""
+        self._write_stats = None
+    
+    def get_write_stats(self) -> Dict[str, Optional[int]]:
+        """Filas y bytes escritos por el último guardado; None si el repositorio no los mide"""
+        return dict(self._write_stats or {'rows': None, 'bytes': None})
+    
     @abstractmethod
     def delete_all(self) -> bool:
         """Elimina todos los datos del repositorio"""
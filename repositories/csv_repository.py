@@ -1,48 +1,20 @@
 import csv
-import os
 from typing import List, Dict, Any
-from repositories.base_repository import BaseRepository
-from util import log_info, log_error
+from repositories.file_sink_repository import FileSinkRepository, MOVIE_FIELDS, LIST_FIELDS
 
-class CSVRepository(BaseRepository):
+# Separador de los valores de las columnas de lista (actors, genres) dentro de una celda
+LIST_SEPARATOR = "|"
+
+class CSVRepository(FileSinkRepository):
     """Repositorio que guarda datos en archivos CSV"""
     
-    def __init__(self, filename: str, data_dir: str = "data"):
-        self.filename = filename
-        self.data_dir = data_dir
-        self.filepath = os.path.join(data_dir, f"{filename}.csv")
-        
-        # Crear directorio si no existe
-        os.makedirs(data_dir, exist_ok=True)
+    extension = "csv"
     
-    def save(self, data: List[Dict[str, Any]]) -> bool:
-        """Guarda los datos en un archivo CSV"""
-        if not data:
-            log_error("No hay datos para guardar")
-            return False
-        
-        try:
-            fieldnames = data[0].keys()
-            
-            with open(self.filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(data)
-            
-            log_info(f"Datos guardados exitosamente en {self.filepath}")
-            return True
-            
-        except Exception as e:
-            log_error(f"Error guardando datos en CSV {self.filepath}: {e}")
-            return False
+    def _write_header(self, text):
+        csv.writer(text).writerow(MOVIE_FIELDS)
     
-    def delete_all(self) -> bool:
-        """Elimina el archivo CSV"""
-        try:
-            if os.path.exists(self.filepath):
-                os.remove(self.filepath)
-                log_info(f"Archivo {self.filepath} eliminado")
-            return True
-        except Exception as e:
-            log_error(f"Error eliminando archivo {self.filepath}: {e}")
-            return False 
\ No newline at end of file
+    def _write_records(self, text, records: List[Dict[str, Any]]):
+        for record in records:
+            for field in LIST_FIELDS:
+                record[field] = LIST_SEPARATOR.join(record[field])
+        csv.DictWriter(text, fieldnames=MOVIE_FIELDS).writerows(records)
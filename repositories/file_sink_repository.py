@@ -0,0 +1,250 @@
+import gzip
+import io
+import os
+import uuid
+from abc import abstractmethod
+from typing import List, Dict, Any, Iterable
+from repositories.base_repository import BaseRepository
+from util import log_info, log_error, log_warning, file_lock
+from config import FILE_SINK_CONFIG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_COMPRESSION = "gzip"
+ZSTD_COMPRESSION = "zstd"
+COMPRESSION_SUFFIXES = {GZIP_COMPRESSION: '.gz', ZSTD_COMPRESSION: '.zst'}
+
+# Esquema fijo de los archivos exportados, en el orden de las columnas
+MOVIE_FIELDS = [
+    'title', 'original_title', 'year', 'rating', 'duration', 'description',
+    'genres', 'detail_url', 'actors', 'metascore',
+]
+LIST_FIELDS = ('genres', 'actors')
+
+class CompressedWriter:
+    """Archivo de texto que escribe a través del compresor configurado"""
+
+    def __init__(self, path, mode, compression=None, level=6):
+        self.raw = open(path, mode)
+        self.start = self.raw.tell()
+        if compression == GZIP_COMPRESSION:
+            self.stream = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=level)
+        elif compression == ZSTD_COMPRESSION:
+            self.stream = zstandard.ZstdCompressor(level=level).stream_writer(self.raw, closefd=False)
+        else:
+            self.stream = None
+        self.text = io.TextIOWrapper(self.stream or self.raw, encoding='utf-8', newline='')
+
+    def close(self):
+        """Vacía el compresor y hace fsync; retorna los bytes que quedaron en disco"""
+        self.text.flush()
+        self.text.detach()
+        if self.stream is not None:
+            self.stream.close()  # Escribe el final del bloque comprimido; el archivo sigue abierto
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        written = self.raw.tell() - self.start
+        self.raw.close()
+        return written
+
+    def abort(self):
+        """Cierra sin fsync; lo escrito se descarta junto con el temporal"""
+        for close in (self.text.close, self.raw.close):
+            try:
+                close()
+            except (OSError, ValueError):
+                pass
+
+
+class FileSinkRepository(BaseRepository):
+    """
+    Base de los repositorios de archivo. Escribe por lotes, sin tener el listado completo en
+    memoria, a un temporal del mismo directorio que se publica con un rename atómico: una
+    caída a mitad de camino deja el archivo anterior intacto.
+    """
+
+    extension = None
+
+    def __init__(self, filename: str, data_dir: str = "data", compression=None):
+        self.filename = filename
+        self.data_dir = data_dir
+        self.compression = self._resolve_compression(compression or FILE_SINK_CONFIG['compression'])
+        self.compression_level = FILE_SINK_CONFIG['compression_level']
+        self.filepath = os.path.join(
+            data_dir, f"{filename}.{self.extension}{COMPRESSION_SUFFIXES.get(self.compression, '')}"
+        )
+        # Serializa entre procesos (workers de la cola) los agregados y la publicación del archivo
+        self.lock_path = os.path.join(data_dir, f".{os.path.basename(self.filepath)}.lock")
+        self._writer = None  # Escritura en curso entre begin_batches y end_batches
+        self._temp_path = None
+        self._stream_rows = 0
+        self._stream_failed = False
+
+        # Crear directorio si no existe
+        os.makedirs(data_dir, exist_ok=True)
+
+    @staticmethod
+    def _resolve_compression(compression):
+        if compression == ZSTD_COMPRESSION and zstandard is None:
+            log_warning("zstandard no está instalado, se comprime con gzip")
+            return GZIP_COMPRESSION
+        if compression not in (None, GZIP_COMPRESSION, ZSTD_COMPRESSION):
+            raise ValueError(f"Compresión desconocida: {compression}")
+        return compression
+
+    @staticmethod
+    def to_record(movie: Dict[str, Any]) -> Dict[str, Any]:
+        """Lleva una película al esquema fijo: columnas faltantes vacías y claves extra descartadas"""
+        record = {field: movie.get(field) for field in MOVIE_FIELDS}
+        for field in LIST_FIELDS:
+            record[field] = [value for value in (record[field] or []) if value]
+        return record
+
+    @abstractmethod
+    def _write_header(self, text):
+        """Escribe la cabecera del formato (si tiene) al comenzar un archivo"""
+        pass
+
+    @abstractmethod
+    def _write_records(self, text, records: List[Dict[str, Any]]):
+        """Escribe un lote de registros ya llevados al esquema"""
+        pass
+
+    def _open_writer(self, path, mode):
+        return CompressedWriter(path, mode, self.compression, self.compression_level)
+
+    def _encode_block(self, records, with_header):
+        """Lote ya comprimido como un bloque completo (miembro gzip o frame zstd) que se puede concatenar"""
+        text = io.StringIO(newline='')
+        if with_header:
+            self._write_header(text)
+        self._write_records(text, records)
+        data = text.getvalue().encode('utf-8')
+        if self.compression == GZIP_COMPRESSION:
+            return gzip.compress(data, compresslevel=self.compression_level)
+        if self.compression == ZSTD_COMPRESSION:
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(data)
+        return data
+
+    def _new_temp_path(self):
+        # Nombre único en el mismo directorio: el rename final no cruza sistemas de archivos
+        return os.path.join(
+            self.data_dir, f".{os.path.basename(self.filepath)}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        )
+    
+    def _discard_stream(self):
+        if self._writer is not None:
+            self._writer.abort()
+        if self._temp_path and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+        self._writer = None
+        self._temp_path = None
+
+    def save(self, data: List[Dict[str, Any]]) -> bool:
+        """Reemplaza el archivo con los datos, de forma atómica"""
+        if not data:
+            log_error("No hay datos para guardar")
+            return False
+        return self.save_stream([data])
+
+    def save_stream(self, batches: Iterable[List[Dict[str, Any]]]) -> bool:
+        """Escribe los lotes a medida que llegan y publica el archivo completo al final"""
+        if not self.begin_batches():
+            return False
+        for batch in batches:
+            if not self.save_batch(batch):
+                break
+        return self.end_batches()
+
+    def begin_batches(self) -> bool:
+        """Abre un temporal junto al archivo final; los save_batch siguientes escriben en él"""
+        self._discard_stream()
+        try:
+            self._temp_path = self._new_temp_path()
+            self._writer = self._open_writer(self._temp_path, 'xb')
+            self._write_header(self._writer.text)
+            self._stream_rows = 0
+            self._stream_failed = False
+            return True
+        except Exception as e:
+            log_error(f"Error abriendo temporal para {self.filepath}: {e}")
+            self._discard_stream()
+            return False
+
+    def save_batch(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        Escribe un lote en el temporal abierto por begin_batches. Sin escritura abierta (workers
+        de la cola) agrega al archivo publicado el lote como un bloque comprimido completo; si la
+        escritura falla, el archivo se trunca al tamaño que tenía y no queda un bloque a medias.
+        """
+        if not data:
+            return True
+
+        if self._writer is not None:
+            try:
+                self._write_records(self._writer.text, [self.to_record(movie) for movie in data])
+                self._stream_rows += len(data)
+                return True
+            except Exception as e:
+                log_error(f"Error escribiendo lote en {self.filepath}: {e}")
+                self._stream_failed = True
+                return False
+
+        try:
+            records = [self.to_record(movie) for movie in data]
+            # Sin buffer: si write falla no queda nada pendiente que se escriba después del truncate
+            with file_lock(self.lock_path), open(self.filepath, 'ab', buffering=0) as published:
+                size = published.seek(0, os.SEEK_END)
+                # El bloque se arma con el lock tomado: solo el primero del archivo lleva cabecera
+                block = self._encode_block(records, with_header=size == 0)
+                try:
+                    pending = memoryview(block)
+                    while pending:
+                        pending = pending[published.write(pending):]
+                    os.fsync(published.fileno())
+                except Exception:
+                    published.truncate(size)
+                    raise
+                self._write_stats = {'rows': len(records), 'bytes': len(block)}
+            log_info(f"{len(records)} filas agregadas a {self.filepath}")
+            return True
+        except Exception as e:
+            log_error(f"Error agregando lote a {self.filepath}: {e}")
+            return False
+
+    def end_batches(self) -> bool:
+        """Cierra el temporal y lo publica sobre el archivo final; si un lote falló se descarta"""
+        if self._writer is None:
+            return True
+        if self._stream_failed:
+            log_error(f"Se descarta la escritura de {self.filepath}: falló un lote, queda el archivo anterior")
+            self._discard_stream()
+            return False
+        try:
+            written = self._writer.close()
+            self._writer = None
+            with file_lock(self.lock_path):
+                os.replace(self._temp_path, self.filepath)
+            self._temp_path = None
+            self._write_stats = {'rows': self._stream_rows, 'bytes': written}
+            log_info(f"Datos guardados exitosamente en {self.filepath} ({self._stream_rows} filas)")
+            return True
+        except Exception as e:
+            log_error(f"Error publicando {self.filepath}: {e}")
+            self._discard_stream()
+            return False
+
+    def delete_all(self) -> bool:
+        """Elimina el archivo publicado y cualquier escritura en curso"""
+        try:
+            self._discard_stream()
+            if os.path.exists(self.filepath):
+                os.remove(self.filepath)
+                log_info(f"Archivo {self.filepath} eliminado")
+            return True
+        except Exception as e:
+            log_error(f"Error eliminando archivo {self.filepath}: {e}")
+            return False
@@ -0,0 +1,14 @@
+from typing import List, Dict, Any
+from repositories.file_sink_repository import FileSinkRepository
+from util.json_utils import dumps_json
+
+class JSONLinesRepository(FileSinkRepository):
+    """Repositorio que guarda una película por línea en JSON (JSON Lines)"""
+    
+    extension = "jsonl"
+    
+    def _write_header(self, text):
+        pass  # JSON Lines no tiene cabecera
+    
+    def _write_records(self, text, records: List[Dict[str, Any]]):
+        text.write(''.join(dumps_json(record) + '\n' for record in records))
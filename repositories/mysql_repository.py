@@ -1,9 +1,45 @@
-import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 from typing import List, Dict, Any
 from repositories.base_repository import BaseRepository
-from util import log_info, log_error
+from util import log_info, log_error, log_warning, extract_imdb_id
+from config import MYSQL_CONFIG, ANALYTICS_CONFIG
+import csv
 import os
+import tempfile
+import threading
+
+# Resúmenes materializados de las consultas analíticas; se actualizan en la transacción de cada save
+SUMMARY_TABLES = {
+    'decade_top_duration': '''
+        CREATE TABLE IF NOT EXISTS decade_top_duration (
+            decade INT NOT NULL,
+            position INT NOT NULL,
+            movie_id INT NOT NULL,
+            title VARCHAR(300) NOT NULL,
+            year INT NULL,
+            duration INT NULL,
+            PRIMARY KEY (decade, position)
+        ) ENGINE = InnoDB
+    ''',
+    'year_rating_stats': '''
+        CREATE TABLE IF NOT EXISTS year_rating_stats (
+            year INT NOT NULL,
+            movies INT NOT NULL,
+            ratings INT NOT NULL,
+            avg_rating DOUBLE NULL,
+            std_dev DOUBLE NULL,
+            PRIMARY KEY (year)
+        ) ENGINE = InnoDB
+    ''',
+    'movie_lead_actor': '''
+        CREATE TABLE IF NOT EXISTS movie_lead_actor (
+            movie_id INT NOT NULL,
+            actor_id INT NOT NULL,
+            PRIMARY KEY (movie_id),
+            INDEX idx_movie_lead_actor_actor (actor_id)
+        ) ENGINE = InnoDB
+    ''',
+}
 
 class MySQLRepository(BaseRepository):
     """Repositorio que guarda datos en base de datos MySQL"""
@@ -14,112 +50,389 @@ class MySQLRepository(BaseRepository):
         self.user = os.getenv('MYSQL_USER', 'root')
         self.password = os.getenv('MYSQL_PASSWORD', '')
         self.database = os.getenv('MYSQL_DATABASE', 'db_scrap')
-        self.connection = None
-        
-        # Verificar conexión al inicializar
-        self._test_connection()
+        self.batch_size = MYSQL_CONFIG['batch_size']
+        self.load_data_infile = MYSQL_CONFIG['load_data_infile']
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    def _get_pool(self):
+        """
+        Crea el pool de conexiones en el primer uso (no al instanciar el repositorio). Se publica
+        recién con el esquema listo: si _ensure_schema falla, la próxima llamada lo intenta de nuevo
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                pool = pooling.MySQLConnectionPool(
+                    pool_name=MYSQL_CONFIG['pool_name'],
+                    pool_size=MYSQL_CONFIG['pool_size'],
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    database=self.database,
+                    allow_local_infile=self.load_data_infile
+                )
+                log_info(f"Pool de conexiones MySQL creado: {self.host}:{self.port}/{self.database}")
+                self._ensure_schema(pool)
+                self._pool = pool
+            return self._pool
     
     def _get_connection(self):
-        """Obtiene una conexión a MySQL"""
+        """Obtiene una conexión del pool; close() la devuelve al pool"""
         try:
-            connection = mysql.connector.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
-            return connection
+            return self._get_pool().get_connection()
         except Error as e:
             log_error(f"Error conectando a MySQL: {e}")
             return None
     
-    def _test_connection(self):
-        """Prueba la conexión a MySQL"""
-        connection = self._get_connection()
-        if connection and connection.is_connected():
-            log_info(f"Conectado a MySQL: {self.host}:{self.port}/{self.database}")
-            connection.close()
-        else:
-            log_error("No se pudo conectar a MySQL")
-    
-    def _get_or_create_actor(self, cursor, actor_name):
-        """Obtiene un actor existente o lo crea si no existe"""
+    def _ensure_schema(self, pool):
+        """
+        Columna imdb_id, claves únicas que necesitan las inserciones con ON DUPLICATE KEY UPDATE,
+        índices de las consultas y tablas de resúmenes
+        """
+        connection = pool.get_connection()
         try:
-            # Buscar actor existente
-            cursor.execute('SELECT id FROM actors WHERE name = %s', (actor_name,))
-            result = cursor.fetchone()
+            cursor = connection.cursor()
+            cursor.execute('''
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = 'movies' AND column_name = 'imdb_id'
+            ''')
+            if not cursor.fetchone():
+                cursor.execute('ALTER TABLE movies ADD COLUMN imdb_id VARCHAR(16) NULL AFTER id')
+                cursor.execute("UPDATE movies SET imdb_id = REGEXP_SUBSTR(detail_url, 'tt[0-9]+') WHERE imdb_id IS NULL")
+                connection.commit()
+                log_info("Columna imdb_id agregada a movies")
+            for table, index, columns in [
+                ('movies', 'uq_movies_imdb_id', 'imdb_id'),
+                ('actors', 'uq_actors_name', 'name'),
+                ('movie_actors', 'uq_movie_actors', 'movies_id, actors_id'),
+            ]:
+                cursor.execute('''
+                    SELECT 1 FROM information_schema.statistics
+                    WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+                    LIMIT 1
+                ''', (table, index))
+                if cursor.fetchone():
+                    continue
+                try:
+                    cursor.execute(f'ALTER TABLE {table} ADD UNIQUE INDEX {index} ({columns})')
+                    log_info(f"Índice único {index} creado en {table}")
+                except Error as e:
+                    log_warning(f"No se pudo crear el índice único {index} en {table} (¿duplicados previos?): {e}")
+            
+            # Índices de las consultas del dashboard (antes entregables/indices.sql, a mano)
+            for index, columns in [
+                ('idx_rating_year', 'rating DESC, year'),
+                ('idx_movies_year_duration', 'year, duration DESC'),
+            ]:
+                cursor.execute('''
+                    SELECT 1 FROM information_schema.statistics
+                    WHERE table_schema = DATABASE() AND table_name = 'movies' AND index_name = %s
+                    LIMIT 1
+                ''', (index,))
+                if not cursor.fetchone():
+                    cursor.execute(f'CREATE INDEX {index} ON movies ({columns})')
+                    log_info(f"Índice {index} creado en movies")
             
-            if result:
-                return result[0]  # Retorna el ID del actor existente
+            # Resúmenes materializados; en una base anterior a ellos se calculan completos una vez
+            cursor.execute('''
+                SELECT COUNT(*) FROM information_schema.tables
+                WHERE table_schema = DATABASE() AND table_name IN ({})
+            '''.format(', '.join(['%s'] * len(SUMMARY_TABLES))), list(SUMMARY_TABLES))
+            missing = cursor.fetchone()[0] < len(SUMMARY_TABLES)
+            for ddl in SUMMARY_TABLES.values():
+                cursor.execute(ddl)
+            if missing:
+                self._write_stats = {'rows': 0, 'bytes': 0}
+                self._refresh_summaries(cursor)
+                connection.commit()
+                log_info("Resúmenes por década, año y actor principal calculados")
+            cursor.close()
+        finally:
+            connection.close()
+    
+    def _next_id(self, cursor, table):
+        """Siguiente id de la tabla; FOR UPDATE bloquea a otros escritores hasta el commit"""
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table} FOR UPDATE')
+        return cursor.fetchone()[0] + 1
+    
+    def _insert_rows(self, cursor, insert_sql, row_template, rows, on_duplicate=''):
+        """
+        INSERT multi-fila en lotes de batch_size
+        params:
+            insert_sql: str -> 'INSERT INTO tabla (columnas)'
+            row_template: str -> placeholders de una fila, ej. '(%s, %s, NOW())'
+            rows: list -> tuplas con los valores de cada fila
+            on_duplicate: str -> cláusula ON DUPLICATE KEY UPDATE opcional
+        """
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            sql = f"{insert_sql} VALUES {', '.join([row_template] * len(batch))} {on_duplicate}"
+            self._execute_write(cursor, sql, [value for row in batch for value in row])
+    
+    def _execute_write(self, cursor, sql, params):
+        """Ejecuta una escritura y acumula filas afectadas y bytes enviados al servidor"""
+        cursor.execute(sql, params)
+        self._write_stats['rows'] += max(cursor.rowcount, 0)
+        self._write_stats['bytes'] += len((cursor.statement or '').encode('utf-8'))
+    
+    def _select_pairs(self, cursor, query, values):
+        """Ejecuta query con un IN (%s) en bloques de batch_size"""
+        rows = []
+        for i in range(0, len(values), self.batch_size):
+            chunk = values[i:i + self.batch_size]
+            cursor.execute(query.format(', '.join(['%s'] * len(chunk))), chunk)
+            rows.extend(cursor.fetchall())
+        return rows
+    
+    def _resolve_actor_ids(self, cursor, names):
+        """Resuelve los ids de todos los actores en bloque, creando de una vez los que faltan"""
+        query = 'SELECT name, id FROM actors WHERE name IN ({})'
+        actor_ids = dict(self._select_pairs(cursor, query, names))
+        new_names = [name for name in names if name not in actor_ids]
+        if new_names:
+            first_id = self._next_id(cursor, 'actors')
+            self._insert_rows(
+                cursor,
+                'INSERT INTO actors (id, name, created_at)',
+                '(%s, %s, NOW())',
+                [(first_id + i, name) for i, name in enumerate(new_names)],
+                'ON DUPLICATE KEY UPDATE id = id'
+            )
+            # Si otro proceso insertó el mismo nombre antes, vale el id que quedó en la tabla
+            actor_ids.update(self._select_pairs(cursor, query, new_names))
+        return actor_ids
+    
+    def _upsert_movies(self, cursor, movies):
+        """
+        Inserta los títulos nuevos y actualiza los existentes por imdb_id; MySQL no reescribe
+        las filas cuyos valores no cambian
+        returns:
+            tuple -> (dict imdb_id -> id de la fila, cantidad de títulos nuevos)
+        """
+        # El bloqueo va primero: dos escritores no pueden dar el mismo id a títulos nuevos
+        next_id = self._next_id(cursor, 'movies')
+        movie_ids = dict(self._select_pairs(cursor, 'SELECT imdb_id, id FROM movies WHERE imdb_id IN ({})', list(movies)))
+        new_count = 0
+        for imdb_id in movies:
+            if imdb_id not in movie_ids:
+                movie_ids[imdb_id] = next_id + new_count
+                new_count += 1
+        
+        chart_columns = ['title', 'year', 'rating', 'duration', 'detail_url']
+        rows = {True: [], False: []}
+        for imdb_id, movie in movies.items():
+            rows['metascore' in movie].append((
+                movie_ids[imdb_id],
+                imdb_id,
+                movie.get('title', '').strip(),  # Obligatorio, si no existe da ''
+                int(y) if (y := movie.get('year')) and str(y).isdigit() else None,
+                float(r) if (r := movie.get('rating')) and str(r).replace('.', '', 1).isdigit() else None,
+                int(d) if (d := movie.get('duration')) and str(d).isdigit() else None,
+                int(m) if (m := movie.get('metascore')) and str(m).isdigit() else None,
+                movie.get('detail_url') or None  # Guarda None si está vacío o no existe
+            ))
+        # El metascore solo se pisa si el detalle se obtuvo en esta ejecución
+        for detailed, columns in [(True, chart_columns + ['metascore']), (False, chart_columns)]:
+            if rows[detailed]:
+                self._insert_rows(
+                    cursor,
+                    'INSERT INTO movies (id, imdb_id, title, year, rating, duration, metascore, detail_url, created_at)',
+                    '(%s, %s, %s, %s, %s, %s, %s, %s, NOW())',
+                    rows[detailed],
+                    'ON DUPLICATE KEY UPDATE ' + ', '.join(f'{column} = VALUES({column})' for column in columns)
+                )
+        return movie_ids, new_count
+    
+    def _sync_links(self, cursor, links_by_movie):
+        """
+        Deja en movie_actors exactamente el reparto recibido de cada película
+        params:
+            links_by_movie: dict -> id de película -> ids de actores, en orden
+        returns:
+            tuple -> (relaciones agregadas, relaciones eliminadas)
+        """
+        existing = {
+            (movie_id, actor_id): link_id
+            for link_id, movie_id, actor_id in self._select_pairs(
+                cursor, 'SELECT id, movies_id, actors_id FROM movie_actors WHERE movies_id IN ({})', list(links_by_movie)
+            )
+        }
+        wanted = list(dict.fromkeys(
+            (movie_id, actor_id) for movie_id, actor_ids in links_by_movie.items() for actor_id in actor_ids
+        ))
+        wanted_pairs = set(wanted)
+        added = [pair for pair in wanted if pair not in existing]
+        stale = [link_id for pair, link_id in existing.items() if pair not in wanted_pairs]
+        
+        for i in range(0, len(stale), self.batch_size):
+            chunk = stale[i:i + self.batch_size]
+            self._execute_write(cursor, f"DELETE FROM movie_actors WHERE id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+        if added:
+            first_link_id = self._next_id(cursor, 'movie_actors')
+            links = [(first_link_id + i, movie_id, actor_id) for i, (movie_id, actor_id) in enumerate(added)]
+            if self.load_data_infile and len(links) >= MYSQL_CONFIG['load_data_min_rows']:
+                self._load_links_infile(cursor, links)
             else:
-                # Crear nuevo actor
-                cursor.execute('INSERT INTO actors (name, created_at) VALUES (%s, NOW())', (actor_name,))
-                return cursor.lastrowid  # Retorna el ID del nuevo actor
-        except Error as e:
-            log_error(f"Error procesando actor {actor_name}: {e}")
-            return None
+                self._insert_rows(
+                    cursor,
+                    'INSERT INTO movie_actors (id, movies_id, actors_id, create_at)',
+                    '(%s, %s, %s, NOW())',
+                    links,
+                    'ON DUPLICATE KEY UPDATE movies_id = VALUES(movies_id)'
+                )
+        return len(added), len(stale)
+    
+    def _load_links_infile(self, cursor, links):
+        """Camino rápido para cargas grandes: LOAD DATA LOCAL INFILE desde un CSV temporal"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as f:
+            csv.writer(f).writerows(links)
+            path = f.name
+        try:
+            self._write_stats['bytes'] += os.path.getsize(path)
+            self._execute_write(cursor, '''
+                LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE movie_actors
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                LINES TERMINATED BY %s
+                (id, movies_id, actors_id, @create_at)
+                SET create_at = NOW()
+            ''', (path, '\r\n'))
+        finally:
+            os.remove(path)
+    
+    def _stored_years(self, cursor, imdb_ids):
+        """Años guardados de esos títulos: los resúmenes que puede cambiar el guardado"""
+        rows = self._select_pairs(cursor, 'SELECT imdb_id, year FROM movies WHERE imdb_id IN ({})', imdb_ids)
+        return {year for _, year in rows if year is not None}
+    
+    def _refresh_year_stats(self, cursor, years):
+        """Recalcula cantidad, promedio y STDDEV del rating de esos años"""
+        for i in range(0, len(years), self.batch_size):
+            chunk = years[i:i + self.batch_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            self._execute_write(cursor, f'DELETE FROM year_rating_stats WHERE year IN ({placeholders})', chunk)
+            self._execute_write(cursor, f'''
+                INSERT INTO year_rating_stats (year, movies, ratings, avg_rating, std_dev)
+                SELECT year, COUNT(*), COUNT(rating), AVG(rating), STDDEV(rating)
+                FROM movies WHERE year IN ({placeholders}) GROUP BY year
+            ''', chunk)
+    
+    def _refresh_decade_tops(self, cursor, decades):
+        """Recalcula las películas más largas de esas décadas; cada una lee solo su rango de años por índice"""
+        for decade in decades:
+            self._execute_write(cursor, 'DELETE FROM decade_top_duration WHERE decade = %s', (decade,))
+            self._execute_write(cursor, '''
+                INSERT INTO decade_top_duration (decade, position, movie_id, title, year, duration)
+                SELECT %s, ROW_NUMBER() OVER (ORDER BY duration DESC, id), id, title, year, duration
+                FROM movies
+                WHERE year BETWEEN %s AND %s
+                ORDER BY duration DESC, id
+                LIMIT %s
+            ''', (decade, decade, decade + 9, ANALYTICS_CONFIG['top_per_decade']))
+    
+    def _refresh_lead_actors(self, cursor, movie_ids=None):
+        """Actor principal (el de menor id, como la vista) de esas películas; None recalcula todas"""
+        if movie_ids is None:
+            self._execute_write(cursor, 'DELETE FROM movie_lead_actor', ())
+            self._execute_write(cursor, '''
+                INSERT INTO movie_lead_actor (movie_id, actor_id)
+                SELECT movies_id, MIN(actors_id) FROM movie_actors GROUP BY movies_id
+            ''', ())
+            return
+        for i in range(0, len(movie_ids), self.batch_size):
+            chunk = movie_ids[i:i + self.batch_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            self._execute_write(cursor, f'DELETE FROM movie_lead_actor WHERE movie_id IN ({placeholders})', chunk)
+            self._execute_write(cursor, f'''
+                INSERT INTO movie_lead_actor (movie_id, actor_id)
+                SELECT movies_id, MIN(actors_id) FROM movie_actors WHERE movies_id IN ({placeholders}) GROUP BY movies_id
+            ''', chunk)
+    
+    def _refresh_summaries(self, cursor, years=None, movie_ids=None):
+        """
+        Actualiza los resúmenes afectados por un guardado
+        params:
+            years: set -> años con películas escritas (antes y después del cambio); None recalcula todos
+            movie_ids: list -> películas con cambios en el reparto; None recalcula todas
+        """
+        if years is None:
+            self._execute_write(cursor, 'DELETE FROM year_rating_stats', ())
+            self._execute_write(cursor, 'DELETE FROM decade_top_duration', ())
+            cursor.execute('SELECT DISTINCT year FROM movies WHERE year IS NOT NULL')
+            years = {year for (year,) in cursor.fetchall()}
+            self._refresh_lead_actors(cursor)
+        elif movie_ids:
+            self._refresh_lead_actors(cursor, movie_ids)
+        years = sorted(years)
+        self._refresh_year_stats(cursor, years)
+        self._refresh_decade_tops(cursor, sorted({year // 10 * 10 for year in years}))
     
     def save(self, data: List[Dict[str, Any]]) -> bool:
-        """Guarda los datos en la base de datos MySQL"""
+        """Upsert por imdb_id en una sola transacción: solo se escribe lo que cambió"""
         if not data:
             log_error("No hay datos para guardar")
             return False
         
+        movies = {}
+        for movie in data:
+            imdb_id = extract_imdb_id(movie.get('detail_url'))
+            if imdb_id:
+                movies[imdb_id] = movie
+        if len(movies) < len(data):
+            log_warning(f"{len(data) - len(movies)} películas sin id de IMDb en detail_url (o repetidas) no se guardan")
+        
         connection = self._get_connection()
         if not connection:
             return False
         
+        cursor = None
         try:
             cursor = connection.cursor()
+            connection.start_transaction()
+            self._write_stats = {'rows': 0, 'bytes': 0}
             
-            for movie in data:
-                # Insertar película
-                cursor.execute('''
-                    INSERT INTO movies (title, year, rating, duration, metascore, detail_url, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, NOW())
-                ''', (
-                    movie.get('title', '').strip(),  # Obligatorio, si no existe da ''
-                    int(y) if (y := movie.get('year')) and str(y).isdigit() else None,
-                    float(r) if (r := movie.get('rating')) and str(r).replace('.', '', 1).isdigit() else None,
-                    int(d) if (d := movie.get('duration')) and str(d).isdigit() else None,
-                    int(m) if (m := movie.get('metascore')) and str(m).isdigit() else None,
-                    movie.get('detail_url') or None  # Guarda None si está vacío o no existe
-                ))
-                
-                movie_id = cursor.lastrowid
-                
-                # Procesar actores
-                actors = movie.get('actors', [])
-                for actor_name in actors:
-                    if actor_name:
-                        # Obtener o crear actor
-                        actor_id = self._get_or_create_actor(cursor, actor_name)
-                        
-                        if actor_id:
-                            # Crear relación en tabla intermedia
-                            try:
-                                cursor.execute('''
-                                    INSERT INTO movie_actors (movies_id, actors_id, create_at)
-                                    VALUES (%s, %s, NOW())
-                                ''', (movie_id, actor_id))
-                            except Error as e:
-                                # La relación ya existe o hay error, ignorar
-                                log_error(f"Error creando relación movie-actor: {e}")
-                                pass
+            years = self._stored_years(cursor, list(movies))
+            rows_before = self._write_stats['rows']
+            movie_ids, new_movies = self._upsert_movies(cursor, movies)
+            if self._write_stats['rows'] > rows_before:
+                years |= self._stored_years(cursor, list(movies))
+            else:
+                years = set()
+            
+            # El reparto solo se toca en películas cuyo detalle se obtuvo; si falló se conserva el guardado
+            detailed = {imdb_id: movie for imdb_id, movie in movies.items() if 'metascore' in movie}
+            names = list(dict.fromkeys(
+                actor_name for movie in detailed.values() for actor_name in movie.get('actors', []) if actor_name
+            ))
+            actor_ids = self._resolve_actor_ids(cursor, names)
+            added, removed = self._sync_links(cursor, {
+                movie_ids[imdb_id]: [actor_ids[actor_name] for actor_name in movie.get('actors', []) if actor_name]
+                for imdb_id, movie in detailed.items()
+            })
+            
+            # Solo se recalculan los años, décadas y películas que tocó este guardado
+            self._refresh_summaries(
+                cursor,
+                years,
+                [movie_ids[imdb_id] for imdb_id in detailed] if added or removed else []
+            )
             
             connection.commit()
-            log_info(f"{len(data)} películas guardadas en MySQL")
+            log_info(
+                f"{len(movies)} películas guardadas en MySQL: {new_movies} nuevas, "
+                f"{added} relaciones agregadas y {removed} eliminadas"
+            )
             return True
-                
-        except Error as e:
+        
+        except Exception as e:
+            # No solo errores de MySQL: un TypeError al armar las filas también deja la transacción abierta
             log_error(f"Error guardando datos en MySQL: {e}")
             connection.rollback()
             return False
         finally:
-            if connection.is_connected():
+            if cursor is not None:
                 cursor.close()
-                connection.close()
+            connection.close()
     
     def delete_all(self) -> bool:
         """Elimina todas las películas, actores y relaciones de la base de datos MySQL"""
@@ -134,16 +447,64 @@ class MySQLRepository(BaseRepository):
             cursor.execute('DELETE FROM movie_actors')
             cursor.execute('DELETE FROM movies')
             cursor.execute('DELETE FROM actors')
+            for table in SUMMARY_TABLES:
+                cursor.execute(f'DELETE FROM {table}')
             
             connection.commit()
             log_info("Todas las películas, actores y relaciones eliminadas de MySQL")
             return True
-            
+        
         except Error as e:
             log_error(f"Error eliminando datos de MySQL: {e}")
             connection.rollback()
             return False
         finally:
-            if connection.is_connected():
-                cursor.close()
-                connection.close() 
\ No newline at end of file
+            cursor.close()
+            connection.close()
+    
+    def _fetch_dicts(self, query, params=()):
+        """Ejecuta una consulta de lectura y retorna las filas como dicts"""
+        connection = self._get_connection()
+        if not connection:
+            return []
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            return rows
+        except Error as e:
+            log_error(f"Error consultando MySQL: {e}")
+            return []
+        finally:
+            connection.close()
+    
+    def get_top_duration_by_decade(self) -> List[Dict[str, Any]]:
+        """Consulta 1 desde el resumen materializado: las películas más largas de cada década"""
+        return self._fetch_dicts('''
+            SELECT title, year, duration, decade AS decada
+            FROM decade_top_duration
+            ORDER BY decade, position
+        ''')
+    
+    def get_rating_stats_by_year(self) -> List[Dict[str, Any]]:
+        """Consulta 2 desde el resumen materializado: desviación estándar del rating por año"""
+        return self._fetch_dicts('''
+            SELECT year, movies, avg_rating, ROUND(std_dev, 2) AS std_dev
+            FROM year_rating_stats
+            ORDER BY year
+        ''')
+    
+    def get_lead_actors(self, actor_name: str = None) -> List[Dict[str, Any]]:
+        """Vista del actor principal desde el resumen materializado, opcionalmente filtrada por actor"""
+        query = '''
+            SELECT l.movie_id, m.title, l.actor_id, a.name AS actor_name
+            FROM movie_lead_actor l
+            JOIN movies m ON m.id = l.movie_id
+            JOIN actors a ON a.id = l.actor_id
+        '''
+        params = ()
+        if actor_name is not None:
+            query += ' WHERE a.name = %s'
+            params = (actor_name,)
+        return self._fetch_dicts(query + ' ORDER BY l.movie_id', params)
@@ -0,0 +1,234 @@
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from repositories.base_repository import BaseRepository
+from util import log_info, log_error, extract_imdb_id
+from config import PARQUET_CONFIG
+
+# Columnas tipadas del dataset; decade es la partición (directorio decade=1990/)
+PARQUET_SCHEMA = pa.schema([
+    ('imdb_id', pa.string()),
+    ('title', pa.string()),
+    ('original_title', pa.string()),
+    ('year', pa.int16()),
+    ('rating', pa.float32()),
+    ('duration', pa.int16()),
+    ('metascore', pa.int16()),
+    ('description', pa.string()),
+    ('genres', pa.list_(pa.string())),
+    ('actors', pa.list_(pa.string())),
+    ('detail_url', pa.string()),
+    ('saved_at', pa.timestamp('ms', tz='UTC')),
+    ('decade', pa.int16()),
+])
+PARTITIONING = ds.partitioning(pa.schema([('decade', pa.int16())]), flavor='hive')
+
+class ParquetRepository(BaseRepository):
+    """
+    Repositorio columnar: dataset Parquet particionado por década, con columnas tipadas y
+    estadísticas por row group para que los filtros salteen archivos y grupos enteros.
+    save reemplaza el dataset; dentro de un flujo cada lote se escribe en un directorio aparte
+    que end_batches publica; save_batch fuera de un flujo agrega archivos (corridas incrementales).
+    """
+
+    def __init__(self, dataset_dir=None, row_group_size=None, compression=None):
+        self.dataset_dir = dataset_dir or PARQUET_CONFIG['dataset_dir']
+        self.row_group_size = row_group_size or PARQUET_CONFIG['row_group_size']
+        self.compression = compression or PARQUET_CONFIG['compression']
+        self._staging_dir = None  # Directorio que escriben los lotes entre begin_batches y end_batches
+        self._stream_rows = 0
+        self._stream_bytes = 0
+        self._stream_failed = False
+
+        os.makedirs(os.path.dirname(self.dataset_dir) or '.', exist_ok=True)
+
+    def to_table(self, data: List[Dict[str, Any]]) -> pa.Table:
+        """Convierte las películas al esquema tipado; los valores no numéricos quedan nulos"""
+        df = pd.DataFrame({
+            'imdb_id': [extract_imdb_id(movie.get('detail_url')) for movie in data],
+            'title': [movie.get('title') for movie in data],
+            'original_title': [movie.get('original_title') for movie in data],
+            'year': pd.to_numeric(pd.Series([movie.get('year') for movie in data], dtype=object), errors='coerce'),
+            'rating': pd.to_numeric(pd.Series([movie.get('rating') for movie in data], dtype=object), errors='coerce'),
+            'duration': pd.to_numeric(pd.Series([movie.get('duration') for movie in data], dtype=object), errors='coerce'),
+            'metascore': pd.to_numeric(pd.Series([movie.get('metascore') for movie in data], dtype=object), errors='coerce'),
+            'description': [movie.get('description') for movie in data],
+            'genres': [[value for value in movie.get('genres') or [] if value] for movie in data],
+            'actors': [[value for value in movie.get('actors') or [] if value] for movie in data],
+            'detail_url': [movie.get('detail_url') for movie in data],
+        })
+        df['saved_at'] = pd.Timestamp(datetime.now(timezone.utc)).floor('ms')
+        for column in ('year', 'duration', 'metascore'):
+            df[column] = df[column].round().astype('Int16')
+        df['rating'] = df['rating'].astype('Float32')
+        df['decade'] = (df['year'] // 10 * 10).astype('Int16')
+        # Orden por partición y año: row groups con rangos de min/max estrechos
+        df = df.sort_values(['decade', 'year', 'rating'], ascending=[True, True, False], na_position='last')
+        return pa.Table.from_pandas(df, schema=PARQUET_SCHEMA, preserve_index=False)
+
+    def _write(self, table, base_dir):
+        """Escribe la tabla en las particiones de base_dir; retorna los bytes de los archivos nuevos"""
+        sizes = []
+        ds.write_dataset(
+            table,
+            base_dir,
+            format='parquet',
+            partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+            max_rows_per_group=self.row_group_size,
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression=self.compression,
+                write_statistics=True
+            ),
+            file_visitor=lambda written_file: sizes.append(os.path.getsize(written_file.path))
+        )
+        return sum(sizes)
+
+    def _new_staging_dir(self):
+        return f"{self.dataset_dir}.{uuid.uuid4().hex[:8]}.tmp"
+
+    def _publish(self, staging_dir, rows, written):
+        """Intercambia el directorio escrito aparte con el dataset publicado"""
+        previous_dir = f"{staging_dir}.old"
+        try:
+            if os.path.exists(self.dataset_dir):
+                os.replace(self.dataset_dir, previous_dir)
+            try:
+                os.replace(staging_dir, self.dataset_dir)
+            except OSError:
+                os.replace(previous_dir, self.dataset_dir)
+                raise
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            shutil.rmtree(previous_dir, ignore_errors=True)
+        self._write_stats = {'rows': rows, 'bytes': written}
+        log_info(f"Dataset Parquet guardado en {self.dataset_dir}: {rows} filas, {written / 1024:.0f} KB")
+
+    def _replace(self, table):
+        """Escribe el dataset completo en un directorio aparte y lo intercambia con el publicado"""
+        staging_dir = self._new_staging_dir()
+        try:
+            written = self._write(table, staging_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        self._publish(staging_dir, table.num_rows, written)
+
+    def _discard_stream(self):
+        if self._staging_dir:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+        self._staging_dir = None
+
+    def save(self, data: List[Dict[str, Any]]) -> bool:
+        """Reemplaza el dataset con los datos"""
+        if not data:
+            log_error("No hay datos para guardar")
+            return False
+        try:
+            self._replace(self.to_table(data))
+            return True
+        except Exception as e:
+            log_error(f"Error guardando dataset Parquet {self.dataset_dir}: {e}")
+            return False
+
+    def begin_batches(self) -> bool:
+        """Los save_batch siguientes escriben en un directorio aparte, sin acumular lotes en memoria"""
+        self._discard_stream()
+        self._staging_dir = self._new_staging_dir()
+        self._stream_rows = 0
+        self._stream_bytes = 0
+        self._stream_failed = False
+        return True
+
+    def save_batch(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        Dentro de un flujo escribe el lote en el directorio aparte que publica end_batches. Fuera
+        de un flujo agrega archivos nuevos a las particiones sin reescribir los existentes.
+        """
+        if not data:
+            return True
+        if self._staging_dir is not None:
+            try:
+                table = self.to_table(data)
+                self._stream_bytes += self._write(table, self._staging_dir)
+                self._stream_rows += table.num_rows
+                return True
+            except Exception as e:
+                log_error(f"Error escribiendo lote del dataset Parquet {self.dataset_dir}: {e}")
+                self._stream_failed = True
+                return False
+        try:
+            table = self.to_table(data)
+            written = self._write(table, self.dataset_dir)
+            self._write_stats = {'rows': table.num_rows, 'bytes': written}
+            log_info(f"{table.num_rows} filas agregadas al dataset Parquet {self.dataset_dir}")
+            return True
+        except Exception as e:
+            log_error(f"Error agregando lote al dataset Parquet {self.dataset_dir}: {e}")
+            return False
+
+    def end_batches(self) -> bool:
+        """
+        Publica lo escrito durante el flujo; si un lote falló queda el dataset anterior. Un flujo
+        sin filas publica un dataset vacío, como el CSV queda solo con la cabecera: el coordinador
+        de la cola lo usa para que los workers no agreguen sobre la corrida anterior.
+        """
+        if self._staging_dir is None:
+            return True
+        staging_dir, self._staging_dir = self._staging_dir, None
+        if self._stream_failed:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            log_error(f"Se descarta la escritura de {self.dataset_dir}: falló un lote, queda el dataset anterior")
+            return False
+        try:
+            # Sin lotes write_dataset nunca creó el directorio
+            os.makedirs(staging_dir, exist_ok=True)
+            self._publish(staging_dir, self._stream_rows, self._stream_bytes)
+            return True
+        except Exception as e:
+            log_error(f"Error guardando dataset Parquet {self.dataset_dir}: {e}")
+            return False
+
+    def load(self, where=None, columns=None) -> pd.DataFrame:
+        """
+        Lee el dataset; con filtro solo se abren las particiones y row groups que pueden coincidir
+        params:
+            where: pyarrow.dataset.Expression -> ej. (ds.field('decade') == 1990) & (ds.field('rating') > 8.5)
+            columns: list -> columnas a leer; None lee todas
+        returns:
+            pd.DataFrame -> una fila por imdb_id (si se agregó varias veces, la más reciente)
+        """
+        if not os.path.exists(self.dataset_dir):
+            return pd.DataFrame(columns=columns or PARQUET_SCHEMA.names)
+        dataset = ds.dataset(self.dataset_dir, format='parquet', partitioning=PARTITIONING, schema=PARQUET_SCHEMA)
+        read_columns = None if columns is None else list(dict.fromkeys(list(columns) + ['imdb_id', 'saved_at']))
+        # Los enteros con nulos se leen como Int16 de pandas, no como float
+        df = dataset.to_table(columns=read_columns, filter=where).to_pandas(types_mapper={pa.int16(): pd.Int16Dtype()}.get)
+        df = df.sort_values('saved_at', kind='stable')
+        df = df[df['imdb_id'].isna() | ~df.duplicated('imdb_id', keep='last')]
+        if where is not None and not df.empty:
+            # La versión más reciente de cada título se decide sin filtro (solo las dos columnas clave):
+            # si un título se actualizó y su versión nueva no cumple el filtro, la vieja no debe aparecer
+            keys = dataset.to_table(columns=['imdb_id', 'saved_at']).to_pandas()
+            latest = keys.groupby('imdb_id')['saved_at'].max()
+            df = df[df['imdb_id'].isna() | (df['saved_at'] == df['imdb_id'].map(latest))]
+        df = df.reset_index(drop=True)
+        return df[columns] if columns is not None else df
+
+    def delete_all(self) -> bool:
+        """Elimina el dataset completo"""
+        try:
+            self._discard_stream()
+            if os.path.exists(self.dataset_dir):
+                shutil.rmtree(self.dataset_dir)
+                log_info(f"Dataset {self.dataset_dir} eliminado")
+            return True
+        except Exception as e:
+            log_error(f"Error eliminando dataset {self.dataset_dir}: {e}")
+            return False
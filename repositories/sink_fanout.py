@@ -0,0 +1,133 @@
+import threading
+import time
+from util import log_info, log_error
+from config import SINK_CONFIG
+
+# Guardados vencidos que siguen en curso: id del repositorio -> hilo. Mientras el hilo viva,
+# el repositorio se considera ocupado y no recibe otro guardado
+_running = {}
+_running_lock = threading.Lock()
+
+def is_busy(repository):
+    """True si un guardado anterior de este repositorio venció y todavía no terminó"""
+    with _running_lock:
+        thread = _running.get(id(repository))
+        if thread is not None and not thread.is_alive():
+            del _running[id(repository)]
+            thread = None
+        return thread is not None
+
+def new_result(success=False):
+    """Resultado de guardado de un repositorio; la misma forma para save_data y los flujos por lotes"""
+    return {'success': success, 'rows': 0, 'bytes': 0, 'seconds': None, 'error': None}
+
+class SinkFanout:
+    """
+    Guarda los mismos datos en varios repositorios a la vez, uno por hilo. Cada repositorio
+    tiene su timeout y sus errores no afectan a los demás: un MySQL lento ya no demora al CSV.
+    Los hilos son daemon: un repositorio colgado no impide que el proceso termine.
+    """
+
+    def __init__(self, repositories, timeouts=None):
+        self.repositories = repositories
+        self.timeouts = {**SINK_CONFIG['timeouts'], **(timeouts or {})}
+
+    def _get_timeout(self, name):
+        return self.timeouts.get(name, SINK_CONFIG['default_timeout'])
+
+    def _save(self, name, repository, data, outcome):
+        log_info(f"Guardando datos en {name}...")
+        start = time.perf_counter()
+        try:
+            outcome.update(success=repository.save(data))
+        except Exception as e:
+            outcome.update(success=False, error=str(e))
+        outcome['seconds'] = time.perf_counter() - start
+
+    def save(self, data):
+        """
+        Guarda en todos los repositorios y espera a cada uno hasta su timeout
+        returns:
+            dict -> por repositorio: success, rows, bytes, seconds y error
+        """
+        results = {name: new_result() for name in self.repositories}
+        if not self.repositories:
+            return results
+
+        start = time.perf_counter()
+        threads = {}
+        for name, repository in self.repositories.items():
+            if is_busy(repository):
+                results[name].update(error="ocupado: un guardado anterior que venció sigue en curso", seconds=0.0)
+                continue
+            outcome = {'success': False, 'error': None, 'seconds': None}
+            thread = threading.Thread(
+                target=self._save, args=(name, repository, data, outcome), name=f"sink-{name}", daemon=True
+            )
+            thread.start()
+            threads[name] = (thread, outcome)
+
+        for name, (thread, outcome) in threads.items():
+            timeout = self._get_timeout(name)
+            thread.join(max(0, start + timeout - time.perf_counter()))
+            result = results[name]
+            if thread.is_alive():
+                # El hilo sigue dentro de save(): el repositorio queda ocupado hasta que termine
+                with _running_lock:
+                    _running[id(self.repositories[name])] = thread
+                result.update(error=f"sin respuesta tras {timeout} s", seconds=round(time.perf_counter() - start, 3))
+            else:
+                result.update(
+                    success=bool(outcome['success']), error=outcome['error'], seconds=round(outcome['seconds'], 3)
+                )
+                if result['success']:
+                    result.update(self.repositories[name].get_write_stats())
+
+        for name, result in results.items():
+            if result['success']:
+                log_info(f"{name}: {result['rows']} filas, {result['bytes']} bytes en {result['seconds']} s")
+            else:
+                log_error(f"{name}: guardado fallido en {result['seconds']} s ({result['error'] or 'ver log'})")
+        log_info(f"Guardado en {len(results)} repositorios en {time.perf_counter() - start:.2f} s")
+        return results
+
+
+class BatchSinkTracker:
+    """
+    Lleva el resultado por repositorio de un guardado por lotes (begin_batches, save_batch,
+    end_batches), con la misma forma que SinkFanout.save: éxito, filas, bytes, tiempo y error
+    """
+
+    def __init__(self, repositories):
+        self.repositories = repositories
+        self.results = {name: new_result(success=True) for name in repositories}
+        for result in self.results.values():
+            result['seconds'] = 0.0
+
+    def call(self, name, method, *args):
+        """Ejecuta un método del repositorio y acumula su resultado; retorna si tuvo éxito"""
+        repository = self.repositories[name]
+        result = self.results[name]
+        if is_busy(repository):
+            result.update(success=False, error="ocupado: un guardado anterior que venció sigue en curso")
+            return False
+        repository.reset_write_stats()
+        start = time.perf_counter()
+        try:
+            success = getattr(repository, method)(*args)
+        except Exception as e:
+            log_error(f"Error en {method} de {name}: {e}")
+            success = False
+            result['error'] = str(e)
+        result['seconds'] = round(result['seconds'] + time.perf_counter() - start, 3)
+        if not success:
+            result['success'] = False
+            return False
+        stats = repository.get_write_stats()
+        result['rows'] += stats['rows'] or 0
+        result['bytes'] += stats['bytes'] or 0
+        return True
+
+    def call_all(self, method, *args):
+        """Ejecuta el método en todos los repositorios; retorna True si todos tuvieron éxito"""
+        return all([self.call(name, method, *args) for name in self.repositories])
@@ -1,8 +1,41 @@
 import sqlite3
 import os
+import statistics
+from contextlib import closing
 from typing import List, Dict, Any
 from repositories.base_repository import BaseRepository
-from util import log_info, log_error
+from util import log_info, log_error, log_warning, extract_imdb_id
+from config import ANALYTICS_CONFIG
+
+# Resúmenes materializados de las consultas analíticas; se actualizan en la transacción de cada save
+SUMMARY_TABLES = {
+    'decade_top_duration': '''
+        CREATE TABLE IF NOT EXISTS decade_top_duration (
+            decade INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            movie_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            year TEXT,
+            duration INTEGER,
+            PRIMARY KEY (decade, position)
+        )
+    ''',
+    'year_rating_stats': '''
+        CREATE TABLE IF NOT EXISTS year_rating_stats (
+            year INTEGER PRIMARY KEY,
+            movies INTEGER NOT NULL,
+            ratings INTEGER NOT NULL,
+            avg_rating REAL,
+            std_dev REAL
+        )
+    ''',
+    'movie_lead_actor': '''
+        CREATE TABLE IF NOT EXISTS movie_lead_actor (
+            movie_id INTEGER PRIMARY KEY,
+            actor_id INTEGER NOT NULL
+        )
+    ''',
+}
 
 class SQLiteRepository(BaseRepository):
     """Repositorio que guarda datos en base de datos SQLite"""
@@ -21,13 +54,14 @@ class SQLiteRepository(BaseRepository):
     def _init_database(self):
         """Inicializa la base de datos con las tablas de películas, actores y relación"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with closing(sqlite3.connect(self.db_path)) as conn:
                 cursor = conn.cursor()
                 
                 # Tabla de películas
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS movies (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        imdb_id TEXT,
                         title TEXT NOT NULL,
                         year TEXT,
                         rating TEXT,
@@ -60,69 +94,287 @@ class SQLiteRepository(BaseRepository):
                     )
                 ''')
                 
+                # Bases creadas antes de la clave imdb_id: se agrega la columna y se completa
+                columns = [row[1] for row in cursor.execute('PRAGMA table_info(movies)')]
+                if 'imdb_id' not in columns:
+                    cursor.execute('ALTER TABLE movies ADD COLUMN imdb_id TEXT')
+                self._backfill_imdb_ids(cursor)
+                cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_movies_imdb_id ON movies (imdb_id)')
+                
+                # Índices de las consultas del dashboard (antes entregables/indices.sql, a mano).
+                # rating es TEXT: el índice va sobre su valor numérico, que es el orden que piden las
+                # consultas (ORDER BY CAST(rating AS REAL) DESC, year); uno sobre el texto ordena '10' < '9'
+                cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_rating_year'")
+                index_sql = (cursor.fetchone() or [''])[0] or ''
+                if index_sql and 'CAST' not in index_sql:
+                    cursor.execute('DROP INDEX idx_rating_year')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_rating_year ON movies (CAST(rating AS REAL) DESC, year)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_year_duration ON movies (year, duration DESC)')
+                
+                # Resúmenes materializados; en una base anterior a ellos se calculan completos una vez
+                existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                for ddl in SUMMARY_TABLES.values():
+                    cursor.execute(ddl)
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_movie_lead_actor_actor ON movie_lead_actor (actor_id)')
+                if not existing.issuperset(SUMMARY_TABLES):
+                    self._refresh_summaries(cursor)
+                    log_info("Resúmenes por década, año y actor principal calculados")
+                
                 conn.commit()
                 log_info(f"Base de datos inicializada: {self.db_path}")
         except Exception as e:
             log_error(f"Error inicializando base de datos: {e}")
     
-    def _get_or_create_actor(self, cursor, actor_name):
-        """Obtiene un actor existente o lo crea si no existe"""
-        cursor.execute('SELECT id FROM actors WHERE name = ?', (actor_name,))
-        result = cursor.fetchone()
+    def _backfill_imdb_ids(self, cursor):
+        """Completa imdb_id desde detail_url; si un título quedó repetido se conserva la fila más reciente"""
+        rows = cursor.execute('SELECT id, detail_url FROM movies WHERE imdb_id IS NULL ORDER BY id').fetchall()
+        latest = {}
+        stale = []
+        for movie_id, detail_url in rows:
+            imdb_id = extract_imdb_id(detail_url)
+            if imdb_id:
+                if imdb_id in latest:
+                    stale.append((latest[imdb_id],))
+                latest[imdb_id] = movie_id
+        if stale:
+            cursor.executemany('DELETE FROM movie_actors WHERE movie_id = ?', stale)
+            cursor.executemany('DELETE FROM movies WHERE id = ?', stale)
+            log_warning(f"{len(stale)} películas repetidas eliminadas al crear la clave imdb_id")
+        cursor.executemany('UPDATE movies SET imdb_id = ? WHERE id = ?', [(imdb_id, movie_id) for imdb_id, movie_id in latest.items()])
+    
+    def _connect(self):
+        """Conexión con WAL y pragmas para escritura masiva"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')  # Con WAL, fsync solo en los checkpoints
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-65536')   # 64 MB de caché de páginas
+        return conn
+    
+    def _select_pairs(self, cursor, query, values):
+        """Ejecuta query con un IN (?) por bloques, para no pasar el límite de parámetros"""
+        rows = []
+        for i in range(0, len(values), 500):
+            chunk = values[i:i + 500]
+            rows.extend(cursor.execute(query.format(','.join('?' * len(chunk))), chunk))
+        return rows
+    
+    def _resolve_actor_ids(self, cursor, names):
+        """Mapa nombre -> id de los actores del lote: se consultan en bloque y solo se insertan los nuevos"""
+        query = 'SELECT name, id FROM actors WHERE name IN ({})'
+        actor_ids = dict(self._select_pairs(cursor, query, names))
+        new_names = [name for name in names if name not in actor_ids]
+        if new_names:
+            cursor.executemany('INSERT OR IGNORE INTO actors (name) VALUES (?)', [(name,) for name in new_names])
+            actor_ids.update(self._select_pairs(cursor, query, new_names))
+        return actor_ids
+    
+    def _upsert_movies(self, cursor, movies):
+        """
+        Inserta los títulos nuevos y actualiza solo los que cambiaron, por imdb_id
+        returns:
+            dict -> imdb_id -> id de la fila
+        """
+        cursor.executemany('''
+            INSERT INTO movies (imdb_id, title, year, rating, duration, metascore, detail_url)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (imdb_id) DO UPDATE SET
+                title = excluded.title,
+                year = excluded.year,
+                rating = excluded.rating,
+                duration = excluded.duration,
+                detail_url = excluded.detail_url
+            WHERE (movies.title, movies.year, movies.rating, movies.duration, movies.detail_url)
+                IS NOT (excluded.title, excluded.year, excluded.rating, excluded.duration, excluded.detail_url)
+        ''', [
+            (
+                imdb_id,
+                movie.get('title', ''),
+                movie.get('year', ''),
+                movie.get('rating', ''),
+                movie.get('duration'),
+                movie.get('metascore'),
+                movie.get('detail_url', '')
+            )
+            for imdb_id, movie in movies.items()
+        ])
+        
+        # El metascore solo se pisa si el detalle se obtuvo en esta ejecución
+        cursor.executemany(
+            'UPDATE movies SET metascore = ? WHERE imdb_id = ? AND metascore IS NOT ?',
+            [(movie['metascore'], imdb_id, movie['metascore']) for imdb_id, movie in movies.items() if 'metascore' in movie]
+        )
+        return dict(self._select_pairs(cursor, 'SELECT imdb_id, id FROM movies WHERE imdb_id IN ({})', list(movies)))
+    
+    def _sync_links(self, cursor, links_by_movie):
+        """
+        Deja en movie_actors exactamente el reparto recibido de cada película
+        params:
+            links_by_movie: dict -> id de película -> ids de actores, en orden
+        returns:
+            tuple -> (relaciones agregadas, relaciones eliminadas)
+        """
+        existing = set(self._select_pairs(
+            cursor, 'SELECT movie_id, actor_id FROM movie_actors WHERE movie_id IN ({})', list(links_by_movie)
+        ))
+        wanted = list(dict.fromkeys(
+            (movie_id, actor_id) for movie_id, actor_ids in links_by_movie.items() for actor_id in actor_ids
+        ))
+        added = [pair for pair in wanted if pair not in existing]
+        stale = existing.difference(wanted)
+        cursor.executemany('DELETE FROM movie_actors WHERE movie_id = ? AND actor_id = ?', sorted(stale))
+        cursor.executemany('INSERT INTO movie_actors (movie_id, actor_id) VALUES (?, ?)', added)
+        return len(added), len(stale)
+    
+    @staticmethod
+    def _year_value(year):
+        """Año como entero; los vacíos o no numéricos no entran en los resúmenes"""
+        return int(year) if year is not None and str(year).isdigit() else None
+    
+    def _stored_years(self, cursor, imdb_ids):
+        """Años guardados de esos títulos: los resúmenes que puede cambiar el guardado"""
+        rows = self._select_pairs(cursor, 'SELECT imdb_id, year FROM movies WHERE imdb_id IN ({})', imdb_ids)
+        return {year for _, value in rows if (year := self._year_value(value)) is not None}
+    
+    def _refresh_year_stats(self, cursor, years):
+        """Recalcula cantidad, promedio y desviación estándar poblacional (STDDEV de MySQL) de esos años"""
+        ratings = {year: [] for year in years}
+        counts = dict.fromkeys(years, 0)
+        for value, rating in self._select_pairs(cursor, 'SELECT year, rating FROM movies WHERE year IN ({})', [str(year) for year in years]):
+            year = self._year_value(value)
+            if year not in counts:
+                continue
+            counts[year] += 1
+            try:
+                ratings[year].append(float(rating))
+            except (TypeError, ValueError):
+                pass
         
-        if result:
-            return result[0]  # Retorna el ID del actor existente
-        else:
-            cursor.execute('INSERT INTO actors (name) VALUES (?)', (actor_name,))
-            return cursor.lastrowid  # Retorna el ID del nuevo actor
+        cursor.executemany('DELETE FROM year_rating_stats WHERE year = ?', [(year,) for year in years])
+        cursor.executemany('INSERT INTO year_rating_stats (year, movies, ratings, avg_rating, std_dev) VALUES (?, ?, ?, ?, ?)', [
+            (
+                year,
+                counts[year],
+                len(ratings[year]),
+                statistics.fmean(ratings[year]) if ratings[year] else None,
+                statistics.pstdev(ratings[year]) if ratings[year] else None
+            )
+            for year in years if counts[year]
+        ])
+    
+    def _refresh_decade_tops(self, cursor, decades):
+        """Recalcula las películas más largas de esas décadas; cada una lee solo su rango de años por índice"""
+        for decade in decades:
+            cursor.execute('DELETE FROM decade_top_duration WHERE decade = ?', (decade,))
+            cursor.execute('''
+                INSERT INTO decade_top_duration (decade, position, movie_id, title, year, duration)
+                SELECT ?, ROW_NUMBER() OVER (ORDER BY duration DESC, id), id, title, year, duration
+                FROM movies
+                WHERE year BETWEEN ? AND ? AND length(year) = 4
+                ORDER BY duration DESC, id
+                LIMIT ?
+            ''', (decade, str(decade), str(decade + 9), ANALYTICS_CONFIG['top_per_decade']))
+    
+    def _refresh_lead_actors(self, cursor, movie_ids=None):
+        """Actor principal (el de menor id, como la vista) de esas películas; None recalcula todas"""
+        if movie_ids is None:
+            cursor.execute('DELETE FROM movie_lead_actor')
+            cursor.execute('INSERT INTO movie_lead_actor SELECT movie_id, MIN(actor_id) FROM movie_actors GROUP BY movie_id')
+            return
+        for i in range(0, len(movie_ids), 500):
+            chunk = movie_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'DELETE FROM movie_lead_actor WHERE movie_id IN ({placeholders})', chunk)
+            cursor.execute(f'''
+                INSERT INTO movie_lead_actor
+                SELECT movie_id, MIN(actor_id) FROM movie_actors WHERE movie_id IN ({placeholders}) GROUP BY movie_id
+            ''', chunk)
+    
+    def _refresh_summaries(self, cursor, years=None, movie_ids=None):
+        """
+        Actualiza los resúmenes afectados por un guardado
+        params:
+            years: set -> años con películas escritas (antes y después del cambio); None recalcula todos
+            movie_ids: list -> películas con cambios en el reparto; None recalcula todas
+        """
+        if years is None:
+            cursor.execute('DELETE FROM year_rating_stats')
+            cursor.execute('DELETE FROM decade_top_duration')
+            years = {year for (value,) in cursor.execute('SELECT DISTINCT year FROM movies') if (year := self._year_value(value)) is not None}
+            self._refresh_lead_actors(cursor)
+        elif movie_ids:
+            self._refresh_lead_actors(cursor, movie_ids)
+        years = sorted(years)
+        self._refresh_year_stats(cursor, years)
+        self._refresh_decade_tops(cursor, sorted({year // 10 * 10 for year in years}))
     
     def save(self, data: List[Dict[str, Any]]) -> bool:
-        """Guarda los datos en la base de datos"""
+        """Upsert por imdb_id en una sola transacción: solo se escribe lo que cambió"""
         if not data:
             log_error("No hay datos para guardar")
             return False
         
+        movies = {}
+        for movie in data:
+            imdb_id = extract_imdb_id(movie.get('detail_url'))
+            if imdb_id:
+                movies[imdb_id] = movie
+        if len(movies) < len(data):
+            log_warning(f"{len(data) - len(movies)} películas sin id de IMDb en detail_url (o repetidas) no se guardan")
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            conn = self._connect()
+            try:
                 cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                changes_before = conn.total_changes
+                years = self._stored_years(cursor, list(movies))
+                movie_ids = self._upsert_movies(cursor, movies)
+                movies_written = conn.total_changes - changes_before
+                if movies_written:
+                    years |= self._stored_years(cursor, list(movies))
+                else:
+                    years = set()
+                
+                # El reparto solo se toca en películas cuyo detalle se obtuvo; si falló se conserva el guardado
+                detailed = {imdb_id: movie for imdb_id, movie in movies.items() if 'metascore' in movie}
+                names = list(dict.fromkeys(
+                    actor_name for movie in detailed.values() for actor_name in movie.get('actors', []) if actor_name
+                ))
+                actor_ids = self._resolve_actor_ids(cursor, names)
+                added, removed = self._sync_links(cursor, {
+                    movie_ids[imdb_id]: [actor_ids[actor_name] for actor_name in movie.get('actors', []) if actor_name]
+                    for imdb_id, movie in detailed.items()
+                })
                 
-                for movie in data:
-                    # Insertar película
-                    cursor.execute('''
-                        INSERT INTO movies (title, year, rating, duration, metascore, detail_url)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        movie.get('title', ''),
-                        movie.get('year', ''),
-                        movie.get('rating', ''),
-                        movie.get('duration'),
-                        movie.get('metascore', ''),
-                        movie.get('detail_url', '')
-                    ))
-                    
-                    movie_id = cursor.lastrowid
-                    
-                    # Procesar actores
-                    actors = movie.get('actors', [])
-                    for actor_name in actors:
-                        if actor_name:
-                            # Obtener o crear actor
-                            actor_id = self._get_or_create_actor(cursor, actor_name)
-                            
-                            # Crear relación en tabla intermedia
-                            try:
-                                cursor.execute('''
-                                    INSERT INTO movie_actors (movie_id, actor_id)
-                                    VALUES (?, ?)
-                                ''', (movie_id, actor_id))
-                            except sqlite3.IntegrityError:
-                                # La relación ya existe, ignorar
-                                pass
+                # Solo se recalculan los años, décadas y películas que tocó este guardado
+                self._refresh_summaries(
+                    cursor,
+                    years,
+                    [movie_ids[imdb_id] for imdb_id in detailed] if added or removed else []
+                )
                 
                 conn.commit()
-                log_info(f"{len(data)} películas guardadas en la base de datos")
-                return True
                 
+                # Frames que dejó la transacción en el WAL: los bytes que realmente fueron a disco
+                _, wal_frames, _ = cursor.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+                page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+                self._write_stats = {
+                    'rows': conn.total_changes - changes_before,
+                    'bytes': max(wal_frames, 0) * page_size
+                }
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+            
+            log_info(
+                f"{len(movies)} películas guardadas en la base de datos: {movies_written} filas de películas escritas, "
+                f"{added} relaciones agregadas y {removed} eliminadas"
+            )
+            return True
+        
         except Exception as e:
             log_error(f"Error guardando datos en la base de datos: {e}")
             return False
@@ -130,14 +382,52 @@ class SQLiteRepository(BaseRepository):
     def delete_all(self) -> bool:
         """Elimina todas las películas, actores y relaciones de la base de datos"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with closing(self._connect()) as conn:
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM movie_actors')
                 cursor.execute('DELETE FROM movies')
                 cursor.execute('DELETE FROM actors')
+                for table in SUMMARY_TABLES:
+                    cursor.execute(f'DELETE FROM {table}')
                 conn.commit()
                 log_info("Todas las películas, actores y relaciones eliminadas de la base de datos")
                 return True
         except Exception as e:
             log_error(f"Error eliminando datos de la base de datos: {e}")
-            return False 
\ No newline at end of file
+            return False
+    
+    def get_top_duration_by_decade(self) -> List[Dict[str, Any]]:
+        """Consulta 1 desde el resumen materializado: las películas más largas de cada década"""
+        # El with de sqlite3 solo cierra la transacción; closing cierra la conexión
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute('''
+                SELECT title, year, duration, decade AS decada
+                FROM decade_top_duration
+                ORDER BY decade, position
+            ''').fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_rating_stats_by_year(self) -> List[Dict[str, Any]]:
+        """Consulta 2 desde el resumen materializado: desviación estándar del rating por año"""
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute('SELECT year, movies, avg_rating, std_dev FROM year_rating_stats ORDER BY year').fetchall()
+        return [{**dict(row), 'std_dev': None if row['std_dev'] is None else round(row['std_dev'], 2)} for row in rows]
+    
+    def get_lead_actors(self, actor_name: str = None) -> List[Dict[str, Any]]:
+        """Vista del actor principal desde el resumen materializado, opcionalmente filtrada por actor"""
+        query = '''
+            SELECT l.movie_id, m.title, l.actor_id, a.name AS actor_name
+            FROM movie_lead_actor l
+            JOIN movies m ON m.id = l.movie_id
+            JOIN actors a ON a.id = l.actor_id
+        '''
+        params = ()
+        if actor_name is not None:
+            query += ' WHERE a.name = ?'
+            params = (actor_name,)
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(query + ' ORDER BY l.movie_id', params).fetchall()
+        return [dict(row) for row in rows]
@@ -1,14 +1,18 @@
 # Utilidades del proyecto IMDB Scraper
 
 from .logging_utils import log_info, log_error, log_warning
-from .converter_utils import convert_duration_to_minutes
-from .soup_utils import safe_get_text, safe_get_attribute
+from .converter_utils import convert_duration_to_minutes, extract_imdb_id
+from .soup_utils import safe_get_text, safe_get_attribute, build_soup
+from .file_lock import file_lock
 
 __all__ = [
     'log_info',
     'log_error', 
     'log_warning',
     'convert_duration_to_minutes',
+    'extract_imdb_id',
     'safe_get_text',
-    'safe_get_attribute'
+    'safe_get_attribute',
+    'build_soup',
+    'file_lock'
 ] 
\ No newline at end of file
@@ -1,3 +1,7 @@
+import re
+
+IMDB_ID_PATTERN = re.compile(r'/title/(tt\d+)')
+
 def convert_duration_to_minutes(duration_str):
     """
     Convierte duración de formato "1h 30m" a minutos
@@ -17,4 +21,15 @@ def convert_duration_to_minutes(duration_str):
     if 'm' in duration_str:
         minutes_str = duration_str.replace('m', '').strip()
         total_minutes += int(minutes_str)
-    return total_minutes if total_minutes > 0 else None 
\ No newline at end of file
+    return total_minutes if total_minutes > 0 else None
+
+def extract_imdb_id(detail_url):
+    """
+    Extrae el id de título de IMDb de la URL de detalle
+    params:
+        detail_url: str -> URL como "https://www.imdb.com/title/tt0111161/"
+    returns:
+        str -> id "tt0111161", None si la URL no lo contiene
+    """
+    match = IMDB_ID_PATTERN.search(detail_url) if detail_url else None
+    return match.group(1) if match else None
@@ -0,0 +1,83 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SCRIPT_END = b'</script>'
+NEXT_DATA_SCRIPT_ID = '__NEXT_DATA__'
+JSON_LD_SCRIPT_TYPE = 'application/ld+json'
+
+
+def loads_json(data):
+    """
+    Decodifica JSON con orjson si está instalado, si no con json estándar
+    params:
+        data: bytes | str -> documento JSON
+    returns:
+        any -> objeto decodificado
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(value):
+    """
+    Codifica JSON compacto en una línea, con orjson si está instalado
+    params:
+        value: any -> objeto a codificar
+    returns:
+        str -> documento JSON sin saltos de línea
+    """
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def find_script_slice(content, value, attribute='id'):
+    """
+    Ubica el cuerpo de un <script> directamente en los bytes del HTML
+    params:
+        content: bytes -> HTML crudo de la página
+        value: str -> valor del atributo que identifica el script
+        attribute: str -> atributo a comparar ('id', 'type', ...)
+    returns:
+        bytes -> contenido del script, None si no se encuentra
+    """
+    if not content:
+        return None
+
+    pattern = re.compile(
+        rb'<script\b[^>]*(?<![\w-])' + attribute.encode() + rb'=["\']?' + re.escape(value.encode())
+        + rb'(?=["\'\s>])[^>]*>'
+    )
+    match = pattern.search(content)
+    if not match:
+        return None
+
+    end = content.find(SCRIPT_END, match.end())
+    if end == -1:
+        return None
+    return content[match.end():end]
+
+
+def extract_script_json(content, value, attribute='id'):
+    """
+    Extrae y decodifica el JSON de un <script> sin construir el DOM
+    params:
+        content: bytes -> HTML crudo de la página
+        value: str -> valor del atributo que identifica el script
+        attribute: str -> atributo a comparar ('id' para __NEXT_DATA__, 'type' para JSON-LD)
+    returns:
+        any -> JSON decodificado, None si no se encuentra o no es válido
+    """
+    script = find_script_slice(content, value, attribute)
+    if script is None:
+        return None
+    try:
+        return loads_json(script)
+    except ValueError:
+        return None
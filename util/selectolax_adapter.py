@@ -0,0 +1,83 @@
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+
+def _build_css_selector(name=None, attrs=None, **kwargs):
+    """Traduce los argumentos de find/find_all de BeautifulSoup a un selector CSS"""
+    selector = name or '*'
+    attributes = dict(attrs or {})
+    if 'class_' in kwargs:
+        attributes['class'] = kwargs.pop('class_')
+    attributes.update(kwargs)
+    for key, value in attributes.items():
+        if key == 'class':
+            selector += ''.join(f'.{c}' for c in str(value).split())
+        elif value is True:
+            selector += f'[{key}]'
+        else:
+            selector += f'[{key}="{value}"]'
+    return selector
+
+
+class SelectolaxNode:
+    """Envuelve un nodo de selectolax con la API de BeautifulSoup que usan las páginas"""
+
+    def __init__(self, node):
+        self._node = node
+
+    def __bool__(self):
+        return True
+
+    @property
+    def name(self):
+        return self._node.tag
+
+    @property
+    def text(self):
+        return self._node.text(deep=True)
+
+    @property
+    def string(self):
+        return self._node.text(deep=True)
+
+    @property
+    def attrs(self):
+        attributes = {k: (v or '') for k, v in self._node.attributes.items()}
+        # BeautifulSoup entrega 'class' como lista
+        if 'class' in attributes:
+            attributes['class'] = attributes['class'].split()
+        return attributes
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def get_text(self, separator='', strip=False):
+        return self._node.text(deep=True, separator=separator, strip=strip)
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        return SelectolaxNode(node) if node is not None else None
+
+    def select(self, selector):
+        return [SelectolaxNode(node) for node in self._node.css(selector)]
+
+    def find(self, name=None, attrs=None, **kwargs):
+        return self.select_one(_build_css_selector(name, attrs, **kwargs))
+
+    def find_all(self, name=None, attrs=None, **kwargs):
+        return self.select(_build_css_selector(name, attrs, **kwargs))
+
+
+class SelectolaxDocument(SelectolaxNode):
+    """Documento completo parseado con selectolax"""
+
+    def __init__(self, content):
+        if HTMLParser is None:
+            raise ImportError("selectolax no está instalado")
+        self._parser = HTMLParser(content)
+        super().__init__(self._parser.root)
@@ -1,3 +1,9 @@
+from bs4 import BeautifulSoup
+from config import SCRAPING_CONFIG
+from .selectolax_adapter import SelectolaxDocument
+
+SELECTOLAX_PARSER = 'selectolax'
+
 def safe_get_text(element, default='N/A'):
     """
     Extrae texto de un elemento BeautifulSoup de forma segura
@@ -23,4 +29,19 @@ def safe_get_attribute(element, attribute, default=None):
     """
     if element and hasattr(element, 'attrs') and attribute in element.attrs:
         return element.attrs[attribute]
-    return default 
\ No newline at end of file
+    return default 
+
+def build_soup(content, parser=None, parse_only=None):
+    """
+    Construye el árbol de la página con el backend configurado
+    params:
+        content: bytes -> HTML de la página
+        parser: str -> 'html.parser', 'lxml' o 'selectolax'; por defecto SCRAPING_CONFIG['html_parser']
+        parse_only: SoupStrainer -> subárboles a construir; selectolax siempre arma el documento completo
+    returns:
+        BeautifulSoup | SelectolaxDocument -> árbol con la misma API de consulta
+    """
+    parser = parser or SCRAPING_CONFIG['html_parser']
+    if parser == SELECTOLAX_PARSER:
+        return SelectolaxDocument(content)
+    return BeautifulSoup(content, parser, parse_only=parse_only)
\ No newline at end of file